@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'dashboard.middleware.MetricsMiddleware',
+    'dashboard.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,7 +61,7 @@ ROOT_URLCONF = 'acreditaciones.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'dashboard.timing.TimedDjangoTemplates',  # DjangoTemplates that reports render time
         'DIRS': [ 
             BASE_DIR / "templates",
         ],
@@ -71,6 +73,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'dashboard.utils.notifications',
+                'dashboard.utils.capabilities',
             ],
         },
     },
@@ -107,6 +110,108 @@ if TESTING:
         'DESTROY_DB': False,  # Unique name for each test run
     }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory by default; set CACHE_BACKEND/CACHE_LOCATION for a shared backend in production
+# (e.g. django.core.cache.backends.redis.RedisCache or django.core.cache.backends.filebased.FileBasedCache)
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'acreditaciones'),
+    }
+}
+
+# Local memory is private to each process: data every worker must agree on (sessions, the cached
+# session user) is only cached when the cache is shared
+SHARED_CACHE = CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache'
+
+# Seconds the dashboard statistics stay cached; signals invalidate them earlier on any change
+DASHBOARD_STATS_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_STATS_CACHE_TIMEOUT', 300))
+
+# Fraction of requests measured by RequestTimingMiddleware (0 turns it off) and whether the
+# measurements are also returned to the browser in a Server-Timing header (off: it shows every
+# client the internal timings)
+PERF_SAMPLE_RATE = float(os.environ.get('PERF_SAMPLE_RATE', 0.1))
+PERF_SERVER_TIMING_HEADER = os.environ.get('PERF_SERVER_TIMING_HEADER') == 'True'
+
+# Scrape token for /metrics (staff sessions can always read it). With gunicorn, point
+# METRICS_MULTIPROC_DIR at an empty directory so all workers' metrics are aggregated.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR', '')
+
+# Queries slower than this (milliseconds) are kept with their EXPLAIN plan in a ring buffer of
+# the last SLOW_QUERY_LOG_SIZE entries, in the cache (see dashboard/slow_queries.py)
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 500))
+SLOW_QUERY_LOG_SIZE = int(os.environ.get('SLOW_QUERY_LOG_SIZE', 200))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'dashboard.performance': {
+            'handlers': ['console'],
+            'level': os.environ.get('PERF_LOG_LEVEL', 'WARNING'),  # INFO writes one line per sampled request
+            'propagate': False,
+        },
+    },
+}
+
+# Characteristic CSV uploads are staged in the database until confirmed; unconfirmed uploads
+# older than this many seconds are deleted by the next upload
+CHARACTERISTIC_UPLOAD_TTL = int(os.environ.get('CHARACTERISTIC_UPLOAD_TTL', 86400))
+
+# Seconds an email verification code stays valid (see init/verification.py); expired codes are
+# deleted by `python manage.py purge_verification_codes`
+VERIFICATION_CODE_TTL = int(os.environ.get('VERIFICATION_CODE_TTL', 600))
+
+# With a shared cache, sessions are read through it and written to the database only when they
+# change (see dashboard/sessions.py); that engine refuses to start with the local memory cache,
+# where a logout in one process would not reach the others. Sessions larger than SESSION_MAX_SIZE
+# bytes are rejected
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'dashboard.sessions' if SHARED_CACHE else 'django.contrib.sessions.backends.db'
+)
+SESSION_MAX_SIZE = int(os.environ.get('SESSION_MAX_SIZE', 64 * 1024))
+
+# On PostgreSQL, bulk inserts of at least this many rows use COPY instead of INSERT (see dashboard/bulk.py)
+BULK_COPY_THRESHOLD = int(os.environ.get('BULK_COPY_THRESHOLD', 5000))
+
+# Seconds a user's navbar notifications stay cached; new or read notifications invalidate them earlier
+NOTIFICATION_SUMMARY_CACHE_TIMEOUT = int(os.environ.get('NOTIFICATION_SUMMARY_CACHE_TIMEOUT', 300))
+
+# Report notifications are inserted in batches of this size after the report commits.
+# With NOTIFICATION_FANOUT_ASYNC=True the fan-out is queued for the run_jobs worker instead of the request
+
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 500))
+NOTIFICATION_FANOUT_ASYNC = os.environ.get('NOTIFICATION_FANOUT_ASYNC') == 'True'
+
+# Factors created with every new report. Keys other than 'default' are email domains, so an
+# institution can get its own template (e.g. 'icesi.edu.co': ['Misión y proyecto institucional', ...])
+
+FACTOR_TEMPLATES = {
+    'default': [f"Factor {i}" for i in range(1, 13)],
+}
+
+# Generated DOFA documents are kept in memory up to this many bytes, then spooled to disk
+
+DOFA_SPOOL_MAX_SIZE = int(os.environ.get('DOFA_SPOOL_MAX_SIZE', 5 * 1024 * 1024))
+
+# Background jobs (dashboard.jobs), executed by `python manage.py run_jobs`.
+# JOBS_RUN_INLINE=True runs them inside the request instead, for local use without a worker
+
+JOBS_RUN_INLINE = os.environ.get('JOBS_RUN_INLINE') == 'True'
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BASE_DELAY = 30  # Seconds before the first retry, doubled on every attempt
+JOBS_RETRY_MAX_DELAY = 3600
+JOBS_LOCK_TIMEOUT = 600  # Running jobs older than this are considered abandoned by a dead worker
+JOBS_POLL_INTERVAL = 2
+JOBS_RETENTION = int(os.environ.get('JOBS_RETENTION', 7 * 86400))  # Seconds finished jobs are kept
+JOBS_PURGE_INTERVAL = 3600  # Seconds between purges of finished jobs by the worker
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -127,6 +232,13 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = 'init.UserModel'
 
+# Loads the session user with their role in one query (see init/backends.py) and, with a shared
+# cache, keeps the pair cached for AUTH_USER_CACHE_TIMEOUT seconds. 0 (the default with the local
+# memory cache, where a role removed in one process would stay cached in the others) reads the
+# database on every request
+AUTHENTICATION_BACKENDS = ['init.backends.RoleModelBackend']
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 300 if SHARED_CACHE else 0))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -156,6 +268,26 @@ STATICFILES_FINDERS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # Generated DOFA documents, named by the fingerprint of their inputs. Any storage backend works
+    'dofa': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {
+            'location': os.path.join(MEDIA_ROOT, 'dofa'),
+            'base_url': MEDIA_URL + 'dofa/',
+        },
+    },
+}
+
+# Least recently used DOFA documents beyond this count are deleted
+DOFA_CACHE_MAX_FILES = int(os.environ.get('DOFA_CACHE_MAX_FILES', 50))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -170,4 +302,8 @@ EMAIL_HOST_USER = '' # Remove this information for production (it doesn't matter
 EMAIL_HOST_PASSWORD = ''
 DEFAULT_FROM_EMAIL = ''
 
+# Bulk invitations reuse one SMTP connection and pause between batches to respect provider rate limits
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', 50))
+EMAIL_BATCH_DELAY = float(os.environ.get('EMAIL_BATCH_DELAY', 1))
+
 LOGIN_URL = '/login/'
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import PermissionModel, ReportModel # Añadimos PermissionModel
+from .models import PermissionModel, ReportModel, JobModel # Añadimos PermissionModel
 
 # Register your models here
 
@@ -20,6 +20,11 @@ class ReportAdmin(admin.ModelAdmin):
     
     get_created_by.short_description = 'created by'
 
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("task", "status", "attempts", "run_at", "created_by")
+    list_filter = ("status",)
+
 # Registramos PermissionModel
 admin.site.register(PermissionModel, PermissionAdmin)
 admin.site.register(ReportModel, ReportAdmin)
+admin.site.register(JobModel, JobAdmin)
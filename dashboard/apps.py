@@ -7,3 +7,5 @@ class DashboardConfig(AppConfig):
 
     def ready(self):
         import dashboard.signals  # Conectar las señales
+        from dashboard.sessions import check_session_cache
+        check_session_cache()
@@ -0,0 +1,52 @@
+"""
+Inserts of many rows at once. On PostgreSQL, inserts of at least BULK_COPY_THRESHOLD rows are
+streamed with COPY, which avoids parsing and binding one large INSERT per batch; smaller inserts
+and other databases use bulk_create. COPY doesn't set primary keys on the objects, so callers
+that need them must use bulk_create.
+"""
+import io
+from itertools import islice
+from django.conf import settings
+from django.db import connection
+
+BATCH_SIZE = 1000
+COPY_CHUNK_SIZE = 10000
+
+
+def _chunks(objs, size):
+    objs = iter(objs)
+    while chunk := list(islice(objs, size)):
+        yield chunk
+
+
+def _copy_value(value):
+    # PostgreSQL COPY text format: tab separated, \N for NULL, backslash escapes
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def copy_insert(model, objs, fields):
+    opts = model._meta
+    fields = [opts.get_field(name) for name in fields]
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    sql = f'COPY {connection.ops.quote_name(opts.db_table)} ({columns}) FROM STDIN'
+    with connection.cursor() as cursor:
+        for chunk in _chunks(objs, COPY_CHUNK_SIZE):
+            buffer = io.StringIO()
+            for obj in chunk:
+                # pre_save fills auto_now fields, as bulk_create would
+                values = (field.get_db_prep_save(field.pre_save(obj, True), connection) for field in fields)
+                buffer.write('\t'.join(_copy_value(value) for value in values) + '\n')
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+
+
+def bulk_insert(model, objs, fields, total):
+    """Inserts objs (any iterable) setting fields; total is the number of objects, to pick COPY."""
+    if connection.vendor == 'postgresql' and total >= settings.BULK_COPY_THRESHOLD:
+        copy_insert(model, objs, fields)
+    else:
+        for chunk in _chunks(objs, BATCH_SIZE):
+            model.objects.bulk_create(chunk)
+    return total
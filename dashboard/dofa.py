@@ -0,0 +1,206 @@
+import hashlib
+import os
+import tempfile
+import time
+import docx
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import storages
+from django.db.models import CharField, Count, F, IntegerField, Max, Value
+from .models import CharacteristicAspects, CharacteristicModel, CharacteristicStrengths, FactorModel, ReportModel
+from .metrics import DOFA_GENERATION_DURATION
+from .timing import record_cache_lookup
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+# Row kinds, in the order they are written for each factor
+FACTOR, STRENGTH, ASPECT = 0, 1, 2
+
+# Bump when the document layout changes so previously cached files are not served
+DOFA_FORMAT_VERSION = 1
+
+# Generation jobs are keyed by fingerprint, so everyone asking for the same document shares one job
+JOB_KEY_PREFIX = 'dofa:'
+
+COLUMNS = ('row_factor', 'row_factor_name', 'row_kind', 'row_characteristic', 'row_id', 'row_text')
+
+
+def dofa_rows(report=None):
+    """
+    One flat UNION ALL query of (factor, kind, text) rows ordered like the document:
+    each factor, then its strengths, then its aspects. Nothing is prefetched, rows are
+    streamed from the cursor.
+    """
+    factors = FactorModel.objects.all()
+    strengths = CharacteristicStrengths.objects.all()
+    aspects = CharacteristicAspects.objects.all()
+    if report is not None:
+        factors = factors.filter(report=report)
+        strengths = strengths.filter(characteristic__factors__report=report)
+        aspects = aspects.filter(characteristic__factors__report=report)
+    else:
+        # A characteristic whose factors were deleted has no heading to be listed under
+        strengths = strengths.filter(characteristic__factors__isnull=False)
+        aspects = aspects.filter(characteristic__factors__isnull=False)
+
+    factors = factors.annotate(
+        row_factor=F('pk'),
+        row_factor_name=F('name'),
+        row_kind=Value(FACTOR),
+        row_characteristic=Value(None, output_field=IntegerField()),
+        row_id=Value(None, output_field=IntegerField()),
+        row_text=Value(None, output_field=CharField()),
+    )
+    strengths = strengths.annotate(
+        row_factor=F('characteristic__factors__pk'),
+        row_factor_name=F('characteristic__factors__name'),
+        row_kind=Value(STRENGTH),
+        row_characteristic=F('characteristic_id'),
+        row_id=F('pk'),
+        row_text=F('global_strength__name'),
+    )
+    aspects = aspects.annotate(
+        row_factor=F('characteristic__factors__pk'),
+        row_factor_name=F('characteristic__factors__name'),
+        row_kind=Value(ASPECT),
+        row_characteristic=F('characteristic_id'),
+        row_id=F('pk'),
+        row_text=F('global_aspect__name'),
+    )
+    return factors.values_list(*COLUMNS).union(
+        strengths.values_list(*COLUMNS),
+        aspects.values_list(*COLUMNS),
+        all=True,
+    ).order_by('row_factor', 'row_kind', 'row_characteristic', 'row_id')
+
+
+def build_dofa_document(rows):
+    doc = docx.Document()
+    doc.add_heading('DOFA Analysis', 0)
+    in_factor = False
+    aspects_started = False
+
+    def close_factor():
+        # Both sections are always written, even when a factor has nothing to list
+        if not aspects_started:
+            doc.add_heading('Aspects to Improve:', level=2)
+        doc.add_page_break()
+
+    for factor_id, factor_name, kind, characteristic_id, row_id, text in rows:
+        if kind == FACTOR:
+            if in_factor:
+                close_factor()
+            doc.add_heading(f'Factor: {factor_name}', level=1)
+            doc.add_heading('Strengths:', level=2)
+            in_factor = True
+            aspects_started = False
+            continue
+
+        if kind == ASPECT and not aspects_started:
+            doc.add_heading('Aspects to Improve:', level=2)
+            aspects_started = True
+        doc.add_paragraph().add_run(f'• {text}')
+
+    if in_factor:
+        close_factor()
+    return doc
+
+
+def render_dofa_document(report=None):
+    """
+    Writes the document to a spooled temporary file and returns it rewound. The serialized
+    .docx stays in memory up to DOFA_SPOOL_MAX_SIZE bytes and rolls over to disk beyond that.
+    The other allocation is python-docx's XML tree, about 1 KB per written row (~16 MiB for
+    10k characteristics with one strength and one aspect each); no model instances are kept.
+    """
+    document = build_dofa_document(dofa_rows(report).iterator())
+    output = tempfile.SpooledTemporaryFile(max_size=settings.DOFA_SPOOL_MAX_SIZE)
+    document.save(output)
+    output.seek(0)
+    return output
+
+
+def dofa_fingerprint(report=None):
+    """
+    Hash of everything the document is built from. Counts catch deletions and max ids catch
+    insertions; factor and global strength/aspect edits bump updated_at.
+    """
+    factors = FactorModel.objects.all()
+    links = CharacteristicModel.factors.through.objects.all()
+    strengths = CharacteristicStrengths.objects.all()
+    aspects = CharacteristicAspects.objects.all()
+    if report is not None:
+        factors = factors.filter(report=report)
+        links = links.filter(factormodel__report=report)
+        strengths = strengths.filter(characteristic__factors__report=report)
+        aspects = aspects.filter(characteristic__factors__report=report)
+    else:
+        strengths = strengths.filter(characteristic__factors__isnull=False)
+        aspects = aspects.filter(characteristic__factors__isnull=False)
+
+    parts = [
+        DOFA_FORMAT_VERSION,
+        report.pk if report is not None else 'all',
+        factors.aggregate(count=Count('pk'), last_id=Max('pk'), updated_at=Max('updated_at')),
+        links.aggregate(count=Count('pk'), last_id=Max('pk')),
+        strengths.aggregate(count=Count('pk'), last_id=Max('pk'), updated_at=Max('global_strength__updated_at')),
+        aspects.aggregate(count=Count('pk'), last_id=Max('pk'), updated_at=Max('global_aspect__updated_at')),
+    ]
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def dofa_storage():
+    return storages['dofa']
+
+
+def _touch(storage, name):
+    # Eviction goes by access time, so a hit refreshes it (when the backend has local paths). The
+    # modification time is left alone: it is the generation time sent as Last-Modified.
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        return
+    os.utime(path, (time.time(), os.stat(path).st_mtime))
+
+
+def evict_dofa_documents(storage):
+    directories, files = storage.listdir('')
+    excess = len(files) - settings.DOFA_CACHE_MAX_FILES
+    if excess > 0:
+        for name in sorted(files, key=storage.get_accessed_time)[:excess]:
+            storage.delete(name)
+
+
+def cached_dofa_modified_time(fingerprint):
+    storage = dofa_storage()
+    name = f'{fingerprint}.docx'
+    return storage.get_modified_time(name) if storage.exists(name) else None
+
+
+def open_cached_dofa_document(fingerprint):
+    """Returns an open file for the document with this fingerprint, or None if it isn't generated yet."""
+    storage = dofa_storage()
+    name = f'{fingerprint}.docx'
+    found = storage.exists(name)
+    record_cache_lookup(found)
+    if not found:
+        return None
+    _touch(storage, name)
+    return storage.open(name)
+
+
+def store_dofa_document(report, fingerprint):
+    storage = dofa_storage()
+    name = f'{fingerprint}.docx'
+    if not storage.exists(name):
+        with DOFA_GENERATION_DURATION.time(), render_dofa_document(report) as output:
+            storage.save(name, File(output))
+        evict_dofa_documents(storage)
+
+
+def generate_dofa_document(report_id=None):
+    # Background job: the fingerprint is taken when the job runs, so late edits are included
+    report = ReportModel.objects.get(pk=report_id) if report_id else None
+    fingerprint = dofa_fingerprint(report)
+    store_dofa_document(report, fingerprint)
+    return {'fingerprint': fingerprint}
@@ -0,0 +1,26 @@
+from django.conf import settings
+from .models import FactorModel
+
+
+def factor_template_for(user):
+    # Walks the creator's email domain from most to least specific: u.icesi.edu.co, icesi.edu.co, ...
+    templates = settings.FACTOR_TEMPLATES
+    domain = user.email.rsplit('@', 1)[-1].lower() if user and user.email else ''
+    parts = domain.split('.')
+    for i in range(len(parts)):
+        names = templates.get('.'.join(parts[i:]))
+        if names is not None:
+            return names
+    return templates['default']
+
+
+def create_default_factors(reports, user=None):
+    # One INSERT for every default factor of every report (historic imports pass many reports)
+    factors = []
+    for report in reports:
+        editor = user or report.created_by
+        factors.extend(
+            FactorModel(name=name, content="", report=report, last_edited_by=editor)
+            for name in factor_template_for(editor)
+        )
+    return FactorModel.objects.bulk_create(factors)
@@ -0,0 +1,89 @@
+"""
+Querysets the application runs on nearly every page or job. The verify_indexes command EXPLAINs
+each of them and fails when one has to read a large table sequentially, so a dropped index or a
+query change that defeats one is caught before it reaches production.
+"""
+import re
+from django.utils import timezone
+from init.models import VerificationCodeModel
+from .models import AccreditationProcess, CommentsModel, FactorModel, NotificationModel, ReportModel, TaskModel, UserModel
+
+HOT_QUERIES = {}
+
+
+def hot_query(name):
+    def register(build):
+        HOT_QUERIES[name] = build
+        return build
+    return register
+
+
+def _sample_user():
+    return UserModel.objects.order_by('pk').values_list('pk', flat=True).first()
+
+
+@hot_query('recent reports')
+def recent_reports():
+    return ReportModel.objects.order_by('-created_at')[:3]
+
+
+@hot_query('reports by status')
+def reports_by_status():
+    return ReportModel.objects.filter(status='inactive').order_by('-created_at')[:10]
+
+
+@hot_query('pending approvals')
+def pending_comments():
+    return CommentsModel.objects.filter(status='pending')
+
+
+@hot_query('comments of a factor')
+def factor_comments():
+    factor = FactorModel.objects.order_by('pk').values_list('pk', flat=True).first()
+    return CommentsModel.objects.filter(factor_id=factor).order_by('-created_at')
+
+
+@hot_query('recent comments')
+def recent_comments():
+    return CommentsModel.objects.order_by('-created_at')[:3]
+
+
+@hot_query('navbar notifications')
+def navbar_notifications():
+    return NotificationModel.objects.filter(user_id=_sample_user()).order_by('-created_at')[:6]
+
+
+@hot_query('unread notifications')
+def unread_notifications():
+    return NotificationModel.objects.filter(user_id=_sample_user(), is_read=False)
+
+
+@hot_query('verification code')
+def verification_code():
+    return VerificationCodeModel.objects.filter(user_id=_sample_user(), code='000042', expires_at__gt=timezone.now())
+
+
+@hot_query('expired verification codes')
+def expired_verification_codes():
+    return VerificationCodeModel.objects.filter(expires_at__lt=timezone.now()).values_list('pk', flat=True)[:1000]
+
+
+@hot_query('open tasks')
+def open_tasks():
+    return TaskModel.objects.filter(assignee_id=_sample_user(), status='pending').order_by('due_date')
+
+
+@hot_query('latest accreditation process')
+def latest_accreditation_process():
+    return AccreditationProcess.objects.order_by('-created_at')[:1]
+
+
+def sequential_scans(plan):
+    """Tables an EXPLAIN plan from PostgreSQL or SQLite reads in full."""
+    tables = set(re.findall(r'Seq Scan on (\w+)', plan))
+    for line in plan.splitlines():
+        # SQLite: "SCAN table" walks the whole table unless it is "SCAN table USING ... INDEX"
+        match = re.search(r'\bSCAN (?:TABLE )?(\w+)', line)
+        if match and 'USING' not in line:
+            tables.add(match.group(1))
+    return tables
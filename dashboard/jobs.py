@@ -0,0 +1,115 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import JobModel
+from .timing import observe_queries
+
+PENDING, RUNNING, SUCCEEDED, FAILED = 'pending', 'running', 'succeeded', 'failed'
+
+
+def enqueue(func, *, key='', user=None, max_attempts=None, **payload):
+    """
+    Stores a call to func(**payload) for the run_jobs worker. The payload must be JSON
+    serializable. With a key, an identical job that is still pending or running is reused.
+    """
+    if key:
+        existing = JobModel.objects.filter(key=key, status__in=[PENDING, RUNNING]).first()
+        if existing:
+            return existing
+
+    job = JobModel.objects.create(
+        task=f"{func.__module__}.{func.__qualname__}",
+        payload=payload,
+        key=key,
+        created_by=user,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_RUN_INLINE:
+        # Local development without a worker
+        job.status, job.attempts, job.locked_at = RUNNING, 1, timezone.now()
+        run_job(job)
+    return job
+
+
+def secret_payload(*names):
+    """
+    Task decorator: the named payload arguments (codes, addresses) are removed from the job row
+    once the job has succeeded or failed for good, so the table doesn't keep them.
+    """
+    def decorator(func):
+        func.secret_payload = names
+        return func
+    return decorator
+
+
+def retry_delay(attempts):
+    # Exponential backoff: base, 2 * base, 4 * base, ... capped
+    return min(settings.JOBS_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.JOBS_RETRY_MAX_DELAY)
+
+
+def claim_next_job():
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    with transaction.atomic():
+        # SKIP LOCKED lets several workers poll the same table without waiting on each other
+        job = JobModel.objects.select_for_update(skip_locked=True).filter(
+            Q(status=PENDING, run_at__lte=now) | Q(status=RUNNING, locked_at__lt=stale)
+        ).order_by('run_at', 'pk').first()
+        if job is None:
+            return None
+        job.status = RUNNING
+        job.attempts += 1
+        job.locked_at = now
+        job.save(update_fields=['status', 'attempts', 'locked_at', 'updated_at'])
+    return job
+
+
+def run_job(job):
+    task = None
+    try:
+        task = import_string(job.task)
+        with observe_queries(lambda: f"job {job.task}"):
+            result = task(**job.payload)
+    except Exception as e:
+        job.last_error = f"{type(e).__name__}: {e}"
+        if job.attempts >= job.max_attempts:
+            job.status = FAILED
+        else:
+            job.status = PENDING
+            job.run_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+    else:
+        job.status = SUCCEEDED
+        job.result = result
+    if job.status != PENDING:
+        secret = getattr(task, 'secret_payload', ())
+        job.payload = {name: value for name, value in job.payload.items() if name not in secret}
+    job.locked_at = None
+    job.save()
+    return job
+
+
+def run_pending_jobs(limit=None):
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def purge_finished_jobs(batch_size=1000):
+    """Deletes jobs that succeeded or failed more than JOBS_RETENTION seconds ago, in batches."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_RETENTION)
+    deleted = 0
+    while True:
+        ids = list(
+            JobModel.objects.filter(status__in=[SUCCEEDED, FAILED], updated_at__lt=cutoff).values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += JobModel.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,81 @@
+import io
+import time
+import tracemalloc
+import docx
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from dashboard.dofa import render_dofa_document
+from dashboard.models import (
+    CharacteristicAspects, CharacteristicModel, CharacteristicStrengths, FactorModel,
+    GlobalAspects, GlobalStrengths, ReportModel,
+)
+from init.models import UserModel
+
+
+class Command(BaseCommand):
+    help = "Measures DOFA generation time and peak memory; every row it writes is rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--characteristics', type=int, default=10000)
+        parser.add_argument('--factors', type=int, default=12)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            report = self.seed(options['characteristics'], options['factors'])
+            self.measure("prefetch + in-memory", self.legacy_document)
+            self.measure("flat rows + spooled file", lambda: render_dofa_document(report).close())
+            transaction.set_rollback(True)
+
+    def seed(self, count, factor_count):
+        user = UserModel.objects.create(username='bench', email='bench@u.icesi.edu.co')
+        report = ReportModel.objects.create(name='Benchmark', description='', end_date='2030-01-01', created_by=user)
+        factors = FactorModel.objects.bulk_create([
+            FactorModel(name=f'Factor {i}', report=report) for i in range(factor_count)
+        ])
+        characteristics = CharacteristicModel.objects.bulk_create([
+            CharacteristicModel(title=f'Characteristic {i}') for i in range(count)
+        ], batch_size=1000)
+        CharacteristicModel.factors.through.objects.bulk_create([
+            CharacteristicModel.factors.through(characteristicmodel=c, factormodel=factors[i % factor_count])
+            for i, c in enumerate(characteristics)
+        ], batch_size=1000)
+        strengths = GlobalStrengths.objects.bulk_create([GlobalStrengths(name=f'Strength {i}') for i in range(count)], batch_size=1000)
+        aspects = GlobalAspects.objects.bulk_create([GlobalAspects(name=f'Aspect {i}') for i in range(count)], batch_size=1000)
+        CharacteristicStrengths.objects.bulk_create([
+            CharacteristicStrengths(characteristic=c, global_strength=s) for c, s in zip(characteristics, strengths)
+        ], batch_size=1000)
+        CharacteristicAspects.objects.bulk_create([
+            CharacteristicAspects(characteristic=c, global_aspect=a) for c, a in zip(characteristics, aspects)
+        ], batch_size=1000)
+        return report
+
+    def legacy_document(self):
+        # The previous DOFADocumentView body, kept here only for comparison
+        factors = FactorModel.objects.all().prefetch_related(
+            'characteristics',
+            'characteristics__strengths__global_strength',
+            'characteristics__aspects__global_aspect'
+        )
+        doc = docx.Document()
+        doc.add_heading('DOFA Analysis', 0)
+        for factor in factors:
+            doc.add_heading(f'Factor: {factor.name}', level=1)
+            doc.add_heading('Strengths:', level=2)
+            for char in factor.characteristics.all():
+                for strength in char.strengths.all():
+                    doc.add_paragraph().add_run(f'• {strength.global_strength.name}')
+            doc.add_heading('Aspects to Improve:', level=2)
+            for char in factor.characteristics.all():
+                for aspect in char.aspects.all():
+                    doc.add_paragraph().add_run(f'• {aspect.global_aspect.name}')
+            doc.add_page_break()
+        doc.save(io.BytesIO())
+
+    def measure(self, label, generate):
+        tracemalloc.start()
+        start = time.perf_counter()
+        generate()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.stdout.write(f"{label:<26} {elapsed * 1000:10.1f} ms {peak / 1024 / 1024:8.1f} MiB peak")
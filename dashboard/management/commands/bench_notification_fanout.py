@@ -0,0 +1,43 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from dashboard.models import NotificationModel
+from dashboard.notifications import notify_roles
+from init.models import RoleModel, UserModel
+
+
+class Command(BaseCommand):
+    help = "Compares per-user and batched report notification fan-out; every row it writes is rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            creator = self.seed_users(options['users'])
+            title = "Report created: benchmark"
+
+            queries = []
+            with connection.execute_wrapper(lambda execute, *args: queries.append(1) or execute(*args)):
+                start = time.perf_counter()
+                for user in UserModel.objects.filter(role__name__in=['program director', 'acadi', 'common']):
+                    NotificationModel.objects.create(title=title, user=user, created_by=creator)
+                self.report("per-user create()", time.perf_counter() - start, len(queries))
+
+                queries.clear()
+                start = time.perf_counter()
+                notify_roles(title, creator.pk)
+                self.report("batched bulk_create()", time.perf_counter() - start, len(queries))
+
+            transaction.set_rollback(True)
+
+    def seed_users(self, count):
+        role, created = RoleModel.objects.get_or_create(name='common')
+        UserModel.objects.bulk_create([
+            UserModel(username=f'bench{i}', email=f'bench{i}@u.icesi.edu.co', password='!', role=role)
+            for i in range(count)
+        ], batch_size=1000)
+        return UserModel.objects.filter(email='bench0@u.icesi.edu.co').get()
+
+    def report(self, label, elapsed, queries):
+        self.stdout.write(f"{label:<24} {elapsed * 1000:10.1f} ms {queries:8d} queries")
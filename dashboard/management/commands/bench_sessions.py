@@ -0,0 +1,61 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from dashboard.notifications import invalidate_notification_summaries
+from init.backends import forget_users
+from init.models import RoleModel, UserModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares request latency with database and cache-backed sessions; every row it writes is "
+        "rolled back and every cache entry it leaves is deleted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--url', default='dashboard-user', help="URL name of the page requested")
+
+    def handle(self, *args, **options):
+        user_ids = []
+        try:
+            with transaction.atomic():
+                role, created = RoleModel.objects.get_or_create(name='common')
+                user = UserModel.objects.create_user(
+                    username='bench-sessions', email='bench-sessions@u.icesi.edu.co', password='!', role=role,
+                )
+                user_ids.append(user.pk)
+                url = reverse(options['url'])
+                for engine in ['django.contrib.sessions.backends.db', 'dashboard.sessions']:
+                    with override_settings(SESSION_ENGINE=engine, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                        self.run(engine, user, url, options['requests'])
+                transaction.set_rollback(True)
+        finally:
+            # The rollback doesn't reach the cache, and the user's pk can be reused. Outside the
+            # transaction, so the deferred invalidation runs right away.
+            forget_users(user_ids)
+            invalidate_notification_summaries(user_ids)
+
+    def run(self, engine, user, url, count):
+        client = Client()
+        client.force_login(user)
+        try:
+            client.get(url)  # Warm caches, middleware and templates
+
+            queries = []
+            with connection.execute_wrapper(lambda execute, *args: queries.append(args[0]) or execute(*args)):
+                start = time.perf_counter()
+                for _ in range(count):
+                    client.get(url)
+                elapsed = time.perf_counter() - start
+        finally:
+            # Deletes the session from the engine's cache as well as its row
+            client.logout()
+        session_queries = sum('django_session' in sql for sql in queries)
+        self.stdout.write(
+            f"{engine:<38} {elapsed * 1000 / count:8.2f} ms/request {len(queries) / count:6.1f} queries/request "
+            f"{session_queries / count:5.1f} session queries/request"
+        )
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from dashboard.progress import rebuild_factor_counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes the stored characteristic counters and progress of every factor in one SQL pass"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_factor_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt progress counters for {updated} factors."))
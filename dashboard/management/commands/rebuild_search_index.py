@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from dashboard.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Re-creates the search documents of every report, comment, question and characteristic"
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} documents."))
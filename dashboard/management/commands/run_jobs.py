@@ -0,0 +1,40 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from dashboard.jobs import purge_finished_jobs, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs (document generation, emails) until interrupted"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run the jobs that are due and exit")
+        parser.add_argument(
+            '--without-metrics', action='store_true',
+            help="Run without METRICS_MULTIPROC_DIR; email and DOFA timings are then lost",
+        )
+
+    def handle(self, *args, **options):
+        # Email and DOFA timings are recorded here, in the worker; /metrics only sees them through the
+        # per-process files of METRICS_MULTIPROC_DIR
+        if not settings.METRICS_MULTIPROC_DIR and not options['without_metrics']:
+            raise CommandError(
+                "Set METRICS_MULTIPROC_DIR to the directory the web processes use, so /metrics reports "
+                "the worker's timings, or pass --without-metrics."
+            )
+        last_purge = None
+        while True:
+            close_old_connections()
+            if last_purge is None or time.monotonic() - last_purge >= settings.JOBS_PURGE_INTERVAL:
+                purged = purge_finished_jobs()
+                last_purge = time.monotonic()
+                if purged:
+                    self.stdout.write(f"Deleted {purged} finished jobs.")
+            processed = run_pending_jobs()
+            if processed:
+                self.stdout.write(f"Processed {processed} jobs.")
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(settings.JOBS_POLL_INTERVAL)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from dashboard.slow_queries import clear_slow_queries, worst_offenders
+
+
+class Command(BaseCommand):
+    help = "Lists the logged slow queries grouped by SQL, worst total time first"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10, help="Number of queries to list")
+        parser.add_argument('--plans', action='store_true', help="Include the EXPLAIN plan of the slowest run")
+        parser.add_argument('--clear', action='store_true', help="Empty the log afterwards")
+
+    def handle(self, *args, **options):
+        offenders = worst_offenders(options['limit'])
+        if not offenders:
+            self.stdout.write("No slow queries logged.")
+        for position, offender in enumerate(offenders, 1):
+            self.stdout.write(self.style.WARNING(
+                f"#{position} total {offender['total_ms']} ms, {offender['count']} runs, "
+                f"max {offender['max_ms']} ms, from {', '.join(offender['sources'])}"
+            ))
+            self.stdout.write(f"  {offender['sql']}")
+            if options['plans'] and offender['slowest']['plan']:
+                for line in offender['slowest']['plan'].splitlines():
+                    self.stdout.write(f"    {line}")
+        if options['clear']:
+            clear_slow_queries()
+            self.stdout.write(self.style.SUCCESS("Slow-query log cleared."))
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from dashboard.hot_queries import HOT_QUERIES, sequential_scans
+from dashboard.models import (
+    AccreditationProcess, CommentsModel, FactorModel, NotificationModel, ReportModel, TaskModel,
+)
+from init.models import UserModel, VerificationCodeModel
+
+SEEDED_MODELS = [
+    UserModel, VerificationCodeModel, ReportModel, FactorModel, CommentsModel,
+    NotificationModel, TaskModel, AccreditationProcess,
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAINs every hot query in dashboard.hot_queries and fails if one reads a table with at "
+        "least --min-rows rows sequentially; the seeded rows are rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help="Rows to seed per table, 0 to check the current data")
+        parser.add_argument('--min-rows', type=int, default=1000, help="Smaller tables may be scanned")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['rows']:
+                self.seed(options['rows'])
+            self.analyze()
+            failures = []
+            for name, build in HOT_QUERIES.items():
+                plan = build().explain()
+                scanned = {table: self.row_count(table) for table in sequential_scans(plan)}
+                large = sorted(table for table, rows in scanned.items() if rows >= options['min_rows'])
+                if large:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f"{name}: sequential scan of {', '.join(large)}"))
+                    self.stdout.write(plan)
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"{name}: ok"))
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries read large tables sequentially: {', '.join(failures)}")
+
+    def seed(self, rows):
+        # Each filter value the hot queries use matches about 2% of the rows, as in production
+        now = timezone.now()
+        users = UserModel.objects.bulk_create([
+            UserModel(username=f'index-check-{i}', email=f'index-check-{i}@u.icesi.edu.co')
+            for i in range(rows)
+        ], batch_size=1000)
+        owners = users[:50]
+        VerificationCodeModel.objects.bulk_create([
+            VerificationCodeModel(user=user, code=f'{i:06d}') for i, user in enumerate(users)
+        ], batch_size=1000)
+        reports = ReportModel.objects.bulk_create([
+            ReportModel(
+                name=f'Report {i}', description='', end_date=now.date(), created_by=owners[i % 50],
+                status='inactive' if i % 50 == 0 else 'active',
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+        factors = FactorModel.objects.bulk_create([
+            FactorModel(name=f'Factor {i}', report=reports[i]) for i in range(50)
+        ])
+        CommentsModel.objects.bulk_create([
+            CommentsModel(
+                factor=factors[i % 50], owner=owners[i % 50], title=f'Comment {i}', content='',
+                status='pending' if i % 50 == 0 else 'approved', created_at=now - timedelta(minutes=i),
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+        NotificationModel.objects.bulk_create([
+            NotificationModel(title=f'Notification {i}', user=owners[i % 50], created_by=owners[0], is_read=i % 100 != 0)
+            for i in range(rows)
+        ], batch_size=1000)
+        TaskModel.objects.bulk_create([
+            TaskModel(
+                title=f'Task {i}', due_date=now.date() + timedelta(days=i % 30), assignee=owners[i % 50],
+                created_by=owners[0], status='pending' if i % 2 else 'completed',
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+        AccreditationProcess.objects.bulk_create([
+            AccreditationProcess(name=f'Process {i}', created_by=owners[i % 50]) for i in range(rows)
+        ], batch_size=1000)
+
+    def analyze(self):
+        # Fresh planner statistics, otherwise the planner still sees the tables as empty
+        with connection.cursor() as cursor:
+            for model in SEEDED_MODELS:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+    def row_count(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+            return cursor.fetchone()[0]
@@ -0,0 +1,276 @@
+"""
+In-process metrics exposed in the Prometheus text format by the /metrics view.
+
+Values live in memory, or, with METRICS_MULTIPROC_DIR set, in one mmap-backed file per process
+that the view adds up, so a scrape reports every gunicorn worker whichever one serves it.
+Counter and histogram files outlive their worker (the totals must never go back); gauge files
+are removed by mark_process_dead() from gunicorn's child_exit hook.
+"""
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REGISTRY = []
+_lock = threading.Lock()
+_stores = {}
+
+
+class _MemoryValues:
+    def __init__(self):
+        self.values = {}
+
+    def inc(self, key, amount):
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def items(self):
+        return list(self.values.items())
+
+
+def _read_entries(data):
+    # Layout: uint32 bytes in use, 4 bytes padding, then entries of
+    # uint32 key length, key (padded so the value is 8-byte aligned), float64 value
+    used = struct.unpack_from('<I', data, 0)[0]
+    pos = 8
+    while pos < used:
+        length = struct.unpack_from('<I', data, pos)[0]
+        key = data[pos + 4:pos + 4 + length].decode('utf-8')
+        pos += 4 + length + (-(4 + length) % 8)
+        yield key, struct.unpack_from('<d', data, pos)[0], pos
+        pos += 8
+
+
+class _MmapValues:
+    """Single-writer file of float values; the used size is written last so readers never see half an entry."""
+    INITIAL_SIZE = 1 << 16
+
+    def __init__(self, path):
+        self.file = open(path, 'a+b')
+        size = os.fstat(self.file.fileno()).st_size
+        if size == 0:
+            size = self.INITIAL_SIZE
+            self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.used = struct.unpack_from('<I', self.map, 0)[0]
+        if self.used == 0:
+            self.used = 8
+            struct.pack_into('<I', self.map, 0, self.used)
+        self.positions = {key: pos for key, _, pos in _read_entries(self.map)}
+
+    def _position(self, key):
+        pos = self.positions.get(key)
+        if pos is None:
+            encoded = key.encode('utf-8')
+            entry = struct.pack('<I', len(encoded)) + encoded + b' ' * (-(4 + len(encoded)) % 8) + struct.pack('<d', 0.0)
+            if self.used + len(entry) > len(self.map):
+                size = max(len(self.map) * 2, self.used + len(entry))
+                self.file.truncate(size)
+                self.map.close()
+                self.map = mmap.mmap(self.file.fileno(), size)
+            self.map[self.used:self.used + len(entry)] = entry
+            pos = self.used + len(entry) - 8
+            self.used += len(entry)
+            struct.pack_into('<I', self.map, 0, self.used)
+            self.positions[key] = pos
+        return pos
+
+    def inc(self, key, amount):
+        pos = self._position(key)
+        struct.pack_into('<d', self.map, pos, struct.unpack_from('<d', self.map, pos)[0] + amount)
+
+    def set(self, key, value):
+        struct.pack_into('<d', self.map, self._position(key), value)
+
+
+def _store(kind):
+    directory = settings.METRICS_MULTIPROC_DIR
+    # Keyed by pid too: a forked worker must not write into its parent's file
+    store_key = (os.getpid(), directory, kind)
+    store = _stores.get(store_key)
+    if store is None:
+        store = _MmapValues(os.path.join(directory, f'{kind}_{os.getpid()}.db')) if directory else _MemoryValues()
+        _stores[store_key] = store
+    return store
+
+
+def _key(sample, labels):
+    return json.dumps([sample, sorted(labels.items())])
+
+
+class Metric:
+    type = None
+    store = 'values'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return {name: str(value) for name, value in labels.items()}
+
+    def _inc(self, sample, labels, amount):
+        with _lock:
+            _store(self.store).inc(_key(sample, labels), amount)
+
+    def samples(self, values):
+        # (sample name, labels, value) for every value recorded under this metric
+        return sorted((sample, labels, value) for (sample, labels), value in values.items() if sample == self.name)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self._inc(self.name, self._labels(labels), amount)
+
+
+class Gauge(Metric):
+    type = 'gauge'
+    store = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        self._inc(self.name, self._labels(labels), amount)
+
+    def dec(self, amount=1, **labels):
+        self._inc(self.name, self._labels(labels), -amount)
+
+    def set(self, value, **labels):
+        with _lock:
+            _store(self.store).set(_key(self.name, self._labels(labels)), value)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        labels = self._labels(labels)
+        index = bisect_left(self.buckets, value)
+        bound = _format_value(self.buckets[index]) if index < len(self.buckets) else '+Inf'
+        # Buckets are stored per range and made cumulative when exposed
+        self._inc(f'{self.name}_bucket', {**labels, 'le': bound}, 1)
+        self._inc(f'{self.name}_sum', labels, value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self, values):
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        groups = {}
+        for (sample, labels), value in values.items():
+            if sample == f'{self.name}_bucket':
+                labels = dict(labels)
+                le = labels.pop('le')
+                groups.setdefault(tuple(sorted(labels.items())), {})[le] = value
+        samples = []
+        for group, counts in sorted(groups.items()):
+            labels = dict(group)
+            total = 0.0
+            for bound in bounds:
+                total += counts.get(bound, 0.0)
+                samples.append((f'{self.name}_bucket', {**labels, 'le': bound}, total))
+            samples.append((f'{self.name}_sum', labels, values.get((f'{self.name}_sum', group), 0.0)))
+            samples.append((f'{self.name}_count', labels, total))
+        return samples
+
+
+def _format_value(value):
+    if value == int(value) and abs(value) < 1e15:
+        return f'{int(value)}.0'
+    return repr(float(value))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def collect():
+    """Every recorded value, summed over this process or over all the per-process files."""
+    directory = settings.METRICS_MULTIPROC_DIR
+    if directory:
+        pairs = []
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) >= 8:
+                pairs.extend((key, value) for key, value, _ in _read_entries(data))
+    else:
+        with _lock:
+            pairs = [pair for kind in ('values', 'gauge') for pair in _store(kind).items()]
+
+    values = {}
+    for key, value in pairs:
+        sample, labels = json.loads(key)
+        key = (sample, tuple(tuple(label) for label in labels))
+        values[key] = values.get(key, 0.0) + value
+    return values
+
+
+def render_metrics():
+    values = collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for sample, labels, value in metric.samples(values):
+            label_text = ','.join(f'{name}="{_escape(label)}"' for name, label in dict(labels).items())
+            lines.append(f'{sample}{{{label_text}}} {_format_value(value)}' if label_text else f'{sample} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def timed_email(kind):
+    # Observes the send time, labelled by whether the block raised
+    start = time.perf_counter()
+    result = 'failed'
+    try:
+        yield
+        result = 'sent'
+    finally:
+        EMAIL_SEND_DURATION.observe(time.perf_counter() - start, kind=kind, result=result)
+
+
+def mark_process_dead(pid, directory=None):
+    # Gauges describe live workers only; counters and histograms keep their totals
+    directory = directory or settings.METRICS_MULTIPROC_DIR
+    if directory:
+        for path in glob.glob(os.path.join(directory, f'gauge_{pid}.db')):
+            os.remove(path)
+
+
+REQUESTS = Counter('django_http_requests_total', 'Requests by URL name, method and status code.', ['view', 'method', 'status'])
+REQUEST_LATENCY = Histogram('django_http_request_duration_seconds', 'Request latency by URL name.', ['view'])
+REQUEST_QUERIES = Histogram(
+    'django_http_request_db_queries', 'SQL queries per request by URL name.', ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+REQUESTS_IN_PROGRESS = Gauge('django_http_requests_in_progress', 'Requests being served right now.')
+EMAIL_SEND_DURATION = Histogram('email_send_duration_seconds', 'Time to hand one email to the mail server.', ['kind', 'result'])
+DOFA_GENERATION_DURATION = Histogram(
+    'dofa_generation_duration_seconds', 'Time to render and store a DOFA document.',
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
@@ -0,0 +1,89 @@
+import logging
+import random
+import time
+from django.conf import settings
+from .metrics import REQUESTS, REQUEST_LATENCY, REQUEST_QUERIES, REQUESTS_IN_PROGRESS
+from .timing import RequestTiming, observe_queries
+
+logger = logging.getLogger('dashboard.performance')
+
+
+def _query_source(request):
+    # Names the slow queries of a request; resolved lazily, after URL resolution
+    return lambda: getattr(request.resolver_match, 'view_name', None) or request.path
+
+
+class RequestTimingMiddleware:
+    """
+    Measures PERF_SAMPLE_RATE of the requests: wall time, SQL queries and time, template render
+    time and dashboard cache hits. Each sample is logged as one key=value line keyed by URL name
+    and, with PERF_SERVER_TIMING_HEADER, returned in a Server-Timing header.
+    Keep it right after MetricsMiddleware so the other middleware is measured too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.PERF_SAMPLE_RATE:
+            return self.get_response(request)
+
+        timing = RequestTiming()
+        token = timing.activate()
+        try:
+            with observe_queries(_query_source(request)) as observer:
+                queries, sql_time = observer.queries, observer.sql_time
+                response = self.get_response(request)
+                timing.queries = observer.queries - queries
+                timing.sql_time = observer.sql_time - sql_time
+        finally:
+            timing.deactivate(token)
+
+        total_ms = timing.total_time * 1000
+        sql_ms = timing.sql_time * 1000
+        template_ms = timing.template_time * 1000
+        url_name = getattr(request.resolver_match, 'view_name', None) or 'unresolved'
+
+        logger.info(
+            "url_name=%s method=%s status=%s total_ms=%.1f db_queries=%d db_ms=%.1f template_ms=%.1f cache_hits=%d cache_misses=%d",
+            url_name, request.method, response.status_code, total_ms, timing.queries, sql_ms,
+            template_ms, timing.cache_hits, timing.cache_misses,
+            extra={'url_name': url_name},
+        )
+        if settings.PERF_SERVER_TIMING_HEADER:
+            metrics = ', '.join([
+                f'total;dur={total_ms:.1f}',
+                f'db;dur={sql_ms:.1f};desc="{timing.queries} queries"',
+                f'tpl;dur={template_ms:.1f}',
+                f'cache;desc="hits={timing.cache_hits} misses={timing.cache_misses}"',
+            ])
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = f'{existing}, {metrics}' if existing else metrics
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Feeds every request into the /metrics counters: latency, status and SQL queries per URL name.
+    First in MIDDLEWARE, so its QueryObserver also serves the timing and the slow-query log.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            with observe_queries(_query_source(request)) as observer:
+                response = self.get_response(request)
+            queries = observer.queries
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+
+        view = getattr(request.resolver_match, 'view_name', None) or 'unresolved'
+        REQUEST_LATENCY.observe(time.perf_counter() - start, view=view)
+        REQUEST_QUERIES.observe(queries, view=view)
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        return response
+
@@ -0,0 +1,225 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('init', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accreditationprocess',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='text_board_accreditation_processes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='answermodel',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='characteristicmodel',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='characteristicaspects',
+            name='characteristic',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aspects', to='dashboard.characteristicmodel'),
+        ),
+        migrations.AddField(
+            model_name='characteristicstrengths',
+            name='characteristic',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='strengths', to='dashboard.characteristicmodel'),
+        ),
+        migrations.AddField(
+            model_name='characteristicuploadrow',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='commentsmodel',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='answermodel',
+            name='comment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='dashboard.commentsmodel'),
+        ),
+        migrations.AddField(
+            model_name='factormodel',
+            name='last_edited_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='commentsmodel',
+            name='factor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='dashboard.factormodel'),
+        ),
+        migrations.AddField(
+            model_name='characteristicuploadrow',
+            name='factor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_rows', to='dashboard.factormodel'),
+        ),
+        migrations.AddField(
+            model_name='characteristicmodel',
+            name='factors',
+            field=models.ManyToManyField(related_name='characteristics', to='dashboard.factormodel'),
+        ),
+        migrations.AddField(
+            model_name='globalaspects',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='characteristicaspects',
+            name='global_aspect',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='dashboard.globalaspects'),
+        ),
+        migrations.AddField(
+            model_name='globalstrengths',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='characteristicstrengths',
+            name='global_strength',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='dashboard.globalstrengths'),
+        ),
+        migrations.AddField(
+            model_name='jobmodel',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Enviado por'),
+        ),
+        migrations.AddField(
+            model_name='notificationmodel',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='notificationmodel',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='permissionmodel',
+            name='roles',
+            field=models.ManyToManyField(blank=True, related_name='permissions', to='init.rolemodel'),
+        ),
+        migrations.AddField(
+            model_name='questionmodel',
+            name='answered_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='answered_questions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='questionmodel',
+            name='factor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='dashboard.factormodel'),
+        ),
+        migrations.AddField(
+            model_name='questionmodel',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='answermodel',
+            name='question',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='dashboard.questionmodel'),
+        ),
+        migrations.AddField(
+            model_name='reportmodel',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reports', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='factormodel',
+            name='report',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='factors', to='dashboard.reportmodel'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='searchdocument',
+            unique_together={('kind', 'object_id')},
+        ),
+        migrations.AddField(
+            model_name='characteristicmodel',
+            name='state',
+            field=models.ForeignKey(default=None, null=True, on_delete=django.db.models.deletion.SET_NULL, to='dashboard.states'),
+        ),
+        migrations.AddField(
+            model_name='taskmodel',
+            name='assignee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks_assigned', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='taskmodel',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks_created', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='accreditationprocess',
+            index=models.Index(fields=['created_at'], name='dashboard_a_created_fc9c30_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentsmodel',
+            index=models.Index(fields=['status'], name='dashboard_c_status_d4eba0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentsmodel',
+            index=models.Index(fields=['factor', 'created_at'], name='dashboard_c_factor__3b7bdf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentsmodel',
+            index=models.Index(fields=['created_at'], name='dashboard_c_created_f4f009_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='characteristicaspects',
+            unique_together={('characteristic', 'global_aspect')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='characteristicstrengths',
+            unique_together={('characteristic', 'global_strength')},
+        ),
+        migrations.AddIndex(
+            model_name='jobmodel',
+            index=models.Index(fields=['status', 'run_at'], name='dashboard_j_status_0bc903_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobmodel',
+            index=models.Index(fields=['status', 'updated_at'], name='dashboard_j_status_c74c41_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationlog',
+            index=models.Index(fields=['sent_at'], name='dashboard_n_sent_at_90fac1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationmodel',
+            index=models.Index(fields=['user', 'is_read', 'created_at'], name='dashboard_n_user_id_46720e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportmodel',
+            index=models.Index(fields=['status', 'created_at'], name='dashboard_r_status_e20e5e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportmodel',
+            index=models.Index(fields=['created_at'], name='dashboard_r_created_895623_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskmodel',
+            index=models.Index(fields=['assignee', 'status', 'due_date'], name='dashboard_t_assigne_373c54_idx'),
+        ),
+    ]
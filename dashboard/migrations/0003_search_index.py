@@ -0,0 +1,95 @@
+"""
+Full-text index over SearchDocument (see dashboard/search.py): a generated tsvector column with a
+GIN index on PostgreSQL, plus a pg_trgm index on the title when the extension can be installed,
+and an FTS5 table kept in sync by triggers on SQLite. Other databases search with icontains.
+Existing reports, comments, questions and characteristics are then indexed.
+"""
+from django.db import migrations, transaction
+
+TABLE = 'dashboard_searchdocument'
+FTS_TABLE = f'{TABLE}_fts'
+
+
+def _sqlite_has_fts5(cursor):
+    cursor.execute("PRAGMA compile_options")
+    return any(option == 'ENABLE_FTS5' for option, in cursor.fetchall())
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                ALTER TABLE {TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(body, '')), 'B')
+                ) STORED
+            """)
+            cursor.execute(f"CREATE INDEX {TABLE}_vector_idx ON {TABLE} USING gin (search_vector)")
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                cursor.execute(f"CREATE INDEX {TABLE}_title_trgm_idx ON {TABLE} USING gin (title gin_trgm_ops)")
+        except Exception:
+            # Needs a privileged role or the contrib package; full-text search works without it
+            pass
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            if not _sqlite_has_fts5(cursor):
+                return
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                    title, body, content='{TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER {TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+                    INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER {TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+                    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER {TABLE}_au AFTER UPDATE ON {TABLE} BEGIN
+                    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+                    INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body);
+                END
+            """)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # The pg_trgm extension may be used by other tables, so it stays
+            cursor.execute(f"DROP INDEX IF EXISTS {TABLE}_title_trgm_idx")
+            cursor.execute(f"DROP INDEX IF EXISTS {TABLE}_vector_idx")
+            cursor.execute(f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector")
+        elif connection.vendor == 'sqlite':
+            for trigger in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {TABLE}_{trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def index_existing_objects(apps, schema_editor):
+    # Uses the application's indexing code: the documents must match what dashboard.signals writes.
+    # Nothing to do on a new database, which also keeps later schema changes from reaching it there.
+    from dashboard.search import KINDS, rebuild_index
+    if any(model.objects.using(schema_editor.connection.alias).exists() for model in KINDS.values()):
+        rebuild_index()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(index_existing_objects, migrations.RunPython.noop),
+    ]
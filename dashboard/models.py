@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.conf import settings
 #import from init.models import UserModel
@@ -27,6 +27,12 @@ class ReportModel(models.Model):
     created_by = models.ForeignKey(UserModel, on_delete=models.CASCADE, related_name='reports')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),  # Report list filtered by status
+            models.Index(fields=['created_at']),  # Recent reports on the dashboards
+        ]
+
     def __str__(self):
         return f"{self.name} {self.created_by.username}"
 
@@ -39,28 +45,29 @@ class FactorModel(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     google_doc_url = models.URLField(max_length=200, blank=True, null=True)
     progress = models.IntegerField(default=0)
+    # Denormalized counters kept up to date by dashboard.signals
+    total_characteristics = models.PositiveIntegerField(default=0)
+    completed_characteristics = models.PositiveIntegerField(default=0)
     last_edited_by = models.ForeignKey(UserModel, on_delete=models.SET_NULL, null=True)
     report = models.ForeignKey(ReportModel, on_delete=models.CASCADE, related_name='factors')
     updated_at = models.DateTimeField(auto_now=True)
     end_date = models.DateField(null=True, blank=True)
 
+    COUNTER_FIELDS = ('progress', 'total_characteristics', 'completed_characteristics')
+
     @property
     def progress_percentage(self):
-        if not self.pk:
-            return 0
-        
-        total_characteristics = self.characteristics.count()
-        if total_characteristics == 0:
+        if self.total_characteristics == 0:
             return 0
-        completed_characteristics = self.characteristics.filter(state__name="Completed").count()
-        return int((completed_characteristics / total_characteristics) * 100)
+        return int((self.completed_characteristics / self.total_characteristics) * 100)
 
     def save(self, *args, **kwargs):
-        if self.pk:
-            self.progress = self.progress_percentage
-        else:
-            self.progress = 0
-
+        # The counters are only written by the signals, never from a (possibly stale) instance
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -104,6 +111,13 @@ class CommentsModel(models.Model):
     created_at = models.DateTimeField(default=timezone.now)  # Temporalmente sin auto_now_add
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status']),  # Pending approvals count
+            models.Index(fields=['factor', 'created_at']),  # Comments of a factor, newest first
+            models.Index(fields=['created_at']),  # Recent comments on the dashboards
+        ]
+
     def __str__(self):
         return self.title
 
@@ -119,15 +133,62 @@ class AnswerModel(models.Model):
 
 
 class States(models.Model):
+    IN_PROGRESS = "In Progress"
+    COMPLETED = "Completed"
+
     name = models.CharField(max_length=50, unique=True)
 
+    # The whole (tiny) table as name -> id, loaded once per process. dashboard.signals clears it
+    # when a state is saved or deleted; the standard states are created on migrate, so their ids
+    # never change while the application runs.
+    _ids = None
+    # Set while a transaction that saved or deleted a state is open: a rollback would leave a
+    # registry loaded meanwhile with ids that don't exist, so nothing is cached until it ends.
+    _uncommitted = False
+
     def __str__(self):
         return self.name
 
+    @classmethod
+    def registry(cls):
+        if cls._uncommitted and not transaction.get_connection().in_atomic_block:
+            # Committed (on_commit already cleared it) or rolled back
+            cls.clear_registry()
+        if cls._ids is not None:
+            return cls._ids
+        ids = dict(cls.objects.values_list('name', 'pk'))
+        if not cls._uncommitted:
+            cls._ids = ids
+        return ids
+
+    @classmethod
+    def clear_registry(cls):
+        cls._ids = None
+        cls._uncommitted = False
+
+    @classmethod
+    def registry_changed(cls):
+        cls.clear_registry()
+        if transaction.get_connection().in_atomic_block:
+            cls._uncommitted = True
+            transaction.on_commit(cls.clear_registry)
+
+    @classmethod
+    def id_for(cls, name):
+        pk = cls.registry().get(name)
+        if pk is None:
+            pk = cls.objects.get_or_create(name=name)[0].pk
+        return pk
+
+    @classmethod
+    def name_for(cls, pk):
+        return next((name for name, state_id in cls.registry().items() if state_id == pk), None)
+
 class GlobalStrengths(models.Model):
     name = models.CharField(max_length=200, unique=True)
     created_by = models.ForeignKey(UserModel, on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -136,6 +197,7 @@ class GlobalAspects(models.Model):
     name = models.CharField(max_length=200, unique=True)
     created_by = models.ForeignKey(UserModel, on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -152,12 +214,28 @@ class CharacteristicModel(models.Model):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.state:  # Si es la primera vez que se guarda
-            self.state, created = States.objects.get_or_create(name="In Progress")
+        if not self.state_id:  # Si es la primera vez que se guarda
+            self.state_id = States.id_for(States.IN_PROGRESS)
         super().save(*args, **kwargs)
 
+    # State checks compare ids from the States registry instead of loading the state row
+    @property
+    def state_name(self):
+        return States.name_for(self.state_id) if self.state_id else States.IN_PROGRESS
+
+    @property
+    def is_completed(self):
+        return self.state_id is not None and self.state_id == States.id_for(States.COMPLETED)
+
+    @property
+    def is_in_progress(self):
+        return self.state_id == States.id_for(States.IN_PROGRESS)
+
     @property
     def has_strengths_and_aspects(self):
+        # CharacteristicManageView annotates both flags so listing doesn't query per row
+        if hasattr(self, 'has_strengths') and hasattr(self, 'has_aspects'):
+            return self.has_strengths and self.has_aspects
         return self.strengths.exists() and self.aspects.exists()
 
 class CharacteristicStrengths(models.Model):
@@ -183,6 +261,10 @@ class NotificationModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        # Serves the navbar: latest notifications of a user and their unread count
+        indexes = [models.Index(fields=['user', 'is_read', 'created_at'])]
+
     def __str__(self):
         return f"{self.title} - {self.created_by}"
     
@@ -200,6 +282,10 @@ class TaskModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # A user's open tasks by due date
+        indexes = [models.Index(fields=['assignee', 'status', 'due_date'])]
+
     def __str__(self):
         return f"{self.title} - Assigned to {self.assignee.username}"
     
@@ -214,6 +300,9 @@ class NotificationLog(models.Model):
     class Meta:
         verbose_name = "Registro de Notificación"
         verbose_name_plural = "Registros de Notificaciones"
+        indexes = [
+            models.Index(fields=['sent_at']),  # Notification history, newest first
+        ]
 
 class AccreditationProcess(models.Model):
     STATUS_CHOICES = [
@@ -238,5 +327,71 @@ class AccreditationProcess(models.Model):
         related_name='text_board_accreditation_processes'
     )
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at'])]  # latest('created_at')
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class JobModel(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    task = models.CharField(max_length=200)  # Dotted path of the function to run
+    payload = models.JSONField(default=dict)  # Keyword arguments for the task
+    key = models.CharField(max_length=200, blank=True, db_index=True)  # Deduplicates identical pending jobs
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_by = models.ForeignKey(UserModel, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+            models.Index(fields=['status', 'updated_at']),  # Purge of finished jobs
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
+
+
+class SearchDocument(models.Model):
+    # One row per searchable object, kept current by dashboard.signals. The full-text index over
+    # these rows is database specific and is created by migration 0003_search_index.
+    kind = models.CharField(max_length=20)  # report, comment, question or characteristic
+    object_id = models.PositiveIntegerField()
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=200, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+
+class CharacteristicUploadRow(models.Model):
+    # A validated CSV row waiting for the user to confirm the upload; see dashboard.uploads
+    upload_id = models.UUIDField(db_index=True)
+    factor = models.ForeignKey(FactorModel, on_delete=models.CASCADE, related_name='upload_rows')
+    created_by = models.ForeignKey(UserModel, on_delete=models.CASCADE)
+    line = models.PositiveIntegerField()  # Line in the CSV file, for ordering and error messages
+    title = models.CharField(max_length=100)
+    description = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.upload_id} line {self.line}: {self.title}"
+
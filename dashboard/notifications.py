@@ -0,0 +1,157 @@
+import csv
+import io
+import re
+import time
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMessage, get_connection
+from django.core.validators import validate_email
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from .jobs import enqueue
+from .models import NotificationLog, NotificationModel, UserModel
+from .metrics import timed_email
+from .timing import record_cache_lookup
+
+NOTIFIED_ROLES = ['program director', 'acadi', 'common']
+SUMMARY_CACHE_PREFIX = 'notification-summary'
+SUMMARY_SIZE = 6
+
+
+def _summary_key(user_id):
+    return f'{SUMMARY_CACHE_PREFIX}:{user_id}'
+
+
+def notification_summary(user_id):
+    """
+    Latest notifications of a user and their unread count, as the navbar shows them. Computed
+    with a single query and cached per user until a notification of theirs changes.
+    """
+    key = _summary_key(user_id)
+    summary = cache.get(key)
+    record_cache_lookup(summary is not None)
+    if summary is None:
+        unread = (
+            NotificationModel.objects.filter(user=OuterRef('user'), is_read=False)
+            .values('user').annotate(count=Count('pk')).values('count')
+        )
+        latest = list(
+            NotificationModel.objects.filter(user_id=user_id)
+            .select_related('created_by')
+            .only('title', 'is_read', 'created_at', 'user_id', 'created_by__username')
+            .annotate(unread_count=Subquery(unread))
+            .order_by('-created_at')[:SUMMARY_SIZE]
+        )
+        summary = {
+            'notifications': latest,
+            'unread_notifications_count': (latest[0].unread_count or 0) if latest else 0,
+        }
+        cache.set(key, summary, settings.NOTIFICATION_SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_notification_summaries(user_ids):
+    # Deferred to commit so a concurrent request can't cache the rows being replaced
+    keys = [_summary_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def create_notifications(title, created_by_id, user_ids, batch_size=None):
+    # One INSERT per batch instead of one per user
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    created = 0
+    batch = []
+    with transaction.atomic():
+        for user_id in user_ids:
+            batch.append(NotificationModel(title=title, user_id=user_id, created_by_id=created_by_id))
+            if len(batch) == batch_size:
+                NotificationModel.objects.bulk_create(batch)
+                invalidate_notification_summaries(n.user_id for n in batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            NotificationModel.objects.bulk_create(batch)
+            invalidate_notification_summaries(n.user_id for n in batch)
+            created += len(batch)
+    return created
+
+
+def notify_roles(title, created_by_id, roles=NOTIFIED_ROLES):
+    user_ids = UserModel.objects.filter(role__name__in=roles).order_by('pk').values_list('pk', flat=True)
+    return create_notifications(title, created_by_id, user_ids.iterator(chunk_size=settings.NOTIFICATION_BATCH_SIZE))
+
+
+def schedule_role_notifications(title, created_by_id, roles=NOTIFIED_ROLES):
+    # Runs once the surrounding transaction commits, so a rolled back report notifies nobody
+    def fan_out():
+        if settings.NOTIFICATION_FANOUT_ASYNC:
+            # A job survives worker restarts and is retried, unlike a thread in the web process
+            enqueue(notify_roles, title=title, created_by_id=created_by_id, roles=list(roles))
+        else:
+            notify_roles(title, created_by_id, roles)
+
+    transaction.on_commit(fan_out)
+
+
+class RecipientsFileError(Exception):
+    """The recipients CSV can't be read (not UTF-8, malformed)."""
+
+
+def parse_recipients(text, csv_file=None):
+    """
+    Splits the textarea on commas, semicolons and whitespace and reads the 'email' column (or
+    the first column) of an optional CSV upload, streaming it. Returns (valid, invalid) lists
+    without duplicates, in input order. Raises RecipientsFileError if the CSV can't be read.
+    """
+    candidates = re.split(r'[\s,;]+', text or '')
+    if csv_file is not None:
+        try:
+            rows = csv.reader(io.TextIOWrapper(csv_file, encoding='utf-8-sig', newline=''))
+            header = next(rows, [])
+            column = next((i for i, name in enumerate(header) if name.strip().lower() == 'email'), None)
+            if column is None:
+                candidates.extend(header[:1])
+                column = 0
+            candidates.extend(row[column] for row in rows if len(row) > column)
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise RecipientsFileError(f"The recipients file could not be read as a UTF-8 CSV: {e}")
+
+    valid, invalid = [], []
+    for candidate in dict.fromkeys(c.strip() for c in candidates if c.strip()):
+        try:
+            validate_email(candidate)
+            valid.append(candidate)
+        except ValidationError:
+            invalid.append(candidate)
+    return valid, invalid
+
+
+def send_accreditation_invitations(recipients, start_date, created_by_id):
+    """
+    Background job: every invitation goes over a single SMTP session, EMAIL_BATCH_SIZE messages
+    at a time with EMAIL_BATCH_DELAY seconds between batches. Failures are reported per
+    recipient instead of raising, so a retry never sends duplicates; only a failure to open the
+    connection (nothing sent yet) raises and is retried by the worker.
+    """
+    subject = 'Convocatoria al Proceso de Acreditación'
+    body = f"Usted ha sido convocado a hacer parte del proceso de acreditaciones, que inicia el {start_date}."
+    sent, failed = [], {}
+
+    with get_connection(fail_silently=False) as connection:
+        for start in range(0, len(recipients), settings.EMAIL_BATCH_SIZE):
+            if start:
+                time.sleep(settings.EMAIL_BATCH_DELAY)
+            for recipient in recipients[start:start + settings.EMAIL_BATCH_SIZE]:
+                message = EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient], connection=connection)
+                try:
+                    with timed_email('invitation'):
+                        connection.send_messages([message])
+                    sent.append(recipient)
+                except Exception as e:
+                    failed[recipient] = str(e)
+
+    NotificationLog.objects.bulk_create([
+        NotificationLog(recipient=recipient, created_by_id=created_by_id) for recipient in sent
+    ])
+    return {'sent': sent, 'failed': failed}
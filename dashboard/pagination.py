@@ -0,0 +1,161 @@
+"""
+Keyset (cursor) pagination. A page is fetched with a WHERE on the ordering columns of the last row
+shown instead of an OFFSET, so every page costs one indexed range read however deep it is. The
+ordering must end in a unique column (usually id) so rows with equal sort values are never skipped.
+
+Cursors are opaque, URL-safe strings. Totals are optional and capped at COUNT_LIMIT rows, so a
+large table is never counted in full.
+"""
+import base64
+import json
+import datetime
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+
+COUNT_LIMIT = 1000
+
+
+def _json_default(value):
+    # Full isoformat: DjangoJSONEncoder drops microseconds, which would skip rows on the next page
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} can't be used in a cursor")
+
+
+def encode_cursor(direction, values):
+    payload = json.dumps([direction, values], default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        direction, values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise InvalidPage("Invalid cursor.")
+    if direction not in ('next', 'previous') or not isinstance(values, list):
+        raise InvalidPage("Invalid cursor.")
+    return direction, values
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return encode_cursor('next', self.paginator.key_values(self.object_list[-1]))
+        return ''
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return encode_cursor('previous', self.paginator.key_values(self.object_list[0]))
+        return ''
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def key_values(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+    def _clean(self, values):
+        # Cursors come from the URL: convert each value with its field so a tampered one is a 404, not a 500
+        if len(values) != len(self.fields):
+            raise InvalidPage("Invalid cursor.")
+        opts = self.queryset.model._meta
+        try:
+            values = [opts.get_field(name).to_python(value) for name, value in zip(self.fields, values)]
+        except (ValidationError, ValueError, TypeError):
+            raise InvalidPage("Invalid cursor.")
+        if None in values:
+            raise InvalidPage("Invalid cursor.")
+        return values
+
+    def _after(self, values, ordering):
+        # (a, b) > (x, y) expanded to a > x OR (a = x AND b > y), each column in its own direction
+        condition = Q()
+        for position, (field, value) in enumerate(zip(ordering, values)):
+            name = field.lstrip('-')
+            step = Q(**{f"{name}__{'lt' if field.startswith('-') else 'gt'}": value})
+            for previous, previous_value in zip(ordering[:position], values):
+                step &= Q(**{previous.lstrip('-'): previous_value})
+            condition |= step
+        return condition
+
+    def page(self, cursor=''):
+        direction, values = decode_cursor(cursor) if cursor else ('next', None)
+        if values is not None:
+            values = self._clean(values)
+        ordering = self.ordering
+        if direction == 'previous':
+            ordering = tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, ordering))
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == 'previous':
+            rows.reverse()
+            return KeysetPage(rows, self, has_next=True, has_previous=more)
+        return KeysetPage(rows, self, has_next=more, has_previous=values is not None)
+
+    @property
+    def count(self):
+        """Number of rows, up to COUNT_LIMIT; see count_capped."""
+        if not hasattr(self, '_count'):
+            self._count = self.queryset.order_by()[:COUNT_LIMIT + 1].count()
+        return min(self._count, COUNT_LIMIT)
+
+    @property
+    def count_capped(self):
+        return self.count == COUNT_LIMIT and self._count > COUNT_LIMIT
+
+
+class KeysetPaginationMixin:
+    """ListView pagination by cursor; paginate_by as usual, ordered by keyset_ordering."""
+    keyset_ordering = ('-created_at', '-id')
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg, ''))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+def paginate_by_cursor(request, queryset, per_page, ordering=('-created_at', '-id')):
+    """Function-view counterpart of KeysetPaginationMixin."""
+    paginator = KeysetPaginator(queryset, per_page, ordering)
+    try:
+        return paginator.page(request.GET.get('cursor', ''))
+    except InvalidPage as e:
+        raise Http404(str(e))
@@ -0,0 +1,92 @@
+"""
+Role permissions. The PermissionModel/RoleModel matrix seeded in dashboard.signals is compiled
+once per process into an immutable map of role name -> frozenset of permission names, which
+dashboard.signals clears whenever a permission, a role or a link between them changes. Checks
+and the template flags then cost no queries beyond loading the user's role.
+"""
+from functools import wraps
+from types import MappingProxyType
+from django.core.exceptions import PermissionDenied
+from .models import PermissionModel
+
+NO_PERMISSIONS = frozenset()
+NO_FLAGS = MappingProxyType({})
+
+# (matrix, flags), replaced as a whole so readers never see one without the other
+_compiled = None
+
+
+def _compile():
+    grants = {}
+    links = PermissionModel.roles.through.objects.values_list('rolemodel__name', 'permissionmodel__name')
+    for role, permission in links:
+        grants.setdefault(role, set()).add(permission)
+    # Roles are looked up by name, as the rest of the application does
+    matrix = MappingProxyType({role: frozenset(names) for role, names in grants.items()})
+    flags = MappingProxyType({role: MappingProxyType(dict.fromkeys(names, True)) for role, names in grants.items()})
+    return matrix, flags
+
+
+def _compiled_permissions():
+    global _compiled
+    compiled = _compiled
+    if compiled is None:
+        compiled = _compiled = _compile()
+    return compiled
+
+
+def permission_matrix():
+    return _compiled_permissions()[0]
+
+
+def clear_permission_matrix():
+    global _compiled
+    _compiled = None
+
+
+def _role_name(user):
+    role = getattr(user, 'role', None) if user.is_authenticated else None
+    return role.name if role else None
+
+
+def user_permissions(user):
+    return permission_matrix().get(_role_name(user), NO_PERMISSIONS)
+
+
+def has_permission(user, permission):
+    return permission in user_permissions(user)
+
+
+def capability_flags(user):
+    """Read-only {permission: True} for templates: {% if can.write_report %}."""
+    return _compiled_permissions()[1].get(_role_name(user), NO_FLAGS)
+
+
+def requires_permission(permission, denied=None):
+    """
+    View decorator. Without the permission the view returns denied(request, *args, **kwargs),
+    or raises PermissionDenied when no denied handler is given.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if has_permission(request.user, permission):
+                return view(request, *args, **kwargs)
+            if denied is not None:
+                return denied(request, *args, **kwargs)
+            raise PermissionDenied
+        return wrapper
+    return decorator
+
+
+class RequiresPermissionMixin:
+    """Class-based counterpart of requires_permission; override handle_no_permission to redirect."""
+    required_permission = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if not has_permission(request.user, self.required_permission):
+            return self.handle_no_permission(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def handle_no_permission(self, request, *args, **kwargs):
+        raise PermissionDenied
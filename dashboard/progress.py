@@ -0,0 +1,44 @@
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan
+from .models import CharacteristicModel, FactorModel, States
+
+
+def _progress_expression(total, completed):
+    return Case(When(GreaterThan(total, 0), then=completed * 100 / total), default=Value(0))
+
+
+def shift_factor_counters(factors, total=0, completed=0):
+    # Single UPDATE relative to the stored values, so concurrent requests never lose increments
+    new_total = F('total_characteristics') + total
+    new_completed = F('completed_characteristics') + completed
+    return factors.update(
+        total_characteristics=new_total,
+        completed_characteristics=new_completed,
+        progress=_progress_expression(new_total, new_completed),
+    )
+
+
+def completed_characteristics_count(characteristic_ids):
+    return CharacteristicModel.objects.filter(pk__in=characteristic_ids, state_id=States.id_for(States.COMPLETED)).count()
+
+
+def completed_state_ids(state_ids):
+    completed = States.id_for(States.COMPLETED)
+    return {pk for pk in state_ids if pk == completed}
+
+
+def rebuild_factor_counters():
+    # Recomputes every factor in one set-based UPDATE with correlated subqueries
+    links = CharacteristicModel.factors.through.objects.filter(
+        factormodel=OuterRef('pk')
+    ).order_by().values('factormodel')
+    total = Coalesce(Subquery(links.annotate(n=Count('pk')).values('n')), Value(0))
+    completed = Coalesce(Subquery(
+        links.filter(characteristicmodel__state_id=States.id_for(States.COMPLETED)).annotate(n=Count('pk')).values('n')
+    ), Value(0))
+    return FactorModel.objects.update(
+        total_characteristics=total,
+        completed_characteristics=completed,
+        progress=_progress_expression(total, completed),
+    )
@@ -0,0 +1,194 @@
+"""
+Ranked search over reports, comments, questions and characteristics.
+
+Every searchable object has a SearchDocument row, kept current by dashboard.signals. The full-text
+index over those rows depends on the database and is created by migration 0003_search_index:
+
+- PostgreSQL: a generated tsvector column with a GIN index, plus a pg_trgm GIN index on the title
+  for misspelled words when the extension can be installed.
+- SQLite: an FTS5 table kept in sync by triggers, for local and test runs.
+- Anything else: a plain icontains scan.
+"""
+import re
+from django.db import connection, transaction
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from .bulk import bulk_insert
+from .models import CharacteristicModel, CommentsModel, QuestionModel, ReportModel, SearchDocument
+
+KINDS = {
+    'report': ReportModel,
+    'comment': CommentsModel,
+    'question': QuestionModel,
+    'characteristic': CharacteristicModel,
+}
+DOCUMENT_FIELDS = ['kind', 'object_id', 'title', 'body', 'url', 'updated_at']
+TABLE = SearchDocument._meta.db_table
+FTS_TABLE = f'{TABLE}_fts'
+
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())[:10]
+
+
+def document_for(instance):
+    if isinstance(instance, ReportModel):
+        return 'report', instance.name, f"{instance.description} {instance.created_by.username}", reverse('view-report', args=[instance.pk])
+    if isinstance(instance, CommentsModel):
+        return 'comment', instance.title, instance.content, reverse('comment-detail', args=[instance.pk])
+    if isinstance(instance, QuestionModel):
+        return 'question', instance.title, f"{instance.description} {instance.answer}", reverse('question-manage', args=[instance.factor_id])
+    # Linked to its first factor; saved before its factors are added, so re-indexed on m2m_changed
+    factor_ids = sorted(factor.pk for factor in instance.factors.all()) if instance.pk else []
+    url = reverse('characteristic-manage', args=[factor_ids[0]]) if factor_ids else ''
+    return 'characteristic', instance.title, instance.description, url
+
+
+def index_object(instance):
+    kind, title, body, url = document_for(instance)
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=instance.pk, defaults={'title': title[:200], 'body': body, 'url': url},
+    )
+
+
+def remove_object(instance):
+    kind = next(kind for kind, model in KINDS.items() if isinstance(instance, model))
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def _documents(querysets):
+    for queryset in querysets:
+        for instance in queryset.iterator(chunk_size=1000):
+            kind, title, body, url = document_for(instance)
+            yield SearchDocument(kind=kind, object_id=instance.pk, title=title[:200], body=body, url=url)
+
+
+def rebuild_index():
+    """Re-creates every SearchDocument; for rows written with bulk_create or before the index existed."""
+    querysets = [
+        ReportModel.objects.select_related('created_by'),
+        CommentsModel.objects.all(),
+        QuestionModel.objects.all(),
+        CharacteristicModel.objects.prefetch_related('factors'),
+    ]
+    total = sum(queryset.count() for queryset in querysets)
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        # Streamed: bulk_insert writes each chunk as the querysets are iterated
+        bulk_insert(SearchDocument, _documents(querysets), DOCUMENT_FIELDS, total)
+    return total
+
+
+def index_new_characteristics(characteristics, factor, total):
+    """Indexes (pk, title, description) tuples of characteristics just linked to factor only."""
+    url = reverse('characteristic-manage', args=[factor.pk])
+    documents = (
+        SearchDocument(kind='characteristic', object_id=pk, title=title[:200], body=description, url=url)
+        for pk, title, description in characteristics
+    )
+    return bulk_insert(SearchDocument, documents, DOCUMENT_FIELDS, total)
+
+
+class SimpleSearchBackend:
+    def matching(self, query):
+        queryset = SearchDocument.objects.all()
+        for term in _terms(query):
+            queryset = queryset.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        return queryset
+
+    def ranked(self, query):
+        return self.matching(query).order_by('-updated_at')
+
+
+class PostgresSearchBackend(SimpleSearchBackend):
+    def __init__(self):
+        self.trigram = None
+
+    def has_trigram(self):
+        if self.trigram is None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+                self.trigram = cursor.fetchone()[0]
+        return self.trigram
+
+    def _tsquery(self, query):
+        # Prefix match on every word: "acred auto" finds "acreditación autoevaluación"
+        return ' & '.join(f'{term}:*' for term in _terms(query))
+
+    def matching(self, query):
+        tsquery = self._tsquery(query)
+        if not tsquery:
+            return SearchDocument.objects.none()
+        # search_vector is the generated column of the migration, unknown to the model
+        if self.has_trigram():
+            condition = RawSQL(
+                "(search_vector @@ to_tsquery('simple', %s) OR title %% %s)", [tsquery, query], output_field=BooleanField(),
+            )
+        else:
+            condition = RawSQL("search_vector @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        return SearchDocument.objects.filter(condition)
+
+    def ranked(self, query):
+        rank = "ts_rank(search_vector, to_tsquery('simple', %s))"
+        params = [self._tsquery(query)]
+        if self.has_trigram():
+            rank = f"({rank} + similarity(title, %s))"
+            params.append(query)
+        return self.matching(query).annotate(rank=RawSQL(rank, params, output_field=FloatField())).order_by('-rank', '-updated_at')
+
+
+class SQLiteSearchBackend(SimpleSearchBackend):
+    def _match(self, query):
+        return ' '.join(f'"{term}"*' for term in _terms(query))
+
+    def matching(self, query):
+        match = self._match(query)
+        if not match:
+            return SearchDocument.objects.none()
+        return SearchDocument.objects.filter(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+
+    def ranked(self, query):
+        match = self._match(query)
+        if not match:
+            return SearchDocument.objects.none()
+        # bm25() is lower for better matches; the title weighs ten times the body
+        rank = RawSQL(
+            f'(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {TABLE}.id)',
+            [match], output_field=FloatField(),
+        )
+        return self.matching(query).annotate(rank=rank).order_by('-rank', '-updated_at')
+
+
+def _sqlite_has_fts5():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(option == 'ENABLE_FTS5' for option, in cursor.fetchall())
+
+
+_backends = {}
+
+
+def get_backend():
+    backend = _backends.get(connection.vendor)
+    if backend is None:
+        if connection.vendor == 'postgresql':
+            backend = PostgresSearchBackend()
+        elif connection.vendor == 'sqlite' and _sqlite_has_fts5():
+            backend = SQLiteSearchBackend()
+        else:
+            backend = SimpleSearchBackend()
+        _backends[connection.vendor] = backend
+    return backend
+
+
+def matching_ids(query, kind):
+    """object_id of every match of one kind, as a subquery for filtering that model."""
+    return get_backend().matching(query).filter(kind=kind).values('object_id')
+
+
+def search(query, kinds=None, limit=50):
+    results = get_backend().ranked(query)
+    if kinds:
+        results = results.filter(kind__in=kinds)
+    return list(results[:limit])
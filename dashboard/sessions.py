@@ -0,0 +1,84 @@
+"""
+Session engine (SESSION_ENGINE = 'dashboard.sessions'). Sessions are read through the cache and
+stored in the database, as with django.contrib.sessions.backends.cached_db, with two changes:
+
+- A save that would write back the data the session was loaded with is skipped, so requests that
+  mark the session modified without changing it cost no database write.
+- A session larger than SESSION_MAX_SIZE bytes once encoded is rejected with SessionTooLarge (a 400
+  response) instead of being written; large payloads belong in their own table, as uploads do.
+
+The cache must be shared by every process: with a per-process cache a session flushed or cycled
+in one process (logout, password reset) would still be served by the others, so check_session_cache
+refuses to start in that case. Expired rows are deleted in batches by `python manage.py
+purge_sessions` and by clearsessions.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured, SuspiciousOperation
+from django.utils import timezone
+
+PURGE_BATCH_SIZE = 1000
+
+
+class SessionTooLarge(SuspiciousOperation):
+    pass
+
+
+def check_session_cache():
+    if settings.SESSION_ENGINE == __name__ and not settings.SHARED_CACHE:
+        backend = settings.CACHES['default']['BACKEND']
+        raise ImproperlyConfigured(
+            f"SESSION_ENGINE '{__name__}' needs a cache shared by all processes, not {backend}. "
+            "Set CACHE_BACKEND or use django.contrib.sessions.backends.db."
+        )
+
+
+def purge_expired_sessions(batch_size=PURGE_BATCH_SIZE):
+    """Deletes expired sessions batch_size rows at a time, so no single DELETE locks the table for long."""
+    deleted = 0
+    while True:
+        keys = list(
+            Session.objects.filter(expire_date__lt=timezone.now()).values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            return deleted
+        deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+
+
+class SessionStore(CachedDBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded = None
+
+    def _serialize(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        data = super().load()
+        self._loaded = self._serialize(data)
+        return data
+
+    def save(self, must_create=False):
+        # SESSION_SAVE_EVERY_REQUEST saves unchanged sessions on purpose, to push their expiry back
+        unchanged = (
+            not must_create and self.session_key is not None and self._loaded is not None
+            and not settings.SESSION_SAVE_EVERY_REQUEST
+            and self._serialize(self._get_session()) == self._loaded
+        )
+        if unchanged:
+            return
+        super().save(must_create)
+        self._loaded = self._serialize(self._session)
+
+    def create_model_instance(self, data):
+        obj = super().create_model_instance(data)
+        if len(obj.session_data) > settings.SESSION_MAX_SIZE:
+            raise SessionTooLarge(
+                f"Session of {len(obj.session_data)} bytes exceeds SESSION_MAX_SIZE ({settings.SESSION_MAX_SIZE})."
+            )
+        return obj
+
+    @classmethod
+    def clear_expired(cls):
+        purge_expired_sessions()
@@ -1,8 +1,14 @@
-from django.db.models.signals import post_migrate, post_save
+from django.db.models.signals import post_migrate, post_save, post_delete, post_init, pre_delete, m2m_changed
 from django.dispatch import receiver
-from django.db import connection
+from django.db import connection, transaction
 from django.apps import apps
-from .models import ReportModel, NotificationModel, UserModel
+from .models import ReportModel, UserModel, CharacteristicModel, FactorModel, CommentsModel, NotificationModel, QuestionModel, States, PermissionModel
+from .progress import shift_factor_counters, completed_characteristics_count, completed_state_ids
+from .stats import invalidate_stats
+from .notifications import schedule_role_notifications, invalidate_notification_summaries
+from .search import index_object, remove_object
+from .permissions import clear_permission_matrix
+from init.models import RoleModel
 
 @receiver(post_migrate)
 def setup_permissions(sender, **kwargs):
@@ -27,6 +33,17 @@ def setup_permissions(sender, **kwargs):
                 {"name": "write_comment", "description": "Puede escribir comentarios"},
                 {"name": "update_comment", "description": "Puede actualizar comentarios"},
                 {"name": "manage_characteristics", "description": "Puede gestionar características"},
+                {"name": "edit_characteristics", "description": "Puede crear, editar y completar características"},
+                {"name": "review_comments", "description": "Puede revisar comentarios"},
+                {"name": "manage_factors", "description": "Puede editar factores"},
+                {"name": "manage_questions", "description": "Puede crear preguntas"},
+                {"name": "assign_roles", "description": "Puede asignar roles"},
+                {"name": "remove_roles", "description": "Puede quitar roles"},
+                {"name": "assign_tasks", "description": "Puede asignar tareas"},
+                {"name": "send_notifications", "description": "Puede enviar convocatorias"},
+                {"name": "start_accreditation", "description": "Puede iniciar procesos de acreditación"},
+                {"name": "generate_dofa", "description": "Puede generar el documento DOFA"},
+                {"name": "view_admin_dashboard", "description": "Puede ver el panel de administración"},
             ]
             for perm in permissions:
                 PermissionModel.objects.get_or_create(name=perm["name"], defaults={"description": perm["description"]})
@@ -37,13 +54,20 @@ def setup_permissions(sender, **kwargs):
                     'read_report', 'write_report', 'update_report',
                     'read_template', 'write_template', 'update_template',
                     'read_comment', 'write_comment', 'update_comment',
-                    'manage_characteristics'
+                    'manage_characteristics', 'edit_characteristics',
+                    'review_comments', 'manage_factors', 'manage_questions',
+                    'assign_roles', 'remove_roles', 'assign_tasks',
+                    'send_notifications', 'start_accreditation', 'generate_dofa',
+                    'view_admin_dashboard'
                 ],
                 'program director': [
                     'read_report', 'write_report',
                     'read_template', 'write_template',
                     'read_comment', 'write_comment',
-                    'manage_characteristics'
+                    'manage_characteristics',
+                    'review_comments', 'manage_factors',
+                    'assign_roles', 'assign_tasks',
+                    'view_admin_dashboard'
                 ],
                 'common': [
                     'read_report',
@@ -61,9 +85,153 @@ def setup_permissions(sender, **kwargs):
 @receiver(post_save, sender=ReportModel)
 def create_notification_for_admins(sender, instance, created, **kwargs):
     if created:
-        for user in UserModel.objects.filter(role__name__in=['program director', 'acadi', 'common']):
-            NotificationModel.objects.create(
-                title=f"Report created: {instance.name}",
-                user=user,
-                created_by=instance.created_by
-            )
\ No newline at end of file
+        schedule_role_notifications(f"Report created: {instance.name}", instance.created_by_id)
+
+
+# Factor progress counters
+
+@receiver(post_init, sender=CharacteristicModel)
+def remember_characteristic_state(sender, instance, **kwargs):
+    # Read from __dict__ so deferred loads (.only()) don't trigger a query
+    instance._loaded_state_id = instance.__dict__.get('state_id')
+
+@receiver(post_save, sender=CharacteristicModel)
+def update_progress_on_state_change(sender, instance, created, **kwargs):
+    previous_state_id = getattr(instance, '_loaded_state_id', None)
+    instance._loaded_state_id = instance.state_id
+    if created or previous_state_id == instance.state_id:
+        return
+
+    completed_ids = completed_state_ids([previous_state_id, instance.state_id])
+    was_completed = previous_state_id in completed_ids
+    is_completed = instance.state_id in completed_ids
+    if was_completed == is_completed:
+        return
+    shift_factor_counters(
+        FactorModel.objects.filter(characteristics=instance),
+        completed=1 if is_completed else -1,
+    )
+
+@receiver(pre_delete, sender=CharacteristicModel)
+def update_progress_on_characteristic_delete(sender, instance, **kwargs):
+    completed = completed_characteristics_count([instance.pk])
+    shift_factor_counters(
+        FactorModel.objects.filter(characteristics=instance),
+        total=-1,
+        completed=-completed,
+    )
+
+@receiver(m2m_changed, sender=CharacteristicModel.factors.through)
+def update_progress_on_factor_link(sender, instance, action, reverse, pk_set, **kwargs):
+    related = instance.characteristics if reverse else instance.factors
+
+    if action in ('pre_remove', 'pre_clear'):
+        # remove() reports the requested ids and clear() reports none, so keep only the links that exist
+        linked = related.all()
+        if action == 'pre_remove':
+            linked = linked.filter(pk__in=pk_set)
+        instance._unlinked_pks = set(linked.values_list('pk', flat=True))
+        return
+
+    if action == 'post_add':
+        sign = 1
+    elif action in ('post_remove', 'post_clear'):
+        sign = -1
+        pk_set = instance.__dict__.pop('_unlinked_pks', set())
+    else:
+        return
+
+    if not pk_set:
+        return
+
+    if reverse:
+        # instance is a factor and pk_set holds characteristic ids
+        shift_factor_counters(
+            FactorModel.objects.filter(pk=instance.pk),
+            total=sign * len(pk_set),
+            completed=sign * completed_characteristics_count(pk_set),
+        )
+    else:
+        # instance is a characteristic and pk_set holds factor ids
+        shift_factor_counters(
+            FactorModel.objects.filter(pk__in=pk_set),
+            total=sign,
+            completed=sign * completed_characteristics_count([instance.pk]),
+        )
+
+
+# Dashboard statistics cache (invalidated after commit so a concurrent read can't cache stale counts)
+
+def invalidate_stats_on_commit(*names):
+    transaction.on_commit(lambda: invalidate_stats(*names))
+
+@receiver([post_save, post_delete], sender=ReportModel)
+def invalidate_report_stats(sender, **kwargs):
+    invalidate_stats_on_commit('reports')
+
+@receiver([post_save, post_delete], sender=CommentsModel)
+def invalidate_comment_stats(sender, **kwargs):
+    invalidate_stats_on_commit('comments')
+
+@receiver([post_save, post_delete], sender=UserModel)
+def invalidate_user_stats(sender, **kwargs):
+    invalidate_stats_on_commit('users')
+
+
+# Navbar notification summaries (bulk inserts and the mark-read update invalidate explicitly)
+
+@receiver([post_save, post_delete], sender=NotificationModel)
+def invalidate_notification_summary(sender, instance, **kwargs):
+    invalidate_notification_summaries([instance.user_id])
+
+
+# Search index (bulk_create skips these; run rebuild_search_index afterwards)
+
+@receiver(post_save, sender=ReportModel)
+@receiver(post_save, sender=CommentsModel)
+@receiver(post_save, sender=QuestionModel)
+@receiver(post_save, sender=CharacteristicModel)
+def index_search_document(sender, instance, **kwargs):
+    index_object(instance)
+
+@receiver(post_delete, sender=ReportModel)
+@receiver(post_delete, sender=CommentsModel)
+@receiver(post_delete, sender=QuestionModel)
+@receiver(post_delete, sender=CharacteristicModel)
+def remove_search_document(sender, instance, **kwargs):
+    remove_object(instance)
+
+@receiver(m2m_changed, sender=CharacteristicModel.factors.through)
+def reindex_characteristic_link(sender, instance, action, reverse, pk_set, **kwargs):
+    # A characteristic's result links to its first factor
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        index_object(instance)
+    elif pk_set:
+        for characteristic in CharacteristicModel.objects.filter(pk__in=pk_set):
+            index_object(characteristic)
+
+
+# States registry
+
+@receiver(post_migrate)
+def create_standard_states(sender, **kwargs):
+    if sender.name == 'dashboard' and States._meta.db_table in connection.introspection.table_names():
+        for name in (States.IN_PROGRESS, States.COMPLETED):
+            States.objects.get_or_create(name=name)
+        States.clear_registry()
+
+@receiver([post_save, post_delete], sender=States)
+def clear_states_registry(sender, **kwargs):
+    States.registry_changed()
+
+
+# Compiled role permissions
+
+@receiver(m2m_changed, sender=PermissionModel.roles.through)
+@receiver([post_save, post_delete], sender=PermissionModel)
+@receiver([post_save, post_delete], sender=RoleModel)
+def clear_compiled_permissions(sender, **kwargs):
+    clear_permission_matrix()
+
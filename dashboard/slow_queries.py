@@ -0,0 +1,78 @@
+"""
+Slow-query log. Every query slower than SLOW_QUERY_THRESHOLD_MS, as timed by
+dashboard.timing.QueryObserver, is kept with the view or job that ran it and its EXPLAIN plan (not
+its parameters), in a ring buffer of the last SLOW_QUERY_LOG_SIZE entries stored in the cache. With a shared CACHE_BACKEND the staff page and the slow_queries
+command see what every worker recorded.
+"""
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+CACHE_KEY = 'slow-queries:entries'
+_explaining = ContextVar('explaining_slow_query', default=False)
+
+
+def explaining():
+    """True while the log runs its own EXPLAIN, which must not be logged in turn."""
+    return _explaining.get()
+
+
+def explain(connection, sql, params):
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return ''
+    token = _explaining.set(True)
+    try:
+        # Savepoint so a failing EXPLAIN can't break the caller's transaction
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            # PostgreSQL returns one column per plan line, SQLite's detail is the last column
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    finally:
+        _explaining.reset(token)
+
+
+def record_slow_query(connection, sql, params, duration_ms, source):
+    # The parameters are only used for the EXPLAIN: they can hold codes, password hashes or emails
+    entry = {
+        'sql': sql,
+        'duration_ms': round(duration_ms, 2),
+        'source': source,
+        'plan': explain(connection, sql, params),
+        'recorded_at': timezone.now(),
+    }
+    # Concurrent writers may drop an entry; acceptable for a diagnostic log
+    entries = cache.get(CACHE_KEY, [])
+    entries.append(entry)
+    cache.set(CACHE_KEY, entries[-settings.SLOW_QUERY_LOG_SIZE:], None)
+
+
+def slow_queries():
+    return cache.get(CACHE_KEY, [])
+
+
+def clear_slow_queries():
+    cache.delete(CACHE_KEY)
+
+
+def worst_offenders(limit=20):
+    """Logged queries grouped by SQL text, by total time spent, each with its slowest example."""
+    groups = {}
+    for entry in slow_queries():
+        group = groups.setdefault(entry['sql'], {
+            'sql': entry['sql'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'sources': set(), 'slowest': entry,
+        })
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['sources'].add(entry['source'])
+        if entry['duration_ms'] >= group['max_ms']:
+            group['max_ms'] = entry['duration_ms']
+            group['slowest'] = entry
+    offenders = sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)[:limit]
+    for group in offenders:
+        group['total_ms'] = round(group['total_ms'], 2)
+        group['sources'] = sorted(group['sources'])
+    return offenders
@@ -0,0 +1,43 @@
+// job_status.js - Polls a background job and reloads the page once it has finished
+document.addEventListener("DOMContentLoaded", function() {
+    const container = document.getElementById("job-status");
+    if (!container) {
+        return;
+    }
+
+    const statusUrl = container.getAttribute("data-status-url");
+    const message = document.getElementById("job-status-message");
+    const spinner = document.getElementById("job-status-spinner");
+
+    function poll() {
+        fetch(statusUrl, { headers: { "Accept": "application/json" } })
+            .then(response => {
+                if (!response.ok) {
+                    // Denied or missing: polling again won't change the answer
+                    spinner.remove();
+                    message.textContent = "The job status could not be read (HTTP " + response.status + ").";
+                    return null;
+                }
+                return response.json();
+            })
+            .then(job => {
+                if (job === null) {
+                    return;
+                }
+                if (job.status === "succeeded") {
+                    // The same URL now serves the generated file
+                    spinner.remove();
+                    message.textContent = "The document is ready, the download has started.";
+                    window.location.reload();
+                } else if (job.status === "failed") {
+                    spinner.remove();
+                    message.textContent = "The document could not be generated: " + job.error;
+                } else {
+                    setTimeout(poll, 2000);
+                }
+            })
+            .catch(() => setTimeout(poll, 5000));
+    }
+
+    poll();
+});
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from .models import ReportModel, CommentsModel, UserModel
+from .timing import record_cache_lookup
+
+CACHE_PREFIX = 'dashboard-stats'
+COUNTER_KEYS = ('hits', 'misses')
+
+
+def _cache_key(name):
+    return f'{CACHE_PREFIX}:{name}'
+
+
+def _count(counter):
+    # Counters never expire; add() creates the key once and incr() is atomic on shared backends
+    key = _cache_key(counter)
+    if not cache.add(key, 1, timeout=None):
+        cache.incr(key)
+
+
+def _cached(name, compute):
+    key = _cache_key(name)
+    value = cache.get(key)
+    record_cache_lookup(value is not None)
+    if value is None:
+        _count('misses')
+        value = compute()
+        cache.set(key, value, settings.DASHBOARD_STATS_CACHE_TIMEOUT)
+    else:
+        _count('hits')
+    return value
+
+
+def invalidate_stats(*names):
+    cache.delete_many([_cache_key(name) for name in names])
+
+
+def cache_counters():
+    values = cache.get_many([_cache_key(counter) for counter in COUNTER_KEYS])
+    return {counter: values.get(_cache_key(counter), 0) for counter in COUNTER_KEYS}
+
+
+def report_stats():
+    return _cached('reports', lambda: ReportModel.objects.aggregate(
+        total_reports=Count('pk'),
+        active_count=Count('pk', filter=Q(status='active')),
+        inactive_count=Count('pk', filter=Q(status='inactive')),
+    ))
+
+
+def comment_stats():
+    return _cached('comments', lambda: CommentsModel.objects.aggregate(
+        pending_approvals=Count('pk', filter=Q(status='pending')),
+    ))
+
+
+def user_stats():
+    return _cached('users', lambda: UserModel.objects.aggregate(
+        total_users_assigned=Count('pk', filter=Q(is_superuser=False)),
+    ))
+
+
+def user_dashboard_stats():
+    return report_stats()
+
+
+def admin_dashboard_stats():
+    return {**report_stats(), **comment_stats(), **user_stats()}
@@ -1,13 +1,56 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django.utils.http import http_date
 from init.models import RoleModel
-from dashboard.models import ReportModel, FactorModel, CommentsModel, QuestionModel, CharacteristicModel, NotificationModel, TaskModel
+from dashboard.models import ReportModel, FactorModel, CommentsModel, QuestionModel, CharacteristicModel, NotificationModel, TaskModel, States
+from dashboard.models import GlobalStrengths, GlobalAspects, CharacteristicStrengths, CharacteristicAspects
 from dashboard.forms import ReportForm, FactorForm, QuestionForm, AnswerForm, CharacteristicForm, ProfileForm, TaskForm
 from django.contrib import messages
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, connection, transaction
+from importlib import import_module
+from types import SimpleNamespace
+from django.test.utils import CaptureQueriesContext
+from dashboard.stats import admin_dashboard_stats, user_dashboard_stats, cache_counters
+from dashboard.notifications import create_notifications, notification_summary, send_accreditation_invitations
+from dashboard import metrics
+from dashboard.slow_queries import slow_queries
+from dashboard.timing import observe_queries
+from dashboard.hot_queries import HOT_QUERIES, sequential_scans
+from dashboard.search import matching_ids, search
+from dashboard.pagination import COUNT_LIMIT, KeysetPaginator, encode_cursor
+from django.core.paginator import InvalidPage
+from dashboard.models import SearchDocument, CharacteristicUploadRow
+from dashboard.models import PermissionModel
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import PermissionDenied
+from django.test import RequestFactory
+from dashboard.permissions import capability_flags, has_permission, permission_matrix, requires_permission
+from django.contrib.sessions.models import Session
+from dashboard.sessions import SessionStore, SessionTooLarge, check_session_cache
+from django.core.exceptions import ImproperlyConfigured
+from dashboard.uploads import confirm_upload, purge_stale_uploads, stage_characteristics_csv
+from dashboard.dofa import dofa_fingerprint, dofa_rows
+from dashboard.jobs import enqueue, purge_finished_jobs, run_pending_jobs, secret_payload
+from init.utils import sendEmailCode
+from dashboard.models import JobModel, NotificationLog
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from unittest import mock
+import smtplib
+from django.core.cache import cache
 import io
+import os
+import shutil
+import tempfile
+import time
+import docx
+from django.conf import settings
 
 UserModel = get_user_model()
 
@@ -57,6 +100,66 @@ class AdminDashboardViewTest(TestCase):
         self.assertRedirects(response, f"{reverse('login-user')}?next={reverse('dashboard-admin')}")
         self.assertEqual(response.status_code, 302, f"Expected 302, got {response.status_code}.")
 
+    def create_reports(self, count):
+        for i in range(count):
+            report = ReportModel.objects.create(
+                name=f'Report {i}',
+                description='Test description',
+                end_date=timezone.now().date() + timezone.timedelta(days=1),
+                status='active' if i % 2 == 0 else 'inactive',
+                created_by=self.admin
+            )
+            factor = FactorModel.objects.create(name='Factor', report=report, last_edited_by=self.admin)
+            CommentsModel.objects.create(factor=factor, owner=self.admin, title='Comment', content='Content')
+
+    def test_admin_dashboard_stats_query_count(self):
+        self.create_reports(3)
+        cache.clear()
+        with self.assertNumQueries(3):
+            stats = admin_dashboard_stats()
+        with self.assertNumQueries(0):
+            user_stats = user_dashboard_stats()
+        self.assertEqual(stats, {
+            'total_reports': 3,
+            'active_count': 2,
+            'inactive_count': 1,
+            'pending_approvals': 3,
+            'total_users_assigned': 1,
+        })
+        self.assertEqual(user_stats['total_reports'], 3)
+
+    def test_admin_dashboard_view_query_count_is_flat(self):
+        # The navbar always lists the last 6 notifications, so start from a full dropdown
+        self.create_reports(6)
+        permission_matrix()  # Compiled once per process, not per request
+        cache.clear()
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('dashboard-admin'))
+        self.create_reports(14)
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(reverse('dashboard-admin'))
+        self.assertEqual(len(small), len(large), "Dashboard query count grows with data size.")
+
+    def test_admin_dashboard_stats_cache_invalidation(self):
+        cache.clear()
+        self.assertEqual(admin_dashboard_stats()['total_reports'], 0)
+        self.assertEqual(admin_dashboard_stats()['total_reports'], 0)
+        self.assertEqual(cache_counters(), {'hits': 3, 'misses': 3})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_reports(2)
+        with self.assertNumQueries(2):
+            stats = admin_dashboard_stats()
+        self.assertEqual((stats['total_reports'], stats['pending_approvals']), (2, 2))
+
+    def test_stats_cache_counters_staff_only(self):
+        response = self.client.get(reverse('dashboard-stats-cache'))
+        self.assertEqual(response.status_code, 403, f"Expected 403, got {response.status_code}.")
+        self.admin.is_staff = True
+        self.admin.save()
+        response = self.client.get(reverse('dashboard-stats-cache'))
+        self.assertEqual(set(response.json()), {'hits', 'misses'})
+
 class MarkNotificationsReadViewTest(TestCase):
     def setUp(self):
         self.user = UserModel.objects.create_user(
@@ -80,11 +183,76 @@ class MarkNotificationsReadViewTest(TestCase):
         self.assertJSONEqual(response.content, {'status': 'success'})
         self.assertTrue(NotificationModel.objects.filter(user=self.user, is_read=True).exists(), "Notifications not marked as read.")
 
+    def test_navbar_summary_is_one_query_then_cached(self):
+        cache.clear()
+        with self.assertNumQueries(1):
+            summary = notification_summary(self.user.pk)
+            [n.created_by.username for n in summary['notifications']]
+        self.assertEqual(summary['unread_notifications_count'], 1)
+        with self.assertNumQueries(0):
+            notification_summary(self.user.pk)
+
+    def test_navbar_summary_invalidated_on_read_and_create(self):
+        cache.clear()
+        self.assertEqual(notification_summary(self.user.pk)['unread_notifications_count'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('mark_notifications_read'))
+        self.assertEqual(notification_summary(self.user.pk)['unread_notifications_count'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_notifications('Bulk Notification', self.user.pk, [self.user.pk])
+        summary = notification_summary(self.user.pk)
+        self.assertEqual(summary['unread_notifications_count'], 1)
+        self.assertEqual(summary['notifications'][0].title, 'Bulk Notification')
+
     #def test_mark_notifications_read_post_unauthenticated(self):
         #self.client.logout()
         #response = self.client.post(reverse('mark_notifications_read'))
         #self.assertEqual(response.status_code, 403, f"Expected 403, got {response.status_code}.")
 
+class ReportNotificationFanOutTest(TestCase):
+    def setUp(self):
+        role = RoleModel.objects.create(name='common')
+        self.creator = UserModel.objects.create_user(
+            username='creator@u.icesi.edu.co',
+            email='creator@u.icesi.edu.co',
+            password='password@123',
+            role=role
+        )
+        UserModel.objects.bulk_create([
+            UserModel(username=f'user{i}', email=f'user{i}@u.icesi.edu.co', role=role)
+            for i in range(4)
+        ])
+
+    def create_report(self):
+        return ReportModel.objects.create(
+            name='Test Report',
+            description='Test description',
+            end_date=timezone.now().date() + timezone.timedelta(days=1),
+            created_by=self.creator
+        )
+
+    @override_settings(NOTIFICATION_BATCH_SIZE=2)
+    def test_notifications_are_bulk_inserted_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_report()
+        self.assertFalse(NotificationModel.objects.exists(), "Notifications created before commit.")
+        with CaptureQueriesContext(connection) as queries:
+            for callback in callbacks:
+                callback()
+        inserts = [q for q in queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3, "Expected one INSERT per batch of 2 for 5 users.")
+        self.assertEqual(NotificationModel.objects.filter(title='Report created: Test Report').count(), 5)
+
+    @override_settings(NOTIFICATION_FANOUT_ASYNC=True, JOBS_RUN_INLINE=False)
+    def test_async_fan_out_is_queued_as_a_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_report()
+        self.assertFalse(NotificationModel.objects.exists(), "Notifications created in the request.")
+        job = JobModel.objects.get()
+        self.assertEqual(job.task, 'dashboard.notifications.notify_roles')
+        run_pending_jobs()
+        self.assertEqual(NotificationModel.objects.filter(title='Report created: Test Report').count(), 5)
+
 class AssignRoleViewTest(TestCase):
     def setUp(self):
         self.acadi_role = RoleModel.objects.create(name='acadi')
@@ -247,6 +415,27 @@ class ReportCreateViewTest(TestCase):
         self.assertEqual(ReportModel.objects.count(), 1, "Report not created.")
         self.assertEqual(FactorModel.objects.count(), 12, "Expected 12 factors created.")
 
+    def test_report_create_inserts_factors_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('create-report'), {
+                'name': 'New Report',
+                'description': 'Test description',
+                'end_date': (timezone.now().date() + timezone.timedelta(days=1)).strftime('%Y-%m-%d'),
+                'status': 'active'
+            })
+        factor_inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "dashboard_factormodel"')]
+        self.assertEqual(len(factor_inserts), 1, "Default factors should be created with one bulk INSERT.")
+
+    @override_settings(FACTOR_TEMPLATES={'default': ['Factor 1'], 'icesi.edu.co': ['Mission', 'Students']})
+    def test_report_create_uses_institution_template(self):
+        self.client.post(reverse('create-report'), {
+            'name': 'New Report',
+            'description': 'Test description',
+            'end_date': (timezone.now().date() + timezone.timedelta(days=1)).strftime('%Y-%m-%d'),
+            'status': 'active'
+        })
+        self.assertEqual(list(FactorModel.objects.order_by('id').values_list('name', flat=True)), ['Mission', 'Students'])
+
     def test_report_create_post_invalid(self):
         response = self.client.post(reverse('create-report'), {
             'name': '',
@@ -802,6 +991,128 @@ class CharacteristicManageViewTest(TestCase):
         response = self.client.get(reverse('characteristic-manage', kwargs={'factor_id': 999}))
         self.assertEqual(response.status_code, 404, f"Expected 404, got {response.status_code}.")
 
+    def test_characteristic_manage_state_filter_and_flags(self):
+        completed = States.objects.get(name=States.COMPLETED)
+        done = CharacteristicModel.objects.create(title='Done Characteristic', state=completed)
+        done.factors.add(self.factor)
+        CharacteristicStrengths.objects.create(
+            characteristic=self.characteristic, global_strength=GlobalStrengths.objects.create(name='Strength')
+        )
+        response = self.client.get(reverse('characteristic-manage', kwargs={'factor_id': self.factor.pk}), {'state': completed.pk})
+        self.assertEqual([c.title for c in response.context['characteristics']], ['Done Characteristic'])
+        response = self.client.get(reverse('characteristic-manage', kwargs={'factor_id': self.factor.pk}))
+        listed = {c.title: c for c in response.context['characteristics']}
+        self.assertEqual(set(listed), {'Test Characteristic', 'Done Characteristic'})
+        with self.assertNumQueries(0):
+            self.assertEqual(listed['Test Characteristic'].state_name, States.IN_PROGRESS)
+            self.assertTrue(listed['Test Characteristic'].is_in_progress)
+            self.assertTrue(listed['Done Characteristic'].is_completed)
+            self.assertTrue(listed['Test Characteristic'].has_strengths)
+            self.assertFalse(listed['Test Characteristic'].has_strengths_and_aspects)
+
+    def test_characteristic_manage_is_paginated(self):
+        for i in range(30):
+            CharacteristicModel.objects.create(title=f'Extra {i}').factors.add(self.factor)
+        response = self.client.get(reverse('characteristic-manage', kwargs={'factor_id': self.factor.pk}))
+        self.assertEqual(len(response.context['characteristics']), 25)
+        page = response.context['page_obj']
+        response = self.client.get(reverse('characteristic-manage', kwargs={'factor_id': self.factor.pk}), {'cursor': page.next_cursor})
+        self.assertEqual(len(response.context['characteristics']), 6)
+
+class StatesRegistryTest(TestCase):
+    def setUp(self):
+        States.clear_registry()
+        self.addCleanup(States.clear_registry)
+
+    def test_standard_states_exist_after_migrate(self):
+        self.assertEqual(set(States.registry()), {States.IN_PROGRESS, States.COMPLETED})
+
+    def test_loaded_once_per_process(self):
+        with self.assertNumQueries(1):
+            in_progress = States.id_for(States.IN_PROGRESS)
+            self.assertEqual(States.name_for(in_progress), States.IN_PROGRESS)
+            States.id_for(States.COMPLETED)
+        with self.assertNumQueries(0):
+            States.id_for(States.COMPLETED)
+
+    def test_saving_or_deleting_a_state_clears_it(self):
+        States.registry()
+        review = States.objects.create(name='In Review')
+        self.assertEqual(States.id_for('In Review'), review.pk)
+        review.delete()
+        self.assertNotIn('In Review', States.registry())
+
+    def test_state_created_in_a_rolled_back_transaction_is_forgotten(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                States.id_for('In Review')
+                self.assertIn('In Review', States.registry())
+                raise RuntimeError
+        self.assertNotIn('In Review', States.registry())
+
+    def test_cached_again_once_the_state_is_committed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            review = States.objects.create(name='In Review')
+        with self.assertNumQueries(1):
+            self.assertEqual(States.id_for('In Review'), review.pk)
+            States.registry()
+
+    def test_creating_characteristics_does_not_query_states(self):
+        States.registry()
+        with CaptureQueriesContext(connection) as queries:
+            characteristic = CharacteristicModel.objects.create(title='Registry')
+        self.assertEqual(characteristic.state_id, States.id_for(States.IN_PROGRESS))
+        self.assertFalse([q for q in queries if 'dashboard_states' in q['sql']])
+
+class PermissionResolverTest(TestCase):
+    def setUp(self):
+        self.acadi = UserModel.objects.create_user(
+            username='acadi@u.icesi.edu.co', email='acadi@u.icesi.edu.co', password='password@123',
+            is_active=True, role=RoleModel.objects.create(name='acadi'),
+        )
+        self.common = UserModel.objects.create_user(
+            username='common@u.icesi.edu.co', email='common@u.icesi.edu.co', password='password@123',
+            is_active=True, role=RoleModel.objects.create(name='common'),
+        )
+
+    def test_compiled_once_per_process(self):
+        permission_matrix()
+        acadi = UserModel.objects.select_related('role').get(pk=self.acadi.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(has_permission(acadi, 'assign_roles'))
+            self.assertTrue(capability_flags(acadi)['review_comments'])
+            self.assertFalse(has_permission(acadi, 'no_such_permission'))
+
+    def test_changing_a_role_permission_clears_it(self):
+        permission = PermissionModel.objects.get(name='assign_roles')
+        self.assertFalse(has_permission(self.common, 'assign_roles'))
+        permission.roles.add(self.common.role)
+        self.assertTrue(has_permission(self.common, 'assign_roles'))
+        permission.roles.remove(self.common.role)
+        self.assertFalse(has_permission(self.common, 'assign_roles'))
+
+    def test_users_without_role_have_no_permissions(self):
+        user = UserModel.objects.create_user(username='norole@u.icesi.edu.co', password='password@123')
+        self.assertEqual(capability_flags(user), {})
+        self.assertFalse(has_permission(AnonymousUser(), 'write_report'))
+
+    def test_decorator_denies_without_permission(self):
+        view = requires_permission('assign_roles')(lambda request: 'ok')
+        request = RequestFactory().get('/')
+        request.user = self.acadi
+        self.assertEqual(view(request), 'ok')
+        request.user = self.common
+        with self.assertRaises(PermissionDenied):
+            view(request)
+        view = requires_permission('assign_roles', denied=lambda request: 'denied')(lambda request: 'ok')
+        self.assertEqual(view(request), 'denied')
+
+    def test_mixin_runs_the_view_handler(self):
+        self.client.login(username='common@u.icesi.edu.co', password='password@123')
+        self.assertRedirects(self.client.get(reverse('remove-role-view')), reverse('dashboard-admin'))
+        self.client.login(username='acadi@u.icesi.edu.co', password='password@123')
+        self.assertEqual(self.client.get(reverse('remove-role-view')).status_code, 200)
+
 class CharacteristicCreateViewTest(TestCase):
     def setUp(self):
         self.user = UserModel.objects.create_user(
@@ -999,6 +1310,118 @@ class CharacteristicUploadCSVViewTest(TestCase):
         self.assertEqual(len(messages_list), 1, "Expected one error message.")
         self.assertEqual(str(messages_list[0]), "Only users with role 'acadi' or 'program director' can upload characteristics.", f"Expected error message, got '{str(messages_list[0]) if messages_list else 'None'}'.")
 
+class CharacteristicUploadStagingTest(TestCase):
+    def setUp(self):
+        self.admin = UserModel.objects.create_user(
+            username='stager@u.icesi.edu.co', email='stager@u.icesi.edu.co', password='password@123',
+            role=RoleModel.objects.create(name='acadi')
+        )
+        self.client.force_login(self.admin)
+        report = ReportModel.objects.create(
+            name='Report', description='', end_date=timezone.now().date(), created_by=self.admin
+        )
+        self.factor = FactorModel.objects.create(name='Factor', report=report)
+
+    def upload(self, content):
+        return self.client.post(reverse('characteristic-upload', kwargs={'factor_id': self.factor.pk}), {
+            'csv_file': SimpleUploadedFile('upload.csv', content.encode('utf-8'), content_type='text/csv')
+        })
+
+    def test_rows_are_staged_not_kept_in_the_session(self):
+        rows = ''.join(f"Characteristic {i},Description {i}\n" for i in range(2500))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.upload("title,description\n" + rows)
+        self.assertEqual(response.context['staged_count'], 2500)
+        self.assertEqual(len(response.context['characteristics_data']), 100)
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "dashboard_characteristicuploadrow"')]
+        # Batches of 1000; SQLite further splits them to stay under its bound-parameter limit
+        self.assertLess(len(inserts), 50, "Rows should be inserted in batches.")
+        self.assertNotIn('characteristics_data', self.client.session)
+        upload_id = self.client.session['characteristic_upload_id']
+        self.assertEqual(CharacteristicUploadRow.objects.filter(upload_id=upload_id).count(), 2500)
+
+    def test_invalid_rows_are_reported_by_line(self):
+        response = self.upload("title,description\nValid,One\n,No title\n" + 'x' * 101 + ",Too long\n")
+        self.assertEqual(response.context['staged_count'], 1)
+        self.assertEqual(response.context['errors'], [(3, 'title is empty'), (4, 'title is longer than 100 characters')])
+        self.assertContains(response, 'Line 3: title is empty')
+
+    def test_missing_title_column_stages_nothing(self):
+        response = self.upload("name,description\nOne,Two\n")
+        self.assertRedirects(response, reverse('characteristic-upload', kwargs={'factor_id': self.factor.pk}))
+        self.assertFalse(CharacteristicUploadRow.objects.exists())
+
+    def test_non_utf8_file_stages_nothing(self):
+        content = ("title\n" + "Valid\n" * 1500).encode('utf-8') + "Acreditación\n".encode('latin-1')
+        response = self.client.post(reverse('characteristic-upload', kwargs={'factor_id': self.factor.pk}), {
+            'csv_file': SimpleUploadedFile('upload.csv', content, content_type='text/csv')
+        })
+        self.assertRedirects(response, reverse('characteristic-upload', kwargs={'factor_id': self.factor.pk}))
+        self.assertFalse(CharacteristicUploadRow.objects.exists())
+
+    def test_confirm_imports_and_clears_the_staged_rows(self):
+        self.upload("title,description\nFirst,One\n")
+        self.upload("title,description\nSecond,Two\nThird,Three\n")
+        response = self.client.get(reverse('characteristic-confirm', kwargs={'factor_id': self.factor.pk}))
+        self.assertRedirects(response, reverse('characteristic-manage', kwargs={'factor_id': self.factor.pk}))
+        self.assertEqual(sorted(self.factor.characteristics.values_list('title', flat=True)), ['Second', 'Third'])
+        self.assertFalse(CharacteristicUploadRow.objects.exists())
+        self.assertNotIn('characteristic_upload_id', self.client.session)
+
+    @override_settings(CHARACTERISTIC_UPLOAD_TTL=60)
+    def test_stale_uploads_are_purged(self):
+        self.upload("title\nAbandoned\n")
+        CharacteristicUploadRow.objects.update(created_at=timezone.now() - timezone.timedelta(minutes=5))
+        self.assertEqual(purge_stale_uploads(), 1)
+
+class CharacteristicBulkConfirmTest(TestCase):
+    def setUp(self):
+        self.admin = UserModel.objects.create_user(
+            username='bulk@u.icesi.edu.co', email='bulk@u.icesi.edu.co', password='password@123',
+            role=RoleModel.objects.create(name='acadi')
+        )
+        report = ReportModel.objects.create(
+            name='Report', description='', end_date=timezone.now().date(), created_by=self.admin
+        )
+        self.factor = FactorModel.objects.create(name='Factor', report=report)
+        CharacteristicModel.objects.create(title='Existing').factors.add(self.factor)
+
+    def stage(self, rows):
+        content = "title,description\n" + ''.join(f"Imported {i},Line\twith tab\n" for i in range(rows))
+        upload_id, staged, errors = stage_characteristics_csv(io.BytesIO(content.encode('utf-8')), self.factor, self.admin)
+        return upload_id
+
+    def assert_imported(self, rows):
+        imported = CharacteristicModel.objects.filter(title__startswith='Imported')
+        self.assertEqual(imported.count(), rows)
+        self.assertEqual(self.factor.characteristics.count(), rows + 1)
+        self.assertFalse(imported.exclude(state__name='In Progress').exists())
+        self.assertEqual(imported.get(title='Imported 0').description, 'Line\twith tab')
+        self.factor.refresh_from_db()
+        self.assertEqual((self.factor.total_characteristics, self.factor.completed_characteristics), (rows + 1, 0))
+        self.assertEqual(len(search('imported', kinds=['characteristic'], limit=rows + 1)), rows)
+        self.assertFalse(CharacteristicUploadRow.objects.exists())
+
+    def test_query_count_does_not_grow_per_row(self):
+        upload_id = self.stage(1200)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(confirm_upload(upload_id, self.factor, self.admin), 1200)
+        # SQLite splits each bulk_create to stay under its bound-parameter limit
+        self.assertLess(len(queries), 100 if connection.vendor == 'sqlite' else 20)
+        self.assert_imported(1200)
+
+    @override_settings(BULK_COPY_THRESHOLD=10)
+    def test_large_uploads_use_copy_on_postgresql(self):
+        upload_id = self.stage(50)
+        with CaptureQueriesContext(connection) as queries:
+            confirm_upload(upload_id, self.factor, self.admin)
+        inserted_links = [q for q in queries if 'INSERT INTO "dashboard_characteristicmodel_factors"' in q['sql']]
+        if connection.vendor == 'postgresql':
+            self.assertEqual(inserted_links, [], "Links should be written with COPY.")
+        else:
+            self.assertTrue(inserted_links)
+        self.assert_imported(50)
+
 class CharacteristicConfirmViewTest(TestCase):
     def setUp(self):
         self.admin = UserModel.objects.create_user(
@@ -1169,4 +1592,1055 @@ class QuestionManageViewTest(TestCase):
 
     def test_question_manage_invalid_factor(self):
         response = self.client.get(reverse('question-manage', kwargs={'factor_id': 999}))
-        self.assertEqual(response.status_code, 404, f"Expected 404, got {response.status_code}.")
\ No newline at end of file
+        self.assertEqual(response.status_code, 404, f"Expected 404, got {response.status_code}.")
+
+class FactorProgressCountersTest(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(
+            username='testuser@u.icesi.edu.co',
+            email='testuser@u.icesi.edu.co',
+            password='password@123',
+            is_active=True
+        )
+        self.report = ReportModel.objects.create(
+            name='Test Report',
+            description='Test description',
+            end_date=timezone.now().date() + timezone.timedelta(days=1),
+            status='active',
+            created_by=self.user
+        )
+        self.factor = FactorModel.objects.create(
+            name='Factor',
+            report=self.report,
+            last_edited_by=self.user
+        )
+        self.characteristics = [
+            CharacteristicModel.objects.create(title=f'Characteristic {i}', created_by=self.user)
+            for i in range(4)
+        ]
+        for characteristic in self.characteristics:
+            characteristic.factors.add(self.factor)
+
+    def complete(self, characteristic):
+        characteristic.state, created = States.objects.get_or_create(name=States.COMPLETED)
+        characteristic.save()
+
+    def test_counters_follow_links_and_state(self):
+        self.complete(self.characteristics[0])
+        self.factor.refresh_from_db()
+        self.assertEqual((self.factor.total_characteristics, self.factor.completed_characteristics), (4, 1))
+        self.assertEqual(self.factor.progress, 25, "Stored progress not updated.")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.factor.progress_percentage, 25)
+
+    def test_counters_follow_remove_clear_and_delete(self):
+        self.complete(self.characteristics[0])
+        self.characteristics[1].delete()
+        self.factor.characteristics.remove(self.characteristics[0], self.characteristics[0])
+        self.factor.refresh_from_db()
+        self.assertEqual((self.factor.total_characteristics, self.factor.completed_characteristics), (2, 0))
+        self.factor.characteristics.clear()
+        self.factor.refresh_from_db()
+        self.assertEqual((self.factor.total_characteristics, self.factor.progress), (0, 0))
+
+    def test_factor_save_does_not_overwrite_counters(self):
+        stale = FactorModel.objects.get(pk=self.factor.pk)
+        self.complete(self.characteristics[0])
+        stale.name = 'Renamed'
+        stale.save()
+        self.factor.refresh_from_db()
+        self.assertEqual(self.factor.completed_characteristics, 1, "Stale instance overwrote the counters.")
+
+    def test_rebuild_command_repairs_drift(self):
+        self.complete(self.characteristics[0])
+        FactorModel.objects.update(total_characteristics=0, completed_characteristics=0, progress=0)
+        call_command('rebuild_factor_progress', stdout=io.StringIO())
+        self.factor.refresh_from_db()
+        self.assertEqual((self.factor.total_characteristics, self.factor.completed_characteristics, self.factor.progress), (4, 1, 25))
+
+@override_settings(JOBS_RUN_INLINE=True)
+class DOFADocumentViewTest(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(
+            username='testuser@u.icesi.edu.co',
+            email='testuser@u.icesi.edu.co',
+            password='password@123',
+            is_active=True
+        )
+        login_success = self.client.login(username='testuser@u.icesi.edu.co', password='password@123')
+        self.assertTrue(login_success, "Login failed. Check user credentials or authentication backend.")
+        self.storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_dir)
+        storage_override = self.settings(STORAGES={
+            **settings.STORAGES,
+            'dofa': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': self.storage_dir}},
+        })
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+        self.report = self.create_report('Test Report')
+        self.other_report = self.create_report('Other Report')
+        self.factor = FactorModel.objects.create(name='Factor A', report=self.report, last_edited_by=self.user)
+        FactorModel.objects.create(name='Factor B', report=self.report, last_edited_by=self.user)
+        FactorModel.objects.create(name='Factor C', report=self.other_report, last_edited_by=self.user)
+        for i in range(2):
+            characteristic = CharacteristicModel.objects.create(title=f'Characteristic {i}', created_by=self.user)
+            characteristic.factors.add(self.factor)
+            CharacteristicStrengths.objects.create(
+                characteristic=characteristic,
+                global_strength=GlobalStrengths.objects.create(name=f'Strength {i}')
+            )
+            CharacteristicAspects.objects.create(
+                characteristic=characteristic,
+                global_aspect=GlobalAspects.objects.create(name=f'Aspect {i}')
+            )
+
+    def create_report(self, name):
+        return ReportModel.objects.create(
+            name=name,
+            description='Test description',
+            end_date=timezone.now().date() + timezone.timedelta(days=1),
+            status='active',
+            created_by=self.user
+        )
+
+    def document_text(self, response):
+        document = docx.Document(io.BytesIO(b''.join(response.streaming_content)))
+        return [paragraph.text for paragraph in document.paragraphs if paragraph.text.strip()]
+
+    def test_dofa_document_for_report(self):
+        response = self.client.get(reverse('generate-dofa'), {'report': self.report.pk})
+        self.assertEqual(response.status_code, 200, f"Expected 200, got {response.status_code}.")
+        self.assertIn('attachment; filename="DOFA_Analysis.docx"', response['Content-Disposition'])
+        self.assertEqual(self.document_text(response), [
+            'DOFA Analysis',
+            'Factor: Factor A', 'Strengths:', '• Strength 0', '• Strength 1',
+            'Aspects to Improve:', '• Aspect 0', '• Aspect 1',
+            'Factor: Factor B', 'Strengths:', 'Aspects to Improve:',
+        ])
+
+    def test_characteristics_without_factor_are_left_out(self):
+        orphan = CharacteristicModel.objects.create(title='Orphan', created_by=self.user)
+        CharacteristicStrengths.objects.create(characteristic=orphan, global_strength=GlobalStrengths.objects.create(name='S-orphan'))
+        CharacteristicAspects.objects.create(characteristic=orphan, global_aspect=GlobalAspects.objects.create(name='A-orphan'))
+        fingerprint = dofa_fingerprint()
+        self.assertFalse([row for row in dofa_rows() if row[0] is None])
+        CharacteristicStrengths.objects.create(characteristic=orphan, global_strength=GlobalStrengths.objects.create(name='S-orphan 2'))
+        self.assertEqual(dofa_fingerprint(), fingerprint, "Rows left out of the document changed the fingerprint.")
+
+    def test_dofa_document_rows_in_one_query(self):
+        with self.assertNumQueries(1):
+            rows = list(dofa_rows())
+        self.assertEqual(len(rows), 7, "Expected 3 factor rows, 2 strengths and 2 aspects.")
+
+    def test_dofa_document_invalid_report(self):
+        response = self.client.get(reverse('generate-dofa'), {'report': 999})
+        self.assertEqual(response.status_code, 404, f"Expected 404, got {response.status_code}.")
+        for report in ('abc', '-1', '1.5'):
+            response = self.client.get(reverse('generate-dofa'), {'report': report})
+            self.assertEqual(response.status_code, 404, f"Expected 404 for {report!r}, got {response.status_code}.")
+
+    def test_dofa_document_is_cached_by_fingerprint(self):
+        first = self.client.get(reverse('generate-dofa'), {'report': self.report.pk})
+        b''.join(first.streaming_content)
+        self.assertEqual(len(os.listdir(self.storage_dir)), 1, "Generated document not stored.")
+
+        response = self.client.get(reverse('generate-dofa'), {'report': self.report.pk}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304, f"Expected 304, got {response.status_code}.")
+
+        CharacteristicStrengths.objects.create(
+            characteristic=CharacteristicModel.objects.first(),
+            global_strength=GlobalStrengths.objects.create(name='Strength 2')
+        )
+        response = self.client.get(reverse('generate-dofa'), {'report': self.report.pk}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200, f"Expected 200, got {response.status_code}.")
+        self.assertNotEqual(response['ETag'], first['ETag'], "Fingerprint did not change with the inputs.")
+        self.assertIn('• Strength 2', self.document_text(response))
+
+    def test_dofa_fingerprint_follows_global_edits(self):
+        fingerprint = dofa_fingerprint(self.report)
+        strength = GlobalStrengths.objects.get(name='Strength 0')
+        strength.name = 'Renamed strength'
+        strength.save()
+        self.assertNotEqual(dofa_fingerprint(self.report), fingerprint, "Global strength rename kept the fingerprint.")
+        fingerprint = dofa_fingerprint(self.report)
+        aspect = GlobalAspects.objects.get(name='Aspect 0')
+        aspect.name = 'Renamed aspect'
+        aspect.save()
+        self.assertNotEqual(dofa_fingerprint(self.report), fingerprint, "Global aspect rename kept the fingerprint.")
+
+    def test_dofa_last_modified_is_the_generation_time(self):
+        first = self.client.get(reverse('generate-dofa'), {'report': self.report.pk})
+        b''.join(first.streaming_content)
+        name = os.path.join(self.storage_dir, os.listdir(self.storage_dir)[0])
+        generated_at = time.time() - 60
+        os.utime(name, (generated_at, generated_at))
+        for _ in range(2):
+            generated = self.client.get(reverse('generate-dofa'), {'report': self.report.pk})
+            b''.join(generated.streaming_content)
+            self.assertEqual(generated['Last-Modified'], http_date(generated_at), "A download moved Last-Modified.")
+        response = self.client.get(
+            reverse('generate-dofa'), {'report': self.report.pk}, HTTP_IF_MODIFIED_SINCE=generated['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, 304, f"Expected 304, got {response.status_code}.")
+
+    @override_settings(DOFA_CACHE_MAX_FILES=2)
+    def test_dofa_cache_evicts_least_recently_used(self):
+        b''.join(self.client.get(reverse('generate-dofa'), {'report': self.report.pk}).streaming_content)
+        used = os.path.join(self.storage_dir, os.listdir(self.storage_dir)[0])
+        os.utime(used, (time.time() - 60, time.time() - 60))
+        b''.join(self.client.get(reverse('generate-dofa'), {'report': self.other_report.pk}).streaming_content)
+        # A hit on the older document makes the other one the least recently used
+        b''.join(self.client.get(reverse('generate-dofa'), {'report': self.report.pk}).streaming_content)
+        b''.join(self.client.get(reverse('generate-dofa')).streaming_content)
+        self.assertEqual(len(os.listdir(self.storage_dir)), 2)
+        self.assertTrue(os.path.exists(used), "The recently used document was evicted.")
+
+    @override_settings(DOFA_CACHE_MAX_FILES=1)
+    def test_dofa_cache_evicts_old_documents(self):
+        b''.join(self.client.get(reverse('generate-dofa'), {'report': self.report.pk}).streaming_content)
+        b''.join(self.client.get(reverse('generate-dofa'), {'report': self.other_report.pk}).streaming_content)
+        self.assertEqual(len(os.listdir(self.storage_dir)), 1, "Old documents were not evicted.")
+
+def failing_task(message):
+    raise RuntimeError(message)
+
+@secret_payload('code')
+def failing_secret_task(message, code):
+    raise RuntimeError(message)
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(
+            username='testuser@u.icesi.edu.co',
+            email='testuser@u.icesi.edu.co',
+            password='password@123',
+            is_active=True
+        )
+        login_success = self.client.login(username='testuser@u.icesi.edu.co', password='password@123')
+        self.assertTrue(login_success, "Login failed. Check user credentials or authentication backend.")
+        self.storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_dir)
+        storage_override = self.settings(STORAGES={
+            **settings.STORAGES,
+            'dofa': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': self.storage_dir}},
+        })
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+
+    def test_dofa_generation_runs_in_worker(self):
+        response = self.client.get(reverse('generate-dofa'))
+        self.assertEqual(response.status_code, 202, f"Expected 202, got {response.status_code}.")
+        self.assertTemplateUsed(response, 'dashboard/dofa_pending.html')
+        self.assertNotIn('ETag', response, "Pending page must not carry the document validators.")
+        job = response.context['job']
+
+        self.client.get(reverse('generate-dofa'))
+        self.assertEqual(JobModel.objects.count(), 1, "Identical pending jobs should be deduplicated.")
+
+        self.assertEqual(run_pending_jobs(), 1)
+        status = self.client.get(reverse('job-status', kwargs={'job_id': job.pk})).json()
+        self.assertEqual(status['status'], 'succeeded')
+        response = self.client.get(reverse('generate-dofa'))
+        self.assertEqual(response.status_code, 200, f"Expected 200, got {response.status_code}.")
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = enqueue(failing_task, max_attempts=2, message='boom')
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertIn('boom', job.last_error)
+        self.assertGreater(job.run_at, timezone.now(), "Retry was not delayed.")
+
+        self.assertEqual(run_pending_jobs(), 0, "Job retried before its backoff elapsed.")
+        JobModel.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+
+    def test_secret_payload_is_removed_once_finished(self):
+        sendEmailCode(self.user, '123456')
+        job = JobModel.objects.get()
+        self.assertEqual(job.payload['code'], '123456')
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.payload), ('succeeded', {}))
+
+        job = enqueue(failing_secret_task, max_attempts=2, message='boom', code='654321')
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.payload['code'], '654321', "The retry needs the payload.")
+        JobModel.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.payload), ('failed', {'message': 'boom'}))
+
+    def test_worker_requires_the_metrics_directory(self):
+        with self.assertRaises(CommandError):
+            call_command('run_jobs', once=True, stdout=io.StringIO())
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        # close_old_connections() would close the test transaction's connection on PostgreSQL
+        with self.settings(METRICS_MULTIPROC_DIR=directory), mock.patch('dashboard.management.commands.run_jobs.close_old_connections'):
+            call_command('run_jobs', once=True, stdout=io.StringIO())
+
+    def test_finished_jobs_are_purged(self):
+        jobs = {status: enqueue(failing_task, message=status) for status in ['pending', 'running', 'succeeded', 'failed']}
+        for status, job in jobs.items():
+            JobModel.objects.filter(pk=job.pk).update(status=status, run_at=timezone.now() + timezone.timedelta(days=1))
+        recent = enqueue(failing_task, message='recent')
+        JobModel.objects.exclude(pk=recent.pk).update(updated_at=timezone.now() - timezone.timedelta(days=30))
+        JobModel.objects.filter(pk=recent.pk).update(status='succeeded')
+        self.assertEqual(purge_finished_jobs(batch_size=1), 2)
+        self.assertEqual(
+            set(JobModel.objects.values_list('pk', flat=True)),
+            {jobs['pending'].pk, jobs['running'].pk, recent.pk},
+        )
+
+    def test_job_status_only_visible_to_owner(self):
+        job = enqueue(failing_task, message='boom')
+        other = UserModel.objects.create_user(username='other', email='other@u.icesi.edu.co', password='password@123')
+        self.client.force_login(other)
+        response = self.client.get(reverse('job-status', kwargs={'job_id': job.pk}))
+        self.assertEqual(response.status_code, 403, f"Expected 403, got {response.status_code}.")
+
+    def test_shared_dofa_job_is_visible_to_every_requester(self):
+        job = self.client.get(reverse('generate-dofa')).context['job']
+        other = UserModel.objects.create_user(username='other', email='other@u.icesi.edu.co', password='password@123')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('generate-dofa')).context['job'], job)
+        response = self.client.get(reverse('job-status', kwargs={'job_id': job.pk}))
+        self.assertEqual(response.status_code, 200, f"Expected 200, got {response.status_code}.")
+        self.assertEqual(response.json()['status'], 'pending')
+
+    def test_accreditation_invitation_is_sent_by_worker(self):
+        response = self.client.post(reverse('send_notification'), {
+            'recipient_emails': 'invitee@u.icesi.edu.co',
+            'start_date': '2030-01-01',
+        })
+        self.assertRedirects(response, reverse('send_notification'))
+        self.assertEqual(len(mail.outbox), 0, "Email sent inside the request.")
+        run_pending_jobs()
+        self.assertEqual(mail.outbox[0].to, ['invitee@u.icesi.edu.co'])
+        self.assertTrue(NotificationLog.objects.filter(recipient='invitee@u.icesi.edu.co').exists())
+
+@override_settings(JOBS_RUN_INLINE=True, EMAIL_BATCH_SIZE=2, EMAIL_BATCH_DELAY=0)
+class BulkInvitationTest(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(
+            username='testuser@u.icesi.edu.co',
+            email='testuser@u.icesi.edu.co',
+            password='password@123',
+            is_active=True
+        )
+        login_success = self.client.login(username='testuser@u.icesi.edu.co', password='password@123')
+        self.assertTrue(login_success, "Login failed. Check user credentials or authentication backend.")
+
+    def post_invitations(self, text, csv_content=None):
+        data = {'recipient_emails': text, 'start_date': '2030-01-01'}
+        if csv_content is not None:
+            data['recipients_csv'] = SimpleUploadedFile('recipients.csv', csv_content.encode(), content_type='text/csv')
+        return self.client.post(reverse('send_notification'), data, follow=True)
+
+    def test_textarea_and_csv_recipients_share_one_connection(self):
+        with mock.patch('dashboard.notifications.get_connection', wraps=get_connection) as connections:
+            response = self.post_invitations(
+                'a@u.icesi.edu.co, b@u.icesi.edu.co\nnot-an-email',
+                'name,email\nC,c@u.icesi.edu.co\nA,a@u.icesi.edu.co\n',
+            )
+        self.assertEqual(connections.call_count, 1, "Each batch should reuse the same SMTP connection.")
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['a@u.icesi.edu.co', 'b@u.icesi.edu.co', 'c@u.icesi.edu.co'])
+        self.assertEqual(NotificationLog.objects.count(), 3)
+        texts = [str(m) for m in response.context['messages']]
+        self.assertIn("Invalid email address skipped: not-an-email", texts)
+        self.assertIn("Notification sent successfully to 3 of 3 recipients.", texts)
+
+    def test_failed_recipient_is_reported_without_stopping_the_batch(self):
+        original = EmailBackend.send_messages
+
+        def send_messages(backend, messages):
+            if messages[0].to == ['b@u.icesi.edu.co']:
+                raise smtplib.SMTPRecipientsRefused({'b@u.icesi.edu.co': (550, b'Mailbox unavailable')})
+            return original(backend, messages)
+
+        with mock.patch.object(EmailBackend, 'send_messages', send_messages):
+            response = self.post_invitations('a@u.icesi.edu.co b@u.icesi.edu.co c@u.icesi.edu.co')
+        self.assertEqual([m.to[0] for m in mail.outbox], ['a@u.icesi.edu.co', 'c@u.icesi.edu.co'])
+        self.assertFalse(NotificationLog.objects.filter(recipient='b@u.icesi.edu.co').exists())
+        job = JobModel.objects.get()
+        self.assertEqual(job.result['sent'], ['a@u.icesi.edu.co', 'c@u.icesi.edu.co'])
+        self.assertIn('b@u.icesi.edu.co', job.result['failed'])
+        texts = [str(m) for m in response.context['messages']]
+        self.assertIn("Notification sent successfully to 2 of 3 recipients.", texts)
+
+    def test_no_valid_recipients_is_rejected(self):
+        response = self.post_invitations('nobody')
+        self.assertEqual(JobModel.objects.count(), 0)
+        texts = [str(m) for m in response.context['messages']]
+        self.assertIn("must enter at least one valid recipient email.", texts)
+
+    def test_non_utf8_csv_is_rejected(self):
+        response = self.client.post(reverse('send_notification'), {
+            'recipient_emails': '',
+            'start_date': '2030-01-01',
+            'recipients_csv': SimpleUploadedFile('recipients.csv', 'email\nnoño@u.icesi.edu.co\n'.encode('latin-1'), content_type='text/csv'),
+        }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(JobModel.objects.count(), 0)
+        texts = [str(m) for m in response.context['messages']]
+        self.assertTrue(any(t.startswith("The recipients file could not be read as a UTF-8 CSV") for t in texts), texts)
+
+    @override_settings(JOBS_RUN_INLINE=False)
+    def test_queued_invitations_point_to_the_job_status(self):
+        response = self.post_invitations('a@u.icesi.edu.co')
+        job = JobModel.objects.get()
+        texts = [str(m) for m in response.context['messages']]
+        self.assertIn(
+            "Notification to 1 recipients queued for delivery. Per-recipient results "
+            f"will be listed at {reverse('job-status', args=[job.pk])} once job {job.pk} finishes.",
+            texts,
+        )
+
+
+# Query budget for a GET of every named route, as a staff 'acadi' user over the seeded dataset.
+# The same count must hold for a small and a large dataset: a view whose count grows with the
+# data has an N+1 and fails below. Paginated views cap an N+1 at one page, so the budget is
+# what catches those. Raise a budget only for a constant number of new queries.
+QUERY_BUDGETS = {
+    # dashboard.urls
+    'dashboard-user': 5,
+    'dashboard-admin': 5,
+    'dashboard-stats-cache': 2,
+    'slow-queries': 3,
+    'assign-role-view': 5,
+    'remove-role-view': 4,
+    'report-list': 5,
+    'create-report': 3,
+    'update-report': 4,
+    'delete-report': 3,
+    'view-report': 6,
+    'comments-list': 5,
+    'comment-create': 4,
+    'comment-update': 6,
+    'comment-delete': 2,
+    'comment-detail': 5,
+    'comments-review-list': 5,
+    'comment-review': 6,
+    'justification-detail': 4,
+    'characteristic-manage': 6,
+    'characteristic-create': 4,
+    'characteristic-update': 5,
+    'characteristic-delete': 3,
+    'characteristic-upload': 4,
+    'characteristic-confirm': 3,
+    'mark_notifications_read': 2,
+    'profile-view': 3,
+    'edit-factor': 5,
+    'edit-profile-view': 3,
+    'question-manage': 5,
+    'question-create': 4,
+    'task-assign': 4,
+    'edit-factor-collaborative': 4,
+    'send_notification': 3,
+    'notification_history': 5,
+    'start-accreditation': 3,
+    'get_accreditation_status': 3,
+    'characteristic-develop': 5,
+    'characteristic-complete': 2,
+    'characteristic-details': 9,
+    'generate-dofa': 6,
+    'job-status': 3,
+    'global-search': 3,
+    # init.urls
+    'home-view': 2,
+    'register-user': 2,
+    'verify-email': 2,
+    'login-user': 2,
+    'forgot-password': 2,
+    'reset-password': 1,
+}
+
+@override_settings(JOBS_RUN_INLINE=True)
+class QueryBudgetTest(TestCase):
+    SMALL, LARGE = 10, 500
+
+    def setUp(self):
+        cache.clear()
+        self.storage_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_dir)
+        storage_override = self.settings(STORAGES={
+            **settings.STORAGES,
+            'dofa': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': self.storage_dir}},
+        })
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+
+        self.role = RoleModel.objects.create(name='acadi')
+        self.user = UserModel.objects.create_user(
+            username='admin@u.icesi.edu.co',
+            email='admin@u.icesi.edu.co',
+            password='password@123',
+            is_active=True,
+            is_staff=True,
+            role=self.role
+        )
+        self.client.force_login(self.user)
+        self.completed = States.objects.get(name=States.COMPLETED)
+        self.report = ReportModel.objects.create(
+            name='Report', description='Description', end_date=timezone.now().date(), created_by=self.user
+        )
+        self.factor = FactorModel.objects.create(name='Factor', report=self.report, last_edited_by=self.user)
+        self.characteristic = CharacteristicModel.objects.create(title='Characteristic', created_by=self.user, state=self.completed)
+        self.characteristic.factors.add(self.factor)
+        self.comment = CommentsModel.objects.create(factor=self.factor, owner=self.user, title='Comment', content='Content')
+        self.job = enqueue(failing_task, user=self.user, message='boom')
+        self.seeded = 0
+
+    def seed(self, size):
+        # Grow every collection a page can list to `size` rows
+        start, self.seeded = self.seeded, size
+        users = UserModel.objects.bulk_create([
+            UserModel(username=f'user{i}@u.icesi.edu.co', email=f'user{i}@u.icesi.edu.co', role=self.role)
+            for i in range(start, size)
+        ])
+        reports = ReportModel.objects.bulk_create([
+            ReportModel(name=f'Report {i}', description='Description', end_date=timezone.now().date(), created_by=users[i - start])
+            for i in range(start, size)
+        ])
+        factors = FactorModel.objects.bulk_create([
+            FactorModel(name=f'Factor {i}', report=self.report, last_edited_by=users[i - start])
+            for i in range(start, size)
+        ] + [FactorModel(name='Factor', report=report, last_edited_by=self.user) for report in reports])
+        characteristics = CharacteristicModel.objects.bulk_create([
+            CharacteristicModel(title=f'Characteristic {i}', created_by=users[i - start], state=self.completed)
+            for i in range(start, size)
+        ])
+        CharacteristicModel.factors.through.objects.bulk_create([
+            CharacteristicModel.factors.through(characteristicmodel=characteristic, factormodel=self.factor)
+            for characteristic in characteristics
+        ])
+        strengths = GlobalStrengths.objects.bulk_create([GlobalStrengths(name=f'Strength {i}') for i in range(start, size)])
+        aspects = GlobalAspects.objects.bulk_create([GlobalAspects(name=f'Aspect {i}') for i in range(start, size)])
+        CharacteristicStrengths.objects.bulk_create([
+            CharacteristicStrengths(characteristic=characteristic, global_strength=strength)
+            for characteristic, strength in zip(characteristics, strengths)
+        ] + [CharacteristicStrengths(characteristic=self.characteristic, global_strength=strength) for strength in strengths])
+        CharacteristicAspects.objects.bulk_create([
+            CharacteristicAspects(characteristic=characteristic, global_aspect=aspect)
+            for characteristic, aspect in zip(characteristics, aspects)
+        ] + [CharacteristicAspects(characteristic=self.characteristic, global_aspect=aspect) for aspect in aspects])
+        CommentsModel.objects.bulk_create([
+            CommentsModel(factor=self.factor, owner=users[i - start], title=f'Comment {i}', content='Content')
+            for i in range(start, size)
+        ])
+        QuestionModel.objects.bulk_create([
+            QuestionModel(factor=self.factor, owner=users[i - start], title=f'Question {i}')
+            for i in range(start, size)
+        ])
+        TaskModel.objects.bulk_create([
+            TaskModel(title=f'Task {i}', due_date=timezone.now().date(), assignee=users[i - start], created_by=self.user)
+            for i in range(start, size)
+        ])
+        NotificationModel.objects.bulk_create([
+            NotificationModel(title=f'Notification {i}', user=self.user, created_by=users[i - start])
+            for i in range(start, size)
+        ])
+        NotificationLog.objects.bulk_create([
+            NotificationLog(recipient=f'user{i}@u.icesi.edu.co', created_by=self.user)
+            for i in range(start, size)
+        ])
+        call_command('rebuild_factor_progress', stdout=io.StringIO())
+        cache.clear()
+
+    def route_kwargs(self, pattern):
+        values = {
+            'pk': self.report.pk,
+            'factor_id': self.factor.pk,
+            'comment_id': self.comment.pk,
+            'characteristic_id': self.characteristic.pk,
+            'job_id': self.job.pk,
+            'action': 'login',
+        }
+        return {name: values[name] for name in pattern.pattern.converters}
+
+    def named_routes(self):
+        from dashboard.urls import urlpatterns as dashboard_patterns
+        from init.urls import urlpatterns as init_patterns
+        return {pattern.name: pattern for pattern in dashboard_patterns + init_patterns if pattern.name}
+
+    def measure(self):
+        counts = {}
+        for name, pattern in self.named_routes().items():
+            url = reverse(name, kwargs=self.route_kwargs(pattern))
+            # Warm the per-user and per-process caches first, then count a steady-state request
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            counts[name] = len(queries)
+        return counts
+
+    def test_every_named_route_has_a_budget(self):
+        self.assertEqual(set(self.named_routes()), set(QUERY_BUDGETS), "Add new routes to QUERY_BUDGETS.")
+
+    def test_query_count_does_not_grow_with_data(self):
+        self.seed(self.SMALL)
+        small = self.measure()
+        self.seed(self.LARGE)
+        large = self.measure()
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(route=name):
+                self.assertLessEqual(small[name], budget, f"{name} is over its query budget.")
+                self.assertEqual(large[name], small[name], f"{name} runs more queries with more data.")
+
+class RequestTimingMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(
+            username='admin@u.icesi.edu.co',
+            email='admin@u.icesi.edu.co',
+            password='password@123',
+            is_active=True,
+            role=RoleModel.objects.create(name='acadi')
+        )
+        self.client.force_login(self.user)
+
+    def server_timing(self, response):
+        return dict(metric.split(';', 1) for metric in response['Server-Timing'].split(', '))
+
+    @override_settings(PERF_SAMPLE_RATE=1, PERF_SERVER_TIMING_HEADER=True)
+    def test_sampled_request_reports_server_timing_and_log_line(self):
+        with self.assertLogs('dashboard.performance', 'INFO') as logs:
+            self.client.get(reverse('dashboard-admin'))
+            response = self.client.get(reverse('dashboard-admin'))
+        metrics = self.server_timing(response)
+        self.assertEqual(set(metrics), {'total', 'db', 'tpl', 'cache'})
+        self.assertRegex(metrics['db'], r'desc="[1-9]\d* queries"')
+        self.assertNotEqual(metrics['tpl'], 'dur=0.0', "Template render time was not recorded.")
+        self.assertEqual(metrics['cache'], 'desc="hits=4 misses=0"')
+        self.assertIn('url_name=dashboard-admin method=GET status=200', logs.output[-1])
+        self.assertIn('cache_hits=4 cache_misses=0', logs.output[-1])
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_measured(self):
+        response = self.client.get(reverse('dashboard-admin'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(PERF_SAMPLE_RATE=1, PERF_SERVER_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        with self.assertLogs('dashboard.performance', 'INFO'):
+            response = self.client.get(reverse('dashboard-admin'))
+        self.assertNotIn('Server-Timing', response)
+
+class MetricsViewTest(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(
+            username='admin@u.icesi.edu.co',
+            email='admin@u.icesi.edu.co',
+            password='password@123',
+            is_active=True,
+            role=RoleModel.objects.create(name='acadi')
+        )
+
+    def sample(self, text, line_start):
+        values = [float(line.rsplit(' ', 1)[1]) for line in text.splitlines() if line.startswith(line_start)]
+        return values[0] if values else 0.0
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200, f"Expected 200, got {response.status_code}.")
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        return response.content.decode()
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_require_token_or_staff(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_requests_are_counted_per_url_name(self):
+        requests_line = 'django_http_requests_total{method="GET",status="200",view="dashboard-admin"}'
+        latency_line = 'django_http_request_duration_seconds_count{view="dashboard-admin"}'
+        before = self.scrape()
+        self.client.force_login(self.user)
+        self.client.get(reverse('dashboard-admin'))
+        after = self.scrape()
+        self.assertEqual(self.sample(after, requests_line) - self.sample(before, requests_line), 1)
+        self.assertEqual(self.sample(after, latency_line) - self.sample(before, latency_line), 1)
+        self.assertIn('# TYPE django_http_request_duration_seconds histogram', after)
+        self.assertIn('django_http_request_db_queries_bucket{view="dashboard-admin",le="+Inf"}', after)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram('test_cumulative_seconds', 'Test histogram.', ['kind'], buckets=(1, 5))
+        self.addCleanup(metrics.REGISTRY.remove, histogram)
+        for value in (0.5, 3, 3, 10):
+            histogram.observe(value, kind='a')
+        text = metrics.render_metrics()
+        self.assertIn('test_cumulative_seconds_bucket{kind="a",le="1.0"} 1.0', text)
+        self.assertIn('test_cumulative_seconds_bucket{kind="a",le="5.0"} 3.0', text)
+        self.assertIn('test_cumulative_seconds_bucket{kind="a",le="+Inf"} 4.0', text)
+        self.assertIn('test_cumulative_seconds_sum{kind="a"} 16.5', text)
+        self.assertIn('test_cumulative_seconds_count{kind="a"} 4.0', text)
+
+    def test_worker_files_are_aggregated(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        counter = metrics.Counter('test_worker_total', 'Test counter.')
+        gauge = metrics.Gauge('test_worker_busy', 'Test gauge.')
+        self.addCleanup(metrics.REGISTRY.remove, counter)
+        self.addCleanup(metrics.REGISTRY.remove, gauge)
+        with self.settings(METRICS_MULTIPROC_DIR=directory):
+            counter.inc(2)
+            gauge.inc()
+            # Another worker that already exited, writing the same samples into its own file
+            other_worker = metrics._MmapValues(os.path.join(directory, 'values_99999.db'))
+            other_worker.inc(metrics._key('test_worker_total', {}), 3)
+            other_gauge = metrics._MmapValues(os.path.join(directory, 'gauge_99999.db'))
+            other_gauge.inc(metrics._key('test_worker_busy', {}), 1)
+            self.assertIn('test_worker_total 5.0', metrics.render_metrics())
+            self.assertIn('test_worker_busy 2.0', metrics.render_metrics())
+            metrics.mark_process_dead(99999)
+            text = metrics.render_metrics()
+        self.assertIn('test_worker_total 5.0', text, "Counters of exited workers must be kept.")
+        self.assertIn('test_worker_busy 1.0', text, "Gauges of exited workers must be dropped.")
+
+    @override_settings(JOBS_RUN_INLINE=True, EMAIL_BATCH_DELAY=0)
+    def test_email_send_duration_is_observed(self):
+        line = 'email_send_duration_seconds_count{kind="invitation",result="sent"}'
+        before = self.sample(metrics.render_metrics(), line)
+        send_accreditation_invitations(['a@u.icesi.edu.co', 'b@u.icesi.edu.co'], '2030-01-01', self.user.pk)
+        self.assertEqual(self.sample(metrics.render_metrics(), line) - before, 2)
+
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(
+            username='admin@u.icesi.edu.co',
+            email='admin@u.icesi.edu.co',
+            password='password@123',
+            is_active=True,
+            is_staff=True,
+            role=RoleModel.objects.create(name='acadi')
+        )
+        ReportModel.objects.create(
+            name='Report', description='Description', end_date=timezone.now().date(), created_by=self.user
+        )
+        self.client.force_login(self.user)
+        cache.clear()
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_are_logged_with_view_and_plan(self):
+        self.client.get(reverse('report-list'), {'name': 'Report'})
+        entries = [entry for entry in slow_queries() if 'dashboard_reportmodel' in entry['sql']]
+        self.assertTrue(entries, "The report search was not logged.")
+        self.assertEqual({entry['source'] for entry in entries}, {'report-list'})
+        self.assertNotIn('params', entries[0], "Parameters can hold secrets and must not be logged.")
+        self.assertTrue(entries[0]['plan'], "No EXPLAIN plan captured.")
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG_SIZE=5)
+    def test_log_is_a_bounded_ring_buffer(self):
+        self.client.get(reverse('report-list'))
+        self.client.get(reverse('dashboard-admin'))
+        entries = slow_queries()
+        self.assertEqual(len(entries), 5)
+        self.assertEqual(entries[-1]['source'], 'dashboard-admin')
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_staff_page_and_command_list_worst_offenders(self):
+        self.client.get(reverse('report-list'))
+        response = self.client.get(reverse('slow-queries'))
+        self.assertEqual(response.status_code, 200, f"Expected 200, got {response.status_code}.")
+        offenders = response.context['offenders']
+        totals = [offender['total_ms'] for offender in offenders]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+        self.assertIn('report-list', {source for offender in offenders for source in offender['sources']})
+
+        out = io.StringIO()
+        call_command('slow_queries', '--limit', '3', '--clear', stdout=out)
+        self.assertIn('#1 total', out.getvalue())
+        self.assertNotIn('#4 total', out.getvalue())
+        self.assertEqual(slow_queries(), [])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_nested_scopes_share_one_wrapper(self):
+        with observe_queries(lambda: 'outer') as outer:
+            with observe_queries(lambda: 'inner') as inner:
+                self.assertIs(inner, outer)
+                self.assertEqual(len(connection.execute_wrappers), 1)
+                ReportModel.objects.count()
+        self.assertEqual(outer.queries, 1)
+        self.assertEqual([entry['source'] for entry in slow_queries()], ['outer'])
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_slow_query_page_is_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(reverse('slow-queries'))
+        self.assertEqual(response.status_code, 403, f"Expected 403, got {response.status_code}.")
+
+class MigrationsTest(TestCase):
+    def test_models_and_migrations_agree(self):
+        call_command('makemigrations', 'init', 'dashboard', check=True, dry_run=True, stdout=io.StringIO())
+
+class VerifyIndexesCommandTest(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = io.StringIO()
+        call_command('verify_indexes', '--rows', '2000', '--min-rows', '1000', stdout=out)
+        self.assertEqual(out.getvalue().count(': ok'), len(HOT_QUERIES), out.getvalue())
+        self.assertEqual(ReportModel.objects.count(), 0, "Seeded rows were not rolled back.")
+
+    def test_sequential_scans_are_detected(self):
+        self.assertEqual(sequential_scans("Seq Scan on dashboard_reportmodel  (cost=0.00..35.50 rows=10 width=4)"), {'dashboard_reportmodel'})
+        self.assertEqual(sequential_scans("SCAN dashboard_commentsmodel"), {'dashboard_commentsmodel'})
+        self.assertEqual(sequential_scans("SCAN dashboard_commentsmodel USING INDEX dashboard_c_created_idx"), set())
+        self.assertEqual(sequential_scans("Index Scan Backward using dashboard_r_created_idx on dashboard_reportmodel"), set())
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username='searcher', email='searcher@u.icesi.edu.co', password='password@123',
+            role=RoleModel.objects.create(name='acadi')
+        )
+        self.report = ReportModel.objects.create(
+            name='Autoevaluación institucional', description='Informe de acreditación 2025',
+            end_date=timezone.now().date(), created_by=self.user
+        )
+        self.factor = FactorModel.objects.create(name='Factor 1', report=self.report)
+        self.comment = CommentsModel.objects.create(
+            factor=self.factor, owner=self.user, title='Revisión', content='Falta la evidencia de autoevaluación'
+        )
+        self.question = QuestionModel.objects.create(
+            factor=self.factor, owner=self.user, title='¿Quién firma?', description='Firma del informe final'
+        )
+        self.characteristic = CharacteristicModel.objects.create(title='Bienestar', description='Programas de bienestar')
+        self.characteristic.factors.add(self.factor)
+        self.client.force_login(self.user)
+
+    def test_every_object_is_indexed_with_its_url(self):
+        urls = dict(SearchDocument.objects.values_list('kind', 'url'))
+        self.assertEqual(urls, {
+            'report': reverse('view-report', args=[self.report.pk]),
+            'comment': reverse('comment-detail', args=[self.comment.pk]),
+            'question': reverse('question-manage', args=[self.factor.pk]),
+            'characteristic': reverse('characteristic-manage', args=[self.factor.pk]),
+        })
+
+    def test_title_matches_rank_above_body_matches(self):
+        results = search('autoevaluación')
+        self.assertEqual([(result.kind, result.object_id) for result in results], [
+            ('report', self.report.pk), ('comment', self.comment.pk),
+        ])
+
+    def test_prefix_and_kind_filter(self):
+        results = search('auto', kinds=['comment'])
+        self.assertEqual([result.object_id for result in results], [self.comment.pk])
+        self.assertEqual(search('bienest')[0].kind, 'characteristic')
+
+    def test_index_follows_updates_and_deletes(self):
+        self.comment.title = 'Corrección pendiente'
+        self.comment.save()
+        self.assertEqual(search('corrección')[0].object_id, self.comment.pk)
+        self.question.delete()
+        self.assertFalse(search('firma'))
+
+    def test_report_ids_subquery(self):
+        matches = ReportModel.objects.filter(pk__in=matching_ids('informe acreditación', 'report'))
+        self.assertEqual(list(matches), [self.report])
+
+    def test_rebuild_indexes_bulk_created_rows(self):
+        ReportModel.objects.bulk_create([
+            ReportModel(name='Plan de mejoramiento', end_date=timezone.now().date(), created_by=self.user)
+        ])
+        self.assertFalse(search('mejoramiento'))
+        out = io.StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 5 documents', out.getvalue())
+        self.assertEqual(search('mejoramiento')[0].title, 'Plan de mejoramiento')
+
+    def test_index_migration_is_reversible(self):
+        migration = import_module('dashboard.migrations.0003_search_index')
+        schema_editor = SimpleNamespace(connection=connection)
+        migration.drop_index(None, schema_editor)
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            search('autoevaluación')
+        migration.create_index(None, schema_editor)
+        self.assertEqual(search('autoevaluación')[0].object_id, self.report.pk)
+
+    def test_index_migration_indexes_existing_objects(self):
+        migration = import_module('dashboard.migrations.0003_search_index')
+        SearchDocument.objects.all().delete()
+        migration.index_existing_objects(None, SimpleNamespace(connection=connection))
+        self.assertEqual(search('autoevaluación')[0].object_id, self.report.pk)
+
+    def test_search_view(self):
+        response = self.client.get(reverse('global-search'), {'q': 'autoevaluación', 'kind': 'report'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'dashboard/search_results.html')
+        self.assertContains(response, reverse('view-report', args=[self.report.pk]))
+        self.assertNotContains(response, 'Revisión')
+
+    def test_search_view_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('global-search'), {'q': 'informe'})
+        self.assertEqual(response.status_code, 302)
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            username='pager', email='pager@u.icesi.edu.co', password='password@123',
+            role=RoleModel.objects.create(name='acadi')
+        )
+        now = timezone.now()
+        reports = ReportModel.objects.bulk_create([
+            ReportModel(name=f'Report {i}', end_date=now.date(), created_by=self.user) for i in range(25)
+        ])
+        # Pairs of reports share created_at, so the id tie-breaker decides their order
+        for i, report in enumerate(reports):
+            ReportModel.objects.filter(pk=report.pk).update(created_at=now - timezone.timedelta(seconds=i // 2))
+        self.expected = list(ReportModel.objects.order_by('-created_at', '-id'))
+        self.factor = FactorModel.objects.create(name='Factor', report=reports[0])
+        self.client.force_login(self.user)
+
+    def walk(self, paginator):
+        pages, page = [], paginator.page()
+        pages.append(list(page))
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pages.append(list(page))
+        return pages, page
+
+    def test_next_pages_cover_every_row_once_in_order(self):
+        pages, last = self.walk(KeysetPaginator(ReportModel.objects.all(), 10))
+        self.assertEqual([len(rows) for rows in pages], [10, 10, 5])
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertTrue(last.has_previous())
+
+    def test_previous_page_returns_the_same_rows(self):
+        paginator = KeysetPaginator(ReportModel.objects.all(), 10)
+        second = paginator.page(paginator.page().next_cursor)
+        third = paginator.page(second.next_cursor)
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        self.assertTrue(back.has_next() and back.has_previous())
+        first = paginator.page(back.previous_cursor)
+        self.assertEqual(list(first), self.expected[:10])
+        self.assertFalse(first.has_previous())
+
+    def test_deep_pages_filter_instead_of_offset(self):
+        paginator = KeysetPaginator(ReportModel.objects.all(), 10)
+        cursor = paginator.page(paginator.page().next_cursor).next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            paginator.page(cursor)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('OFFSET', queries[0]['sql'].upper())
+
+    def test_invalid_cursors(self):
+        paginator = KeysetPaginator(ReportModel.objects.all(), 10)
+        for cursor in ['garbage', encode_cursor('next', [1]), encode_cursor('next', ['not a date', 1])]:
+            with self.assertRaises(InvalidPage):
+                paginator.page(cursor)
+        response = self.client.get(reverse('report-list'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursors_are_not_found(self):
+        by_id = KeysetPaginator(ReportModel.objects.all(), 10, ('id',))
+        for values in [['x'], [['a']], [None], [{}]]:
+            with self.assertRaises(InvalidPage):
+                by_id.page(encode_cursor('next', values))
+        log = KeysetPaginator(NotificationLog.objects.all(), 10, ('-sent_at', '-id'))
+        for values in [['2020-01-01T00:00:00', 'y'], [['a'], 1], ['not a date', 1]]:
+            with self.assertRaises(InvalidPage):
+                log.page(encode_cursor('next', values))
+        cursors = [
+            (reverse('report-list'), encode_cursor('next', ['2020-01-01T00:00:00', 'y'])),
+            (reverse('notification_history'), encode_cursor('next', [['a'], 1])),
+            (reverse('characteristic-manage', args=[self.factor.pk]), encode_cursor('next', ['x'])),
+        ]
+        for url, cursor in cursors:
+            self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 404, url)
+
+    def test_count_is_capped(self):
+        self.assertEqual(KeysetPaginator(ReportModel.objects.all(), 10).count, 25)
+        with mock.patch('dashboard.pagination.COUNT_LIMIT', 20):
+            paginator = KeysetPaginator(ReportModel.objects.all(), 10)
+            self.assertEqual(paginator.count, 20)
+            self.assertTrue(paginator.count_capped)
+        self.assertLess(25, COUNT_LIMIT)
+
+    def test_report_list_links_keep_filters(self):
+        response = self.client.get(reverse('report-list'), {'status': 'active'})
+        self.assertEqual(list(response.context['reports']), self.expected[:10])
+        next_cursor = response.context['page_obj'].next_cursor
+        self.assertContains(response, f'?status=active&amp;cursor={next_cursor}')
+        response = self.client.get(reverse('report-list'), {'status': 'active', 'cursor': next_cursor})
+        self.assertEqual(list(response.context['reports']), self.expected[10:20])
+
+
+class CachedSessionStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.store = SessionStore()
+        self.store['factor_id'] = 1
+        self.store.save()
+
+    def session_queries(self, engine):
+        user = UserModel.objects.create_user(username=engine, email=f'{engine}@u.icesi.edu.co', password='password@123')
+        with override_settings(SESSION_ENGINE=engine):
+            client = Client()
+            client.force_login(user)
+            client.get(reverse('dashboard-user'))
+            with CaptureQueriesContext(connection) as queries:
+                client.get(reverse('dashboard-user'))
+        return len([q for q in queries if 'django_session' in q['sql']])
+
+    def test_requests_read_sessions_from_the_cache(self):
+        self.assertEqual(self.session_queries('django.contrib.sessions.backends.db'), 1)
+        self.assertEqual(self.session_queries('dashboard.sessions'), 0)
+
+    def test_refuses_a_process_local_cache(self):
+        with override_settings(SESSION_ENGINE='dashboard.sessions'):
+            with override_settings(SHARED_CACHE=False), self.assertRaises(ImproperlyConfigured):
+                check_session_cache()
+            with override_settings(SHARED_CACHE=True):
+                check_session_cache()
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db', SHARED_CACHE=False):
+            check_session_cache()
+
+    def test_reads_come_from_the_cache(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.store.session_key)['factor_id'], 1)
+
+    def test_unchanged_sessions_are_not_written(self):
+        session = SessionStore(self.store.session_key)
+        session['factor_id'] = 1
+        with self.assertNumQueries(0):
+            session.save()
+        session['factor_id'] = 2
+        session.save()
+        cache.clear()
+        self.assertEqual(SessionStore(self.store.session_key)['factor_id'], 2)
+
+    @override_settings(SESSION_MAX_SIZE=1024)
+    def test_oversized_sessions_are_rejected(self):
+        session = SessionStore(self.store.session_key)
+        session['payload'] = os.urandom(2048).hex()
+        with self.assertRaises(SessionTooLarge):
+            session.save()
+        cache.clear()
+        self.assertNotIn('payload', SessionStore(self.store.session_key))
+
+    def test_purge_deletes_expired_sessions_in_batches(self):
+        Session.objects.bulk_create([
+            Session(session_key=f'expired{i}', session_data='', expire_date=timezone.now() - timezone.timedelta(days=1))
+            for i in range(5)
+        ])
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_sessions', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('DELETE')]), 3)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), [self.store.session_key])
@@ -0,0 +1,109 @@
+"""
+Per-request performance counters. observe_queries installs the one execute_wrapper of a request or
+job, a QueryObserver that times every query once for the request metrics, the sampled RequestTiming
+and the slow-query log. RequestTimingMiddleware activates a RequestTiming for sampled requests;
+template rendering and the dashboard caches add to it while it is active.
+"""
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+from .slow_queries import explaining, record_slow_query
+
+_current = ContextVar('request_timing', default=None)
+_observer = ContextVar('query_observer', default=None)
+
+
+class QueryObserver:
+    def __init__(self, source):
+        # Callable naming where the queries come from; only called once one of them is slow
+        self.source = source
+        self.queries = 0
+        self.sql_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if explaining():
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.sql_time += duration
+        if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS and not many:
+            record_slow_query(context['connection'], sql, params, duration * 1000, self.source())
+        return result
+
+
+@contextmanager
+def observe_queries(source):
+    """Yields the active QueryObserver, installing one on every connection if there is none yet."""
+    observer = _observer.get()
+    if observer is not None:
+        # Already observed by an outer middleware, or a request running a job inline
+        yield observer
+        return
+    observer = QueryObserver(source)
+    token = _observer.set(observer)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(observer))
+            yield observer
+    finally:
+        _observer.reset(token)
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def activate(self):
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current.reset(token)
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+
+def record_cache_lookup(hit):
+    timing = _current.get()
+    if timing is not None:
+        if hit:
+            timing.cache_hits += 1
+        else:
+            timing.cache_misses += 1
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        if timing is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates whose top-level renders (includes and extends run inside them) are timed."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
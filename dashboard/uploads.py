@@ -0,0 +1,111 @@
+"""
+Characteristic CSV uploads. The file is read row by row from the upload stream, each row is
+validated, and valid rows are written in batches to CharacteristicUploadRow under a fresh upload
+id. Only that id goes into the session, so neither memory nor the session grows with the file.
+Confirming the upload turns the staged rows into characteristics with bulk inserts.
+"""
+import csv
+import io
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .bulk import bulk_insert
+from .models import CharacteristicModel, CharacteristicUploadRow, FactorModel, States
+from .progress import shift_factor_counters
+from .search import index_new_characteristics
+
+BATCH_SIZE = 1000
+MAX_ERRORS = 50
+TITLE_MAX_LENGTH = CharacteristicModel._meta.get_field('title').max_length
+
+
+class UploadError(Exception):
+    """The file as a whole can't be used (not UTF-8, no 'title' column)."""
+
+
+def validate_row(row):
+    title = (row.get('title') or '').strip()
+    if not title:
+        return None, "title is empty"
+    if len(title) > TITLE_MAX_LENGTH:
+        return None, f"title is longer than {TITLE_MAX_LENGTH} characters"
+    return {'title': title, 'description': (row.get('description') or '').strip()}, None
+
+
+def stage_characteristics_csv(csv_file, factor, user):
+    """
+    Stages the valid rows of csv_file. Returns (upload_id, staged, errors) where errors lists
+    (line, message) for the first MAX_ERRORS invalid rows. Raises UploadError and stages nothing
+    if the file can't be read.
+    """
+    upload_id = uuid.uuid4()
+    staged, errors, batch = 0, [], []
+    try:
+        reader = csv.DictReader(io.TextIOWrapper(csv_file, encoding='utf-8-sig', newline=''))
+        if 'title' not in (reader.fieldnames or []):
+            raise UploadError("CSV must contain a 'title' column.")
+        for row in reader:
+            data, error = validate_row(row)
+            if error:
+                if len(errors) < MAX_ERRORS:
+                    errors.append((reader.line_num, error))
+                continue
+            batch.append(CharacteristicUploadRow(
+                upload_id=upload_id, factor=factor, created_by=user, line=reader.line_num, **data
+            ))
+            if len(batch) == BATCH_SIZE:
+                CharacteristicUploadRow.objects.bulk_create(batch)
+                staged += len(batch)
+                batch = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        discard_upload(upload_id)
+        raise UploadError(f"The file could not be read as a UTF-8 CSV: {e}")
+    except UploadError:
+        discard_upload(upload_id)
+        raise
+    CharacteristicUploadRow.objects.bulk_create(batch)
+    return upload_id, staged + len(batch), errors
+
+
+def staged_rows(upload_id, factor):
+    return CharacteristicUploadRow.objects.filter(upload_id=upload_id, factor=factor).order_by('line')
+
+
+def confirm_upload(upload_id, factor, user):
+    """
+    Creates the staged characteristics of factor in one transaction: bulk_create per batch, the
+    factor links and search documents through bulk_insert (COPY on PostgreSQL for large uploads)
+    and a single update of the factor's progress counters. Returns the number created.
+    """
+    with transaction.atomic():
+        state_id = States.id_for(States.IN_PROGRESS)
+        characteristics = []  # (pk, title, description), lighter than keeping the instances
+        batch = []
+        for row in staged_rows(upload_id, factor).iterator(chunk_size=BATCH_SIZE):
+            batch.append(CharacteristicModel(
+                title=row.title, description=row.description, created_by=user, state_id=state_id
+            ))
+            if len(batch) == BATCH_SIZE:
+                characteristics.extend((c.pk, c.title, c.description) for c in CharacteristicModel.objects.bulk_create(batch))
+                batch = []
+        characteristics.extend((c.pk, c.title, c.description) for c in CharacteristicModel.objects.bulk_create(batch))
+
+        Link = CharacteristicModel.factors.through
+        links = (Link(characteristicmodel_id=pk, factormodel_id=factor.pk) for pk, title, description in characteristics)
+        bulk_insert(Link, links, ['characteristicmodel', 'factormodel'], len(characteristics))
+        index_new_characteristics(characteristics, factor, len(characteristics))
+        # New characteristics are in progress, so only the total changes
+        shift_factor_counters(FactorModel.objects.filter(pk=factor.pk), total=len(characteristics))
+        discard_upload(upload_id)
+    return len(characteristics)
+
+
+def discard_upload(upload_id):
+    CharacteristicUploadRow.objects.filter(upload_id=upload_id).delete()
+
+
+def purge_stale_uploads():
+    cutoff = timezone.now() - timedelta(seconds=settings.CHARACTERISTIC_UPLOAD_TTL)
+    return CharacteristicUploadRow.objects.filter(created_at__lt=cutoff).delete()[0]
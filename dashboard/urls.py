@@ -5,6 +5,8 @@ from . import views
 urlpatterns = [
     path('user-dashboard/', views.UserDashboardView.as_view(), name='dashboard-user'),
     path('admin-dashboard/', views.AdminDashboardView.as_view(), name='dashboard-admin'),
+    path('stats/cache/', views.DashboardStatsCacheView.as_view(), name='dashboard-stats-cache'),
+    path('stats/slow-queries/', views.SlowQueryLogView.as_view(), name='slow-queries'),
     path('assign-role/', views.AssignRoleView.as_view(), name='assign-role-view'),
     path('remove-role/', views.RemoveRoleView.as_view(), name='remove-role-view'),
     path('reports/', views.ReportListView.as_view(), name='report-list'),
@@ -43,6 +45,8 @@ urlpatterns = [
     path('factor/<int:factor_id>/characteristic/<int:characteristic_id>/complete/', views.CharacteristicCompleteView.as_view(), name='characteristic-complete'),
     path('factor/<int:factor_id>/characteristic/<int:characteristic_id>/details/', views.CharacteristicDetailsView.as_view(), name='characteristic-details'),
     path('dofa/generate/', views.DOFADocumentView.as_view(), name='generate-dofa'),
+    path('jobs/<int:job_id>/', views.JobStatusView.as_view(), name='job-status'),
+    path('search/', views.SearchView.as_view(), name='global-search'),
     # ... New routes
 ]
 
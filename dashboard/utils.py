@@ -1,12 +1,16 @@
-from .models import NotificationModel  # Adjust based on your Notification model
+from django.utils.functional import SimpleLazyObject
+from .notifications import notification_summary
+from .permissions import capability_flags
 
 def notifications(request):
     if request.user.is_authenticated:
-        return {
-            'notifications': NotificationModel.objects.filter(user=request.user).order_by('-created_at')[:6],
-            'unread_notifications_count': NotificationModel.objects.filter(user=request.user, is_read=False).count(),
-        }
+        return notification_summary(request.user.pk)
     return {
         'notifications': [],
         'unread_notifications_count': 0,
-    }
\ No newline at end of file
+    }
+
+def capabilities(request):
+    # Lazy so pages that never check a permission don't load the user's role
+    return {'can': SimpleLazyObject(lambda: capability_flags(request.user))}
+
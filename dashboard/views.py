@@ -1,4 +1,3 @@
-import csv
 from django.shortcuts import redirect, render, get_object_or_404, HttpResponseRedirect
 from django.views import View
 from django.contrib.auth.decorators import login_required
@@ -14,8 +13,9 @@ from init.models import RoleModel, UserModel
 from django.contrib import messages
 from .models import CharacteristicAspects, CharacteristicModel, CharacteristicStrengths, GlobalAspects, GlobalStrengths, QuestionModel, ReportModel, FactorModel, CommentsModel, NotificationModel, States
 from .forms import AnswerForm, CharacteristicDevelopForm, CharacteristicForm, QuestionForm, ReportFilterForm, ReportForm, FactorForm
+from .stats import user_dashboard_stats, admin_dashboard_stats, cache_counters
+from .factors import create_default_factors
 from django.utils import timezone
-from datetime import datetime, timedelta
 from django.core.exceptions import PermissionDenied
 from .forms import ProfileForm, TaskForm
 from django.contrib import messages
@@ -24,46 +24,36 @@ from django.utils.dateparse import parse_date
 from django.contrib import messages
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required, permission_required
-from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth.models import User
 from .models import NotificationLog
-from django.core.validators import validate_email
-from django.core.exceptions import ValidationError
 from .models import AccreditationProcess
 from django.http import HttpResponse
-import docx
-from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.http import FileResponse, Http404
+from .dofa import JOB_KEY_PREFIX as DOFA_JOB_KEY_PREFIX, cached_dofa_modified_time, dofa_fingerprint, generate_dofa_document, open_cached_dofa_document, DOCX_CONTENT_TYPE
+from .jobs import enqueue, SUCCEEDED
+from .models import JobModel
+from .notifications import RecipientsFileError, invalidate_notification_summaries, parse_recipients, send_accreditation_invitations
+from django.views.decorators.http import condition
+from django.utils.http import http_date, quote_etag
+from django.utils.crypto import constant_time_compare
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from .slow_queries import worst_offenders
+from .search import KINDS as SEARCH_KINDS, matching_ids, search
+from .pagination import KeysetPaginationMixin, paginate_by_cursor
+from .permissions import RequiresPermissionMixin, has_permission
+from .uploads import UploadError, confirm_upload, discard_upload, purge_stale_uploads, stage_characteristics_csv, staged_rows
 # Create your views here.
 
 @method_decorator(login_required, name="dispatch")
 class UserDashboardView(View):
     def get(self, request):
-        # Basic statistics
-        total_reports = ReportModel.objects.count()
-
-        recent_comments = CommentsModel.objects.select_related('owner', 'factor').order_by('-created_at')[:5]
-        recent_reports = ReportModel.objects.select_related('created_by').order_by('-created_at')[:5]
-
-        today = timezone.now()
-        thirty_days_ago = today - timedelta(days=30)
-        
-        active_reports = ReportModel.objects.filter(status='active').count()
-        inactive_reports = ReportModel.objects.filter(status='inactive').count()
-        
-        recent_created_reports = ReportModel.objects.filter(created_at__gte=thirty_days_ago).count()
-        
-        factors_with_content = FactorModel.objects.exclude(content='').count()
-        total_factors = FactorModel.objects.count()
-        completion_rate = int((factors_with_content / total_factors * 100) if total_factors > 0 else 0)
-
         context = {
-            "total_reports": ReportModel.objects.count(),
-            "recent_comments": CommentsModel.objects.order_by("-created_at")[:3],
-            "recent_reports": ReportModel.objects.order_by("-created_at")[:3],
-            "active_count": ReportModel.objects.filter(status='active').count(),
-            "inactive_count": ReportModel.objects.filter(status='inactive').count(),
+            **user_dashboard_stats(),
+            "recent_comments": CommentsModel.objects.select_related('owner').order_by("-created_at")[:3],
+            "recent_reports": ReportModel.objects.select_related('created_by').order_by("-created_at")[:3],
         }
 
         return render(request, 'dashboard/dashboard-user.html', context)
@@ -71,50 +61,50 @@ class UserDashboardView(View):
 @method_decorator(login_required, name="dispatch")
 class AdminDashboardView(View):
     def get(self, request):
-        # Basic statistics
-        total_reports = ReportModel.objects.count()
-        total_users_assigned = UserModel.objects.filter(is_superuser=False).exclude(role__name='common').count()
-        pending_approvals = CommentsModel.objects.filter(status='pending').count()
-
-        # Recent activity
-        recent_comments = CommentsModel.objects.select_related('owner', 'factor').order_by('-created_at')[:5]
-        recent_reports = ReportModel.objects.select_related('created_by').order_by('-created_at')[:5]
-        recent_users = UserModel.objects.filter(is_superuser=False).order_by('-date_joined')[:5]
-
-        # Monthly statistics
-        today = timezone.now()
-        thirty_days_ago = today - timedelta(days=30)
-        
-        # Reports by status
-        active_reports = ReportModel.objects.filter(status='active').count()
-        inactive_reports = ReportModel.objects.filter(status='inactive').count()
-        
-        # Reports created in the last 30 days
-        recent_created_reports = ReportModel.objects.filter(created_at__gte=thirty_days_ago).count()
-        
-        # Calculate completion rate
-        factors_with_content = FactorModel.objects.exclude(content='').count()
-        total_factors = FactorModel.objects.count()
-        completion_rate = int((factors_with_content / total_factors * 100) if total_factors > 0 else 0)
-
         context = {
-            "total_reports": ReportModel.objects.count(),
-            "total_users_assigned": UserModel.objects.exclude(is_superuser=True).count(),
-            "pending_approvals": CommentsModel.objects.filter(status="pending").count(),
-            "recent_comments": CommentsModel.objects.order_by("-created_at")[:3],
-            "recent_reports": ReportModel.objects.order_by("-created_at")[:3],
-            "active_count": ReportModel.objects.filter(status='active').count(),
-            "inactive_count": ReportModel.objects.filter(status='inactive').count(),
+            **admin_dashboard_stats(),
+            "recent_comments": CommentsModel.objects.select_related('owner').order_by("-created_at")[:3],
+            "recent_reports": ReportModel.objects.select_related('created_by').order_by("-created_at")[:3],
         }
 
         return render(request, 'dashboard/dashboard-admin.html', context)
 
 
+@method_decorator(login_required, name="dispatch")
+class DashboardStatsCacheView(View):
+    def get(self, request):
+        if not request.user.is_staff:
+            raise PermissionDenied
+        return JsonResponse(cache_counters())
+
+
+@method_decorator(login_required, name="dispatch")
+class SlowQueryLogView(View):
+    def get(self, request):
+        if not request.user.is_staff:
+            raise PermissionDenied
+        return render(request, 'dashboard/slow_queries.html', {
+            'offenders': worst_offenders(),
+            'threshold_ms': settings.SLOW_QUERY_THRESHOLD_MS,
+        })
+
+
+class MetricsView(View):
+    # Prometheus scrapes with the METRICS_TOKEN bearer token; staff can open it from a browser
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        authorization = request.headers.get('Authorization', '')
+        if not (token and constant_time_compare(authorization, f'Bearer {token}')) and not request.user.is_staff:
+            raise PermissionDenied
+        return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+
 @method_decorator(login_required, name="dispatch")
 class MarkNotificationsReadView(View):
     def post(self, request, *args, **kwargs):
         if request.user.is_authenticated:
             NotificationModel.objects.filter(user=request.user, is_read=False).update(is_read=True)
+            invalidate_notification_summaries([request.user.pk])
             return JsonResponse({'status': 'success'})
         raise PermissionDenied
 
@@ -130,8 +120,7 @@ class AssignRoleView(View):
         })
 
     def post(self, request):
-        user_role = getattr(request.user, 'role', None)
-        if not user_role or user_role.name not in ['acadi', 'program director']:
+        if not has_permission(request.user, 'assign_roles'):
             messages.error(request, 
                 "Solo los usuarios con rol “acadi” o “program director” pueden asignar roles."
             )
@@ -160,12 +149,11 @@ class AssignRoleView(View):
     
 
 @method_decorator(login_required(login_url='login-user'), name='dispatch')
-class RemoveRoleView(View):
-    def dispatch(self, request, *args, **kwargs):
-        role = getattr(request.user, 'role', None)
-        if not role or role.name.lower() != 'acadi':
-            return redirect('dashboard-admin')
-        return super().dispatch(request, *args, **kwargs)
+class RemoveRoleView(RequiresPermissionMixin, View):
+    required_permission = 'remove_roles'
+
+    def handle_no_permission(self, request, *args, **kwargs):
+        return redirect('dashboard-admin')
 
     def get(self, request):
         users = UserModel.objects.all()
@@ -188,14 +176,29 @@ class RemoveRoleView(View):
     
 
 @method_decorator(login_required, name="dispatch")
-class ReportListView(ListView):
+class SearchView(View):
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        kind = request.GET.get('kind', '')
+        if kind not in SEARCH_KINDS:
+            kind = ''
+        results = search(query, kinds=[kind] if kind else None) if query else []
+        return render(request, 'dashboard/search_results.html', {
+            'query': query,
+            'kind': kind,
+            'kinds': list(SEARCH_KINDS),
+            'results': results,
+        })
+
+@method_decorator(login_required, name="dispatch")
+class ReportListView(KeysetPaginationMixin, ListView):
     model = ReportModel
     template_name = 'dashboard/reports.html'
     context_object_name = 'reports'
     paginate_by = 10
     
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('created_by')
         search_query = self.request.GET.get('search', '')
         filter_form = ReportFilterForm(self.request.GET)
 
@@ -206,7 +209,7 @@ class ReportListView(ListView):
             end_date = filter_form.cleaned_data.get('end_date')
 
             if search_query:
-                queryset = queryset.filter(name__icontains=search_query)
+                queryset = queryset.filter(pk__in=matching_ids(search_query, 'report'))
 
             if name:
                 queryset = queryset.filter(name__icontains=name)
@@ -244,17 +247,11 @@ class ReportCreateView(CreateView):
     
     def form_valid(self, form):
         form.instance.created_by = self.request.user
-        response = super().form_valid(form)
-
-        for i in range(12):
-            FactorModel.objects.create(
-                name=f"Factor {i+1}",
-                content="",
-                report=self.object,
-                last_edited_by=self.request.user
-            )
+        with transaction.atomic():
+            response = super().form_valid(form)
+            factors = create_default_factors([self.object], self.request.user)
 
-        messages.success(self.request, f"Report '{self.object.name}' with 12 factors created successfully")
+        messages.success(self.request, f"Report '{self.object.name}' with {len(factors)} factors created successfully")
         return response
 
 
@@ -286,15 +283,16 @@ def ReportDeleteView(request, pk):
 
 
 @method_decorator(login_required, name="dispatch")
-class ReportFactorView(ListView):
+class ReportFactorView(KeysetPaginationMixin, ListView):
     model = FactorModel
     template_name = 'dashboard/report-detail.html'
     context_object_name = 'factors'
     paginate_by = 6
+    keyset_ordering = ('id',)
 
     def get_queryset(self):
         self.report = get_object_or_404(ReportModel, pk=self.kwargs['pk'])
-        return self.report.factors.all().order_by('id')
+        return self.report.factors.all()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -305,10 +303,11 @@ class ReportFactorView(ListView):
 class CommentsListView(View):
     def get(self, request, factor_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
-        comments = factor.comments.all()
+        page = paginate_by_cursor(request, factor.comments.select_related('owner'), 20, ('created_at', 'id'))
         return render(request, 'dashboard/comments_list.html', {
             'factor': factor,
-            'comments': comments
+            'comments': page.object_list,
+            'page_obj': page,
         })
 
 @method_decorator(login_required, name="dispatch")
@@ -398,25 +397,24 @@ class CommentDetailView(View):
 class CommentsReviewListView(View):
     def get(self, request, factor_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
-        user_role = getattr(request.user, 'role', None)
-        if not user_role or user_role.name not in ['acadi', 'program director']:
+        if not has_permission(request.user, 'review_comments'):
             messages.error(request, "Only users with role 'acadi' or 'program director' can review comments.")
             return redirect('comments-list', factor_id=factor.id)
 
-        comments = factor.comments.all()
+        page = paginate_by_cursor(request, factor.comments.select_related('owner'), 20, ('created_at', 'id'))
         return render(request, 'dashboard/comments_list.html', {
             'factor': factor,
-            'comments': comments
+            'comments': page.object_list,
+            'page_obj': page,
         })
 
 @method_decorator(login_required, name="dispatch")
-class CommentReviewView(View):
-    def dispatch(self, request, *args, **kwargs):
-        user_role = getattr(request.user, 'role', None)
-        if not user_role or user_role.name not in ['acadi', 'program director']:
-            messages.error(request, "Only users with role 'acadi' or 'program director' can review comments.")
-            return redirect('dashboard-admin')
-        return super().dispatch(request, *args, **kwargs)
+class CommentReviewView(RequiresPermissionMixin, View):
+    required_permission = 'review_comments'
+
+    def handle_no_permission(self, request, *args, **kwargs):
+        messages.error(request, "Only users with role 'acadi' or 'program director' can review comments.")
+        return redirect('dashboard-admin')
 
     def get(self, request, comment_id):
         comment = get_object_or_404(CommentsModel, id=comment_id)
@@ -466,13 +464,25 @@ class JustificationDetailView(View):
 
 @method_decorator(login_required, name="dispatch")
 class CharacteristicManageView(View):
+    paginate_by = 25
+
     def get(self, request, factor_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
-        characteristics = factor.characteristics.all()
+        characteristics = factor.characteristics.annotate(
+            has_strengths=Exists(CharacteristicStrengths.objects.filter(characteristic=OuterRef('pk'))),
+            has_aspects=Exists(CharacteristicAspects.objects.filter(characteristic=OuterRef('pk'))),
+        )
+        states = sorted(States.registry().items())
+        state = request.GET.get('state', '')
+        if state.isdigit():
+            characteristics = characteristics.filter(state_id=state)
+        page = paginate_by_cursor(request, characteristics, self.paginate_by, ('id',))
         return render(request, 'dashboard/characteristic_manage.html', {
             'factor': factor,
-            'characteristics': characteristics,
-            'user_role': getattr(request.user, 'role', None)
+            'characteristics': page.object_list,
+            'page_obj': page,
+            'states': states,
+            'selected_state': state,
         })
 
 @method_decorator(login_required, name="dispatch")
@@ -480,7 +490,7 @@ class CharacteristicDevelopView(View):
     def get(self, request, factor_id, characteristic_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
         characteristic = get_object_or_404(CharacteristicModel, id=characteristic_id)
-        if characteristic.state.name == "Completed":
+        if characteristic.is_completed:
             messages.error(request, "Cannot develop a completed characteristic.")
             return redirect('characteristic-manage', factor_id=factor.id)
         form = CharacteristicDevelopForm()
@@ -493,7 +503,7 @@ class CharacteristicDevelopView(View):
     def post(self, request, factor_id, characteristic_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
         characteristic = get_object_or_404(CharacteristicModel, id=characteristic_id)
-        if characteristic.state.name == "Completed":
+        if characteristic.is_completed:
             messages.error(request, "Cannot develop a completed characteristic.")
             return redirect('characteristic-manage', factor_id=factor.id)
         form = CharacteristicDevelopForm(request.POST)
@@ -529,13 +539,11 @@ class CharacteristicCompleteView(View):
         characteristic = get_object_or_404(CharacteristicModel, id=characteristic_id)
         if not characteristic.has_strengths_and_aspects:
             return JsonResponse({'status': 'error', 'message': 'Cannot complete without at least one strength and one aspect.'}, status=400)
-        if getattr(request.user, 'role', None) and request.user.role.name != 'acadi':
+        if not has_permission(request.user, 'edit_characteristics'):
             return JsonResponse({'status': 'error', 'message': 'Only "acadi" can complete a characteristic.'}, status=403)
         try:
-            completed_state, created = States.objects.get_or_create(name="Completed")
-            characteristic.state = completed_state
+            characteristic.state_id = States.id_for(States.COMPLETED)
             characteristic.save()
-            factor.save()  # Update factor progress
             messages.success(request, "Characteristic marked as completed.")  # Add user feedback
             return JsonResponse({'status': 'success', 'message': 'Characteristic marked as completed.'})
         except Exception as e:
@@ -557,7 +565,6 @@ class CharacteristicCreateView(View):
             characteristic.created_by = request.user
             characteristic.save()
             characteristic.factors.add(factor)
-            factor.save()  # Update factor progress
             messages.success(request, "Characteristic created successfully.")
             return redirect('characteristic-manage', factor_id=factor.id)
         return render(request, 'dashboard/characteristic_form.html', {'form': form, 'factor': factor})
@@ -582,30 +589,28 @@ class CharacteristicUpdateView(View):
         return render(request, 'dashboard/characteristic_form.html', {'form': form, 'factor': factor, 'characteristic': characteristic})
 
 @method_decorator(login_required, name="dispatch")
-class CharacteristicDeleteView(View):
-    def dispatch(self, request, *args, **kwargs):
-        user_role = getattr(request.user, 'role', None)
-        if not user_role or user_role.name not in ['acadi', 'program director']:
-            messages.error(request, "Only users with role 'acadi' or 'program director' can delete characteristics.")
-            return redirect('characteristic-manage', factor_id=kwargs['factor_id'])
-        return super().dispatch(request, *args, **kwargs)
+class CharacteristicDeleteView(RequiresPermissionMixin, View):
+    required_permission = 'manage_characteristics'
+
+    def handle_no_permission(self, request, *args, **kwargs):
+        messages.error(request, "Only users with role 'acadi' or 'program director' can delete characteristics.")
+        return redirect('characteristic-manage', factor_id=kwargs['factor_id'])
 
     def post(self, request, factor_id, characteristic_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
         characteristic = get_object_or_404(CharacteristicModel, id=characteristic_id)
         characteristic.delete()
-        factor.save()  # Update factor progress
         messages.success(request, "Characteristic deleted successfully.")
         return redirect('characteristic-manage', factor_id=factor.id)
 
 @method_decorator(login_required, name="dispatch")
-class CharacteristicUploadCSVView(View):
-    def dispatch(self, request, *args, **kwargs):
-        user_role = getattr(request.user, 'role', None)
-        if not user_role or user_role.name not in ['acadi', 'program director']:
-            messages.error(request, "Only users with role 'acadi' or 'program director' can upload characteristics.")
-            return redirect('characteristic-manage', factor_id=kwargs['factor_id'])
-        return super().dispatch(request, *args, **kwargs)
+class CharacteristicUploadCSVView(RequiresPermissionMixin, View):
+    PREVIEW_ROWS = 100
+    required_permission = 'manage_characteristics'
+
+    def handle_no_permission(self, request, *args, **kwargs):
+        messages.error(request, "Only users with role 'acadi' or 'program director' can upload characteristics.")
+        return redirect('characteristic-manage', factor_id=kwargs['factor_id'])
 
     def get(self, request, factor_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
@@ -614,23 +619,23 @@ class CharacteristicUploadCSVView(View):
     def post(self, request, factor_id, *args, **kwargs):
         factor = get_object_or_404(FactorModel, id=factor_id)
         if 'csv_file' in request.FILES:
-            csv_file = request.FILES['csv_file']
-            decoded_file = csv_file.read().decode('utf-8').splitlines()
-            reader = csv.DictReader(decoded_file)
-            characteristics_data = []
-            for row in reader:
-                if 'title' not in row:
-                    messages.error(request, "CSV must contain a 'title' column.")
-                    return redirect('characteristic-upload', factor_id=factor.id)
-                characteristics_data.append({
-                    'title': row['title'],
-                    'description': row.get('description', '')
-                })
-            request.session['characteristics_data'] = characteristics_data
+            # Replaces this user's previous unconfirmed upload; abandoned ones expire
+            previous_upload = request.session.pop('characteristic_upload_id', None)
+            if previous_upload:
+                discard_upload(previous_upload)
+            purge_stale_uploads()
+            try:
+                upload_id, staged, errors = stage_characteristics_csv(request.FILES['csv_file'], factor, request.user)
+            except UploadError as e:
+                messages.error(request, str(e))
+                return redirect('characteristic-upload', factor_id=factor.id)
+            request.session['characteristic_upload_id'] = str(upload_id)
             request.session['factor_id'] = factor_id
             return render(request, 'dashboard/characteristic_preview.html', {
                 'factor': factor,
-                'characteristics_data': characteristics_data
+                'characteristics_data': staged_rows(upload_id, factor)[:self.PREVIEW_ROWS],
+                'staged_count': staged,
+                'errors': errors,
             })
         messages.error(request, "Please upload a valid CSV file.")
         return redirect('characteristic-manage', factor_id=factor.id)
@@ -639,20 +644,12 @@ class CharacteristicUploadCSVView(View):
 class CharacteristicConfirmView(View):
     def get(self, request, factor_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
-        characteristics_data = request.session.get('characteristics_data', [])
-        if not characteristics_data:
+        upload_id = request.session.get('characteristic_upload_id')
+        if not upload_id or not staged_rows(upload_id, factor).exists():
             messages.error(request, "No data to confirm.")
             return redirect('characteristic-manage', factor_id=factor.id)
-        for data in characteristics_data:
-            characteristic = CharacteristicModel(
-                title=data['title'],
-                description=data['description'],
-                created_by=request.user
-            )
-            characteristic.save()
-            characteristic.factors.add(factor)
-        factor.save()  # Update factor progress
-        del request.session['characteristics_data']
+        confirm_upload(upload_id, factor, request.user)
+        del request.session['characteristic_upload_id']
         del request.session['factor_id']
         messages.success(request, "Characteristics uploaded successfully.")
         return redirect('characteristic-manage', factor_id=factor.id)
@@ -661,8 +658,11 @@ class CharacteristicConfirmView(View):
 class CharacteristicDetailsView(View):
     def get(self, request, factor_id, characteristic_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
-        characteristic = get_object_or_404(CharacteristicModel, id=characteristic_id)
-        if characteristic.state.name != "Completed":
+        characteristic = get_object_or_404(
+            CharacteristicModel.objects.prefetch_related('strengths__global_strength', 'aspects__global_aspect'),
+            id=characteristic_id
+        )
+        if not characteristic.is_completed:
             messages.error(request, "Details are only available for completed characteristics.")
             return redirect('characteristic-manage', factor_id=factor.id)
         return render(request, 'dashboard/characteristic_details.html', {
@@ -680,7 +680,7 @@ class FactorUpdateView(View):
     def get(self, request, factor_id):
         factor = get_object_or_404(FactorModel, pk=factor_id)
 
-        if not request.user.role or request.user.role.name not in ['acadi', 'program director']:
+        if not has_permission(request.user, 'manage_factors'):
             messages.error(request, "You don't have permissions")
             return redirect('report-list')
 
@@ -699,7 +699,7 @@ class FactorUpdateView(View):
     def post(self, request, factor_id):
         factor = get_object_or_404(FactorModel, pk=factor_id)
 
-        if not request.user.role or request.user.role.name not in ['acadi', 'program director']:
+        if not has_permission(request.user, 'manage_factors'):
             messages.error(request, "You don't have permissions")
             return redirect('view-report', pk=factor.report.id)
 
@@ -733,22 +733,20 @@ def edit_profile_view(request):
 class QuestionManageView(View):
     def get(self, request, factor_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
-        questions = factor.questions.all()
+        questions = factor.questions.select_related('owner')
         return render(request, 'dashboard/question_manage.html', {
             'factor': factor,
             'questions': questions,
-            'is_acadi': request.user.role.name == 'acadi'
         })
 
 
 @method_decorator(login_required, name="dispatch")
-class QuestionCreateView(View):
-    def dispatch(self, request, *args, **kwargs):
-        user_role = getattr(request.user, 'role', None)
-        if not user_role or user_role.name != 'acadi':
-            messages.error(request, "Solo los usuarios con rol 'acadi' pueden crear preguntas.")
-            return redirect('question-manage', factor_id=kwargs['factor_id'])
-        return super().dispatch(request, *args, **kwargs)
+class QuestionCreateView(RequiresPermissionMixin, View):
+    required_permission = 'manage_questions'
+
+    def handle_no_permission(self, request, *args, **kwargs):
+        messages.error(request, "Solo los usuarios con rol 'acadi' pueden crear preguntas.")
+        return redirect('question-manage', factor_id=kwargs['factor_id'])
 
     def get(self, request, factor_id):
         factor = get_object_or_404(FactorModel, id=factor_id)
@@ -773,13 +771,12 @@ class QuestionCreateView(View):
 
 
 @method_decorator(login_required, name="dispatch")
-class TaskAssignView(View):
-    def dispatch(self, request, *args, **kwargs):
-        user_role = getattr(request.user, 'role', None)
-        if not user_role or user_role.name not in ['acadi', 'program director']:
-            messages.error(request, "Only users with role 'acadi' or 'program director' can assign tasks.")
-            return redirect('dashboard-admin')
-        return super().dispatch(request, *args, **kwargs)
+class TaskAssignView(RequiresPermissionMixin, View):
+    required_permission = 'assign_tasks'
+
+    def handle_no_permission(self, request, *args, **kwargs):
+        messages.error(request, "Only users with role 'acadi' or 'program director' can assign tasks.")
+        return redirect('dashboard-admin')
 
     def get(self, request):
         form = TaskForm()
@@ -819,55 +816,62 @@ class SendAccreditationNotificationView(View):
         return render(request, 'dashboard/send_notification.html')
 
     def post(self, request):
-        recipient_email = request.POST.get('recipient_email') 
+        try:
+            recipients, invalid = parse_recipients(request.POST.get('recipient_emails'), request.FILES.get('recipients_csv'))
+        except RecipientsFileError as e:
+            messages.error(request, str(e))
+            return redirect('send_notification')
         start_date = request.POST.get('start_date')
 
-        if not recipient_email:
-            messages.error(request, "must enter a recipient email.")
-            return redirect('send_notification')
+        for address in invalid:
+            messages.error(request, f"Invalid email address skipped: {address}")
 
-        try:
-            validate_email(recipient_email)
-        except ValidationError:
-            messages.error(request, "Please enter a valid email address.")
+        if not recipients:
+            messages.error(request, "must enter at least one valid recipient email.")
             return redirect('send_notification')
 
         if not start_date:
             messages.error(request, "You must specify the start date of the process.")
             return redirect('send_notification')
 
-        subject = 'Convocatoria al Proceso de Acreditación'
-        message = f"Usted ha sido convocado a hacer parte del proceso de acreditaciones, que inicia el {start_date}."
-        from_email = settings.DEFAULT_FROM_EMAIL
-
         try:
-            send_mail(
-                subject,
-                message,
-                from_email,
-                [recipient_email],
-                fail_silently=False,
-            )
-            NotificationLog.objects.create(
-                recipient=recipient_email,
-                created_by=request.user
+            job = enqueue(
+                send_accreditation_invitations,
+                user=request.user,
+                recipients=recipients,
+                start_date=start_date,
+                created_by_id=request.user.id,
             )
-            messages.success(request, f"Notification sent successfully to {recipient_email}.")
         except Exception as e:
             messages.error(request, f"Error sending notification: {str(e)}")
+            return redirect('send_notification')
 
+        if job.status == SUCCEEDED:
+            for recipient, error in job.result['failed'].items():
+                messages.error(request, f"Error sending notification to {recipient}: {error}")
+            messages.success(request, f"Notification sent successfully to {len(job.result['sent'])} of {len(recipients)} recipients.")
+        else:
+            messages.success(
+                request,
+                f"Notification to {len(recipients)} recipients queued for delivery. Per-recipient results "
+                f"will be listed at {reverse('job-status', args=[job.pk])} once job {job.pk} finishes.",
+            )
         return redirect('send_notification')
 
 @method_decorator(login_required, name="dispatch")
 class NotificationHistoryView(View):
     def get(self, request):
-        logs = NotificationLog.objects.all().order_by('-sent_at')
-        return render(request, 'dashboard/notification_history.html', {'logs': logs})
+        page = paginate_by_cursor(request, NotificationLog.objects.select_related('created_by'), 50, ('-sent_at', '-id'))
+        return render(request, 'dashboard/notification_history.html', {
+            'logs': page.object_list,
+            'page_obj': page,
+            'paginator': page.paginator,
+        })
 
 @method_decorator(login_required, name="dispatch")
 class StartAccreditationProcessView(View):
     def get(self, request):
-        if request.user.role.name != 'acadi':  # Ajusta según tu modelo de roles
+        if not has_permission(request.user, 'start_accreditation'):
             messages.error(request, 'No tienes permiso para iniciar un proceso de acreditación.')
             return redirect('dashboard-admin')
         return render(request, 'dashboard/start_accreditation.html')
@@ -952,44 +956,62 @@ class GetAccreditationStatusView(View):
             return JsonResponse({'status': 'pending', 'start_date': None})
 
         
+def dofa_request_inputs(request):
+    # ?report=<id> limits the document to one report, otherwise every factor is included
+    if not hasattr(request, '_dofa_inputs'):
+        report = None
+        report_id = request.GET.get('report', '')
+        if report_id:
+            if not report_id.isdigit():
+                raise Http404("Invalid report id.")
+            report = get_object_or_404(ReportModel, pk=report_id)
+        request._dofa_inputs = (report, dofa_fingerprint(report))
+    return request._dofa_inputs
+
+def dofa_etag(request):
+    # No validators until the document exists, so the pending page is never revalidated as the file
+    fingerprint = dofa_request_inputs(request)[1]
+    return fingerprint if cached_dofa_modified_time(fingerprint) else None
+
+def dofa_last_modified(request):
+    return cached_dofa_modified_time(dofa_request_inputs(request)[1])
+
 @method_decorator(login_required, name='dispatch')
+@method_decorator(condition(etag_func=dofa_etag, last_modified_func=dofa_last_modified), name='get')
 class DOFADocumentView(View):
     def get(self, request):
-        # Get all factors with their characteristics
-        factors = FactorModel.objects.all().prefetch_related(
-            'characteristics',
-            'characteristics__strengths__global_strength',
-            'characteristics__aspects__global_aspect'
-        )
-        
-        # Create document
-        doc = docx.Document()
-        doc.add_heading('DOFA Analysis', 0)
-
-        # Iterate through each factor
-        for factor in factors:
-            doc.add_heading(f'Factor: {factor.name}', level=1)
-            
-            # Add strengths section
-            doc.add_heading('Strengths:', level=2)
-            for char in factor.characteristics.all():
-                for strength in char.strengths.all():
-                    p = doc.add_paragraph()
-                    p.add_run(f'• {strength.global_strength.name}')
-            
-            # Add aspects to improve section
-            doc.add_heading('Aspects to Improve:', level=2)
-            for char in factor.characteristics.all():
-                for aspect in char.aspects.all():
-                    p = doc.add_paragraph()
-                    p.add_run(f'• {aspect.global_aspect.name}')
-            
-            # Add page break between factors
-            doc.add_page_break()
-
-        # Create response with the document
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-        response['Content-Disposition'] = 'attachment; filename=DOFA_Analysis.docx'
-        doc.save(response)
-        
+        report, fingerprint = dofa_request_inputs(request)
+        document = open_cached_dofa_document(fingerprint)
+        if document is None:
+            job = enqueue(
+                generate_dofa_document,
+                key=f'{DOFA_JOB_KEY_PREFIX}{fingerprint}',
+                user=request.user,
+                report_id=report.pk if report else None,
+            )
+            document = open_cached_dofa_document(fingerprint) if job.status == SUCCEEDED else None
+            if document is None:
+                return render(request, 'dashboard/dofa_pending.html', {'job': job, 'report': report}, status=202)
+
+        response = FileResponse(document, as_attachment=True, filename='DOFA_Analysis.docx', content_type=DOCX_CONTENT_TYPE)
+        # Set here as well, the condition decorator had no validators if the file was generated inline
+        response['ETag'] = quote_etag(fingerprint)
+        response['Last-Modified'] = http_date(cached_dofa_modified_time(fingerprint).timestamp())
+        response['Cache-Control'] = 'private, no-cache'
         return response
+
+@method_decorator(login_required, name='dispatch')
+class JobStatusView(View):
+    def get(self, request, job_id):
+        job = get_object_or_404(JobModel, pk=job_id)
+        # A DOFA job is handed to every user who requests the same document, not only its creator
+        shared = job.key.startswith(DOFA_JOB_KEY_PREFIX)
+        if job.created_by_id != request.user.id and not request.user.is_staff and not shared:
+            raise PermissionDenied
+        return JsonResponse({
+            'id': job.id,
+            'status': job.status,
+            'attempts': job.attempts,
+            'result': job.result,
+            'error': job.last_error,
+        })
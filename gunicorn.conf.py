@@ -0,0 +1,18 @@
+# Loaded by gunicorn from the working directory. Keeps the per-worker metric files in
+# METRICS_MULTIPROC_DIR consistent (see dashboard/metrics.py).
+import glob
+import os
+
+
+def on_starting(server):
+    # Totals start from zero on every deploy
+    directory = os.environ.get('METRICS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    from dashboard.metrics import mark_process_dead
+    mark_process_dead(worker.pid, os.environ.get('METRICS_MULTIPROC_DIR'))
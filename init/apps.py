@@ -6,4 +6,6 @@ class InitConfig(AppConfig):
     name = 'init'
 
     def ready(self):
-        import init.signals
\ No newline at end of file
+        import init.signals
+        from init.backends import check_user_cache
+        check_user_cache()
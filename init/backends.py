@@ -0,0 +1,45 @@
+"""
+Authentication backend that loads the session user together with their role. Templates and
+permission checks read request.user.role on nearly every page, so the role comes in the same query
+(select_related) and the pair is kept in the cache for AUTH_USER_CACHE_TIMEOUT seconds, turning the
+per-request user lookup into a cache read. init.signals drops the cached user whenever the user or
+their role is saved or deleted, e.g. when a role is assigned or removed. That only reaches every
+process through a shared cache, so check_user_cache refuses to start with a per-process one.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from .models import UserModel
+
+
+def check_user_cache():
+    if settings.AUTH_USER_CACHE_TIMEOUT and not settings.SHARED_CACHE:
+        backend = settings.CACHES['default']['BACKEND']
+        raise ImproperlyConfigured(
+            f"AUTH_USER_CACHE_TIMEOUT needs a cache shared by all processes, not {backend}. "
+            "Set CACHE_BACKEND or AUTH_USER_CACHE_TIMEOUT=0."
+        )
+
+
+def user_cache_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def forget_users(user_ids):
+    cache.delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+class RoleModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        user = cache.get(key) if timeout else None
+        if user is None:
+            try:
+                user = UserModel._default_manager.select_related('role').get(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            if timeout:
+                cache.set(key, user, timeout)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from init.verification import PURGE_BATCH_SIZE, purge_expired_codes
+
+
+class Command(BaseCommand):
+    help = "Deletes expired email verification codes in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_codes(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired verification codes."))
@@ -1,4 +1,7 @@
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 
 # Create your models here.
@@ -24,9 +27,14 @@ class UserModel(AbstractUser):
     def __str__(self):
         return f"{self.username} {self.email}"
     
+def verification_code_expiry():
+    return timezone.now() + timedelta(seconds=settings.VERIFICATION_CODE_TTL)
+
 class VerificationCodeModel(models.Model):
+    # One row per user (issuing a new code replaces it), looked up by user and code; see init/verification.py
     user = models.OneToOneField(UserModel, on_delete=models.CASCADE)
     code = models.CharField(max_length=6)
+    expires_at = models.DateTimeField(default=verification_code_expiry, db_index=True)  # For the purge
     
     def __str__(self):
         return f"{self.user.email}"
\ No newline at end of file
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save, post_delete
 from django.dispatch import receiver
 from django.db import connection
 from django.apps import apps
+from .backends import forget_users
+from .models import RoleModel, UserModel
 
 @receiver(post_migrate)
 def create_default_roles(sender, **kwargs):
@@ -12,3 +14,12 @@ def create_default_roles(sender, **kwargs):
             roles = ["acadi", "program director", "common"]
             for role in roles:
                 RoleModel.objects.get_or_create(name=role)
+
+# The authentication backend caches each user with their role; drop the copy when either changes
+@receiver([post_save, post_delete], sender=UserModel)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_users([instance.pk])
+
+@receiver([post_save, post_delete], sender=RoleModel)
+def forget_cached_role_users(sender, instance, **kwargs):
+    forget_users(UserModel.objects.filter(role_id=instance.pk).values_list('pk', flat=True))
@@ -1,11 +1,21 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from .models import RoleModel, VerificationCodeModel
 from django.contrib.auth.models import AnonymousUser
 from unittest.mock import patch
 from django.core.mail import send_mail
+from django.core import mail
+from dashboard.jobs import run_pending_jobs
 from .utils import sendEmailCode
+from .backends import RoleModelBackend, check_user_cache
+from django.core.exceptions import ImproperlyConfigured
+from .verification import SESSION_KEY as VERIFICATION_SESSION_KEY, consume_code, issue_code, purge_expired_codes
 
 
 class HomeViewTest(TestCase):
@@ -123,6 +133,9 @@ class VerifyEmailViewTest(TestCase):
             user=self.user,
             code=self.code
         )
+        session = self.client.session
+        session[VERIFICATION_SESSION_KEY] = self.user.pk
+        session.save()
 
     def test_verify_email_get(self):
         response = self.client.get(reverse('verify-email', kwargs={'action': 'register'}))
@@ -385,3 +398,138 @@ class SendEmailCodeTest(TestCase):
         mock_send_mail.side_effect = Exception("Mail server error")
 
         sendEmailCode(user, code)
+
+    def test_send_email_code_is_delivered_by_worker(self):
+        user = get_user_model().objects.create_user(
+            username='testuser',
+            email='test@u.icesi.edu.co',
+            password='password@123'
+        )
+        sendEmailCode(user, "123456")
+        self.assertEqual(len(mail.outbox), 0, "Email sent before the worker ran.")
+        run_pending_jobs()
+        self.assertEqual(mail.outbox[0].to, ['test@u.icesi.edu.co'])
+        self.assertIn("123456", mail.outbox[0].body)
+
+
+@override_settings(AUTH_USER_CACHE_TIMEOUT=300)  # The test run is a single process
+class RoleModelBackendTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.acadi = RoleModel.objects.create(name='acadi')
+        self.common = RoleModel.objects.create(name='common')
+        self.user = get_user_model().objects.create_user(
+            username='cached', email='cached@u.icesi.edu.co', password='password@123',
+            is_active=True, role=self.common,
+        )
+        self.backend = RoleModelBackend()
+
+    def test_loads_user_and_role_in_one_query_then_from_cache(self):
+        with self.assertNumQueries(1):
+            user = self.backend.get_user(self.user.pk)
+            self.assertEqual(user.role.name, 'common')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk).role.name, 'common')
+
+    def test_process_local_cache_is_refused(self):
+        with override_settings(SHARED_CACHE=False):
+            with self.assertRaises(ImproperlyConfigured):
+                check_user_cache()
+            with override_settings(AUTH_USER_CACHE_TIMEOUT=0):
+                check_user_cache()
+        with override_settings(SHARED_CACHE=True):
+            check_user_cache()
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=0)
+    def test_cache_can_be_turned_off(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.get_user(self.user.pk).role.name, 'common')
+
+    def test_role_changes_reach_the_next_request(self):
+        self.backend.get_user(self.user.pk)
+        self.user.role = self.acadi
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).role.name, 'acadi')
+        self.acadi.name = 'program director'
+        self.acadi.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).role.name, 'program director')
+
+    def test_inactive_or_deleted_users_are_not_loaded(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_authenticated_requests_skip_the_user_query(self):
+        self.client.login(email='cached@u.icesi.edu.co', password='password@123')
+        self.client.get(reverse('profile-view'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('profile-view'))
+        self.assertFalse([q for q in queries if 'FROM "init_usermodel"' in q['sql']])
+
+class VerificationCodeStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        role = RoleModel.objects.create(name='common')
+        self.user = get_user_model().objects.create_user(
+            username='verify', email='verify@u.icesi.edu.co', password='password@123', role=role,
+        )
+        self.other = get_user_model().objects.create_user(
+            username='other', email='other@u.icesi.edu.co', password='password@123', role=role,
+        )
+
+    def test_codes_are_checked_by_user_and_used_once(self):
+        code = issue_code(self.user)
+        self.assertFalse(consume_code(self.other.pk, code))
+        with self.assertNumQueries(1):
+            self.assertTrue(consume_code(self.user.pk, code))
+        self.assertFalse(consume_code(self.user.pk, code))
+
+    def test_database_is_used_when_the_cache_lost_the_code(self):
+        code = issue_code(self.user)
+        cache.clear()
+        self.assertTrue(consume_code(self.user.pk, code))
+        self.assertFalse(VerificationCodeModel.objects.exists())
+
+    @patch('init.verification.secrets.randbelow', side_effect=[1, 2])
+    def test_new_code_replaces_the_previous_one(self, randbelow):
+        first = issue_code(self.user)
+        second = issue_code(self.user)
+        self.assertEqual((first, second), ('100001', '100002'))
+        self.assertEqual(VerificationCodeModel.objects.filter(user=self.user).count(), 1)
+        self.assertFalse(consume_code(self.user.pk, first))
+        self.assertTrue(consume_code(self.user.pk, second))
+
+    @patch('init.verification.secrets.randbelow', side_effect=[1, 2])
+    def test_stale_cached_code_is_rejected(self, randbelow):
+        # This process cached the first code, another one has since replaced it in the database
+        first = issue_code(self.user)
+        VerificationCodeModel.objects.filter(user=self.user).update(code=f'{randbelow(900000) + 100000}')
+        self.assertFalse(consume_code(self.user.pk, first))
+        self.assertTrue(consume_code(self.user.pk, '100002'))
+
+    def test_code_consumed_between_get_and_delete_is_rejected(self):
+        code = issue_code(self.user)
+        with patch('init.verification.cache.delete', return_value=False), self.assertNumQueries(0):
+            self.assertFalse(consume_code(self.user.pk, code))
+
+    def test_expired_codes_are_rejected_and_purged(self):
+        code = issue_code(self.user)
+        issue_code(self.other)
+        cache.clear()
+        VerificationCodeModel.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertFalse(consume_code(self.user.pk, code))
+        self.assertEqual(purge_expired_codes(batch_size=1), 2)
+        self.assertFalse(VerificationCodeModel.objects.exists())
+
+    def test_login_then_verify(self):
+        self.client.post(reverse('login-user'), {'username': 'verify@u.icesi.edu.co', 'password': 'password@123'})
+        code = VerificationCodeModel.objects.get(user=self.user).code
+        response = self.client.post(reverse('verify-email', kwargs={'action': 'login'}), {'code': code})
+        self.assertRedirects(response, reverse('dashboard-user'), fetch_redirect_response=False)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_verified_code)
@@ -1,15 +1,23 @@
 from django.core.mail import send_mail
+from dashboard.jobs import enqueue, secret_payload
+from dashboard.metrics import timed_email
 
-def sendEmailCode(user, code):
-
-        try:
+@secret_payload('email', 'code')
+def deliverEmailCode(email, code):
+        # Background job: errors propagate so the worker retries the delivery
+        with timed_email('verification_code'):
             send_mail(
                 "Codigo de verificacion de sistema de acreditacion", 
                 f"Your verification code is: {code}",
                 'acreditacionesicesi@gmail.com',
-                [user.email],
+                [email],
                 fail_silently=False
             )
 
+def sendEmailCode(user, code):
+
+        try:
+            enqueue(deliverEmailCode, email=user.email, code=code)
+
         except Exception as e:
-            print(f"Error al enviar codigo al correo {user.email}: {e}") 
\ No newline at end of file
+            print(f"Error al encolar codigo para el correo {user.email}: {e}") 
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Email verification codes. A code is kept in the cache, which expires it after
+VERIFICATION_CODE_TTL seconds, and in VerificationCodeModel with its expiry time. The row is what a
+code is checked against; the cache only lets a concurrent second use be turned away early. Codes are checked by user and code, never by code alone, and
+a user has at most one row: a new code replaces the previous one. Expired rows are deleted by
+`python manage.py purge_verification_codes`.
+"""
+import secrets
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .models import VerificationCodeModel, verification_code_expiry
+
+# Session key holding the user a code was sent to, until they enter it
+SESSION_KEY = 'verification_user_id'
+PURGE_BATCH_SIZE = 1000
+
+
+def _cache_key(user_id):
+    return f'verification_code:{user_id}'
+
+
+def issue_code(user):
+    code = f'{secrets.randbelow(900000) + 100000}'
+    VerificationCodeModel.objects.update_or_create(
+        user=user, defaults={'code': code, 'expires_at': verification_code_expiry()},
+    )
+    cache.set(_cache_key(user.pk), code, settings.VERIFICATION_CODE_TTL)
+    return code
+
+
+def consume_code(user_id, code):
+    """True if code is the user's unexpired code, which can't be used again afterwards."""
+    key = _cache_key(user_id)
+    if cache.get(key) == code and not cache.delete(key):
+        # Another request consumed it between the get and the delete
+        return False
+    # The row is checked even on a cache hit, since a per-process cache can still hold a code another
+    # process has replaced. One DELETE both checks and consumes, so a code can't be used twice.
+    deleted, _ = VerificationCodeModel.objects.filter(
+        user_id=user_id, code=code, expires_at__gt=timezone.now(),
+    ).delete()
+    if deleted:
+        cache.delete(key)
+    return bool(deleted)
+
+
+def purge_expired_codes(batch_size=PURGE_BATCH_SIZE):
+    deleted = 0
+    while True:
+        ids = list(
+            VerificationCodeModel.objects.filter(expires_at__lt=timezone.now()).values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += VerificationCodeModel.objects.filter(pk__in=ids).delete()[0]
@@ -3,15 +3,15 @@ from django.shortcuts import render, redirect
 from django.views import View
 from django.views.generic import CreateView
 from .forms import RegisterUserForm, ValidateEmailForm, LoginUserForm, ForgotPasswordForm, ResetPasswordForm
-from .models import UserModel, VerificationCodeModel, RoleModel
+from .models import UserModel, RoleModel
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.core.mail import send_mail
 from django.contrib import messages
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required
-import random
 from .utils import sendEmailCode
+from .verification import SESSION_KEY as VERIFICATION_SESSION_KEY, consume_code, issue_code
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
 
@@ -62,10 +62,8 @@ class RegisterUserView(View):
             
             user.role = RoleModel.objects.get(name="common")
             user.save()
-            code = str(random.randint(100000, 999999))
-
-            VerificationCodeModel.objects.filter(user=user).delete()
-            VerificationCodeModel.objects.create(user=user, code=code)
+            code = issue_code(user)
+            request.session[VERIFICATION_SESSION_KEY] = user.pk
             sendEmailCode(user, code)
 
             return redirect("verify-email", action="register")
@@ -91,22 +89,23 @@ class VerifyEmailView(View):
         if form.is_valid():
             code = form.cleaned_data['code']
 
-            verification = VerificationCodeModel.objects.filter(code=code).first()
+            user_id = request.session.get(VERIFICATION_SESSION_KEY)
 
-            if verification:
-                verification.user.is_verified_code = True
-                verification.user.save()
+            if user_id and consume_code(user_id, code):
+                user = UserModel.objects.select_related('role').get(pk=user_id)
+                user.is_verified_code = True
+                user.save()
 
-                verification.delete()
+                request.session.pop(VERIFICATION_SESSION_KEY, None)
 
                 if action == 'register':
                     return redirect('home-view')
                 
                 elif action == 'login':
-                    if verification.user.role.name == 'common':
+                    if user.role.name == 'common':
                         return redirect('dashboard-user')
                     
-                    elif verification.user.role.name == 'program director' or verification.user.role.name == 'acadi':
+                    elif user.role.name == 'program director' or user.role.name == 'acadi':
                         return redirect('dashboard-admin')
                     
                     else:
@@ -154,9 +153,8 @@ class LoginView(View):
                         return redirect('home-view')
                 else:
                     # Lógica normal con verificación
-                    code = str(random.randint(100000, 999999))
-                    VerificationCodeModel.objects.filter(user=user).delete()
-                    VerificationCodeModel.objects.create(user=user, code=code)
+                    code = issue_code(user)
+                    request.session[VERIFICATION_SESSION_KEY] = user.pk
                     sendEmailCode(user, code)
                     return redirect("verify-email", action="login")
             
@@ -186,10 +184,8 @@ class ForgotPasswordView(View):
             user = UserModel.objects.filter(email=email).first()
 
             if user:
-                code = str(random.randint(100000, 999999))
-
-                VerificationCodeModel.objects.filter(user=user).delete()
-                VerificationCodeModel.objects.create(user=user, code=code)
+                code = issue_code(user)
+                request.session[VERIFICATION_SESSION_KEY] = user.pk
 
                 sendEmailCode(user, code)
 